@@ -0,0 +1,48 @@
+import argparse
+import json
+import os
+import tempfile
+from typing import List
+
+from services.batch import collect_documents, run_batch
+from services import config
+
+def batch_analyze(source: str, output_dir: str, worker_counts: List[int]):
+    """Analyze every NDA in a directory or zip, once per worker count."""
+    with tempfile.TemporaryDirectory() as work_dir:
+        paths = collect_documents(source, work_dir)
+        if not paths:
+            print(f"No .docx files found in {source}")
+            return
+
+        print(f"Found {len(paths)} documents")
+        summaries = []
+        for workers in worker_counts:
+            run_dir = output_dir if len(worker_counts) == 1 else os.path.join(output_dir, f"workers_{workers}")
+            summary = run_batch(paths, run_dir, workers=workers,
+                                on_file=lambda done, total: print(f"  {done}/{total}", end="\r"))
+            summaries.append(summary)
+            print(f"{workers} worker(s): {summary['succeeded']} ok, {summary['failed']} failed, "
+                  f"{summary['elapsed_seconds']:.1f}s, {summary['docs_per_minute']:.1f} docs/minute")
+
+    if len(summaries) > 1:
+        baseline = summaries[0]["docs_per_minute"] or 1.0
+        print("\nScaling:")
+        for summary in summaries:
+            print(f"  {summary['workers']:>3} workers  {summary['docs_per_minute']:>8.1f} docs/minute  "
+                  f"{summary['docs_per_minute'] / baseline:.2f}x")
+        with open(os.path.join(output_dir, "scaling.json"), "w") as f:
+            json.dump(summaries, f, indent=2)
+
+def main():
+    parser = argparse.ArgumentParser(description="Analyze a backlog of NDAs across a process pool")
+    parser.add_argument("source", help="Directory of .docx files or a .zip archive")
+    parser.add_argument("--output", default="batch_output", help="Directory for redlines, per-file JSON and the summary")
+    parser.add_argument("--workers", type=int, nargs="+", default=[config.BATCH_WORKERS],
+                        help="Worker process counts; several values report docs/minute scaling")
+
+    args = parser.parse_args()
+    batch_analyze(args.source, args.output, args.workers)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+import argparse
+import copy
+import os
+import sys
+import tempfile
+import time
+from typing import List
+
+import torch
+from transformers import AutoTokenizer, AutoModelForSequenceClassification
+
+from services import config
+from services.inference_backends import TorchBackend, QuantizedTorchBackend, OnnxBackend, export_onnx
+from services.model_registry import ModelRegistry
+
+# Fixed paragraph set for the parity check
+PARITY_CLAUSES = [
+    "The Receiving Party shall hold all Confidential Information in strict confidentiality.",
+    "This Agreement may be terminated by either party upon thirty days written notice.",
+    "Neither party shall be liable for any indirect or consequential damages.",
+    "All intellectual property rights in the Confidential Information remain with the Disclosing Party.",
+    "The Recipient shall indemnify the Discloser against all losses arising from a breach of this Agreement.",
+    "The Disclosing Party makes no warranty as to the accuracy or completeness of the information.",
+    "The obligations of non-disclosure shall survive termination for a period of five years.",
+    "This Agreement shall be governed by the laws of Switzerland.",
+]
+
+def score(backend, tokenizer, texts: List[str], batch_size: int) -> List[List[float]]:
+    results = []
+    with torch.inference_mode():
+        for start in range(0, len(texts), batch_size):
+            inputs = tokenizer(texts[start:start + batch_size], padding=True, truncation=True,
+                               max_length=config.MAX_SEQUENCE_LENGTH, return_tensors="pt")
+            results.extend(torch.softmax(backend.predict_logits(inputs), dim=1).tolist())
+    return results
+
+def run_benchmark(model_dir: str, repeat: int, batch_size: int, tolerance: float) -> bool:
+    tokenizer = AutoTokenizer.from_pretrained(model_dir)
+    model = AutoModelForSequenceClassification.from_pretrained(model_dir)
+    model.eval()
+
+    # All backends share one set of weights so their outputs are comparable
+    onnx_path = os.path.join(tempfile.mkdtemp(), "model.onnx")
+    export_onnx(model, tokenizer, onnx_path)
+    backends = [
+        (TorchBackend(model), ModelRegistry._module_bytes(model)),
+        (QuantizedTorchBackend(copy.deepcopy(model)), None),
+        (OnnxBackend(onnx_path), os.path.getsize(onnx_path)),
+    ]
+
+    reference = score(backends[0][0], tokenizer, PARITY_CLAUSES, batch_size)
+    texts = PARITY_CLAUSES * repeat
+    parity_ok = True
+
+    print(f"{'backend':<10} {'weights MB':>10} {'ms/para':>8} {'class agree':>12} {'max |dp|':>9}")
+    for backend, memory_bytes in backends:
+        if memory_bytes is None:
+            memory_bytes = ModelRegistry._state_dict_bytes(backend.model)
+
+        probabilities = score(backend, tokenizer, PARITY_CLAUSES, batch_size)
+        agree = sum(a.index(max(a)) == b.index(max(b))
+                    for a, b in zip(reference, probabilities)) / len(PARITY_CLAUSES)
+        max_diff = max(abs(a[1] - b[1]) for a, b in zip(reference, probabilities))
+        if agree < 1.0 or max_diff > tolerance:
+            parity_ok = False
+
+        score(backend, tokenizer, texts[:batch_size], batch_size)  # warm up
+        start = time.perf_counter()
+        score(backend, tokenizer, texts, batch_size)
+        elapsed = time.perf_counter() - start
+
+        print(f"{backend.kind:<10} {memory_bytes / 1e6:>10.1f} {elapsed / len(texts) * 1000:>8.2f} "
+              f"{agree:>12.0%} {max_diff:>9.4f}")
+
+    print(f"Parity within tolerance {tolerance}: {'PASS' if parity_ok else 'FAIL'}")
+    return parity_ok
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare latency, memory and output parity of the inference backends")
+    parser.add_argument("--model-dir", default=config.MODEL_NAME, help="Hub name or fine-tuned model directory")
+    parser.add_argument("--repeat", type=int, default=20, help="Repeat the paragraph set for timing")
+    parser.add_argument("--batch-size", type=int, default=config.INFERENCE_BATCH_SIZE, help="Paragraphs per forward pass")
+    parser.add_argument("--tolerance", type=float, default=0.05, help="Allowed confidence difference against eager torch")
+
+    args = parser.parse_args()
+    if not run_benchmark(args.model_dir, args.repeat, args.batch_size, args.tolerance):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
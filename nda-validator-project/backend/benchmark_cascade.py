@@ -0,0 +1,66 @@
+import argparse
+import time
+from typing import List
+
+from docx import Document
+
+from services.ai_service import AIService
+from services.cascade import CascadeClassifier, BENIGN, PROBLEMATIC
+from services import config
+
+def load_paragraphs(doc_paths: List[str], ai_service: AIService) -> List[str]:
+    """Collect the prefiltered paragraphs check_document would screen."""
+    texts = []
+    for doc_path in doc_paths:
+        doc = Document(doc_path)
+        texts.extend(para.text for para in doc.paragraphs
+                     if para.text.strip() and ai_service.clause_matcher.match(para.text))
+    return texts
+
+def run_benchmark(doc_paths: List[str], cascade_path: str, low: float, high: float):
+    ai_service = AIService()
+    cascade = CascadeClassifier.load(cascade_path, low, high)
+    texts = load_paragraphs(doc_paths, ai_service)
+    if not texts:
+        print("No flagged paragraphs found in the documents")
+        return
+
+    # Full run: every paragraph goes through legal-bert
+    start = time.perf_counter()
+    full_scores = [probs[1] for probs in ai_service._score_texts(ai_service.classifier_backend, texts)]
+    full_time = time.perf_counter() - start
+    full_decisions = [score > 0.5 for score in full_scores]
+
+    # Cascade run: legal-bert only sees the uncertain band
+    start = time.perf_counter()
+    routes = cascade.route(texts)
+    uncertain = [i for i, route in enumerate(routes) if route["decision"] not in (BENIGN, PROBLEMATIC)]
+    uncertain_scores = ai_service._score_texts(ai_service.classifier_backend, [texts[i] for i in uncertain])
+    cascade_time = time.perf_counter() - start
+
+    cascade_decisions = [route["decision"] == PROBLEMATIC for route in routes]
+    for i, probs in zip(uncertain, uncertain_scores):
+        cascade_decisions[i] = probs[1] > 0.5
+
+    agreement = sum(a == b for a, b in zip(full_decisions, cascade_decisions)) / len(texts)
+    skipped = len(texts) - len(uncertain)
+
+    print(f"Paragraphs screened:        {len(texts)}")
+    print(f"Skipped legal-bert:         {skipped} ({skipped / len(texts):.1%})")
+    print(f"Transformer calls saved:    {len(texts) / max(len(uncertain), 1):.1f}x fewer")
+    print(f"Agreement with full run:    {agreement:.1%}")
+    print(f"Full legal-bert time:       {full_time:.2f}s")
+    print(f"Cascade time:               {cascade_time:.2f}s")
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure transformer calls skipped by the cascade and its agreement with a full legal-bert run")
+    parser.add_argument("documents", nargs="+", help="Paths to .docx NDAs")
+    parser.add_argument("--cascade", default=config.CASCADE_MODEL_PATH, help="Path to a trained cascade.joblib")
+    parser.add_argument("--low", type=float, default=config.CASCADE_LOW_THRESHOLD, help="Benign threshold")
+    parser.add_argument("--high", type=float, default=config.CASCADE_HIGH_THRESHOLD, help="Problematic threshold")
+
+    args = parser.parse_args()
+    run_benchmark(args.documents, args.cascade, args.low, args.high)
+
+if __name__ == "__main__":
+    main()
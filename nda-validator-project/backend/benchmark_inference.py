@@ -0,0 +1,65 @@
+import argparse
+import time
+from typing import List
+
+import torch
+from docx import Document
+
+from services.ai_service import AIService
+
+def load_paragraphs(doc_path: str, ai_service: AIService) -> List[str]:
+    """Collect the paragraphs check_document would send to the model."""
+    doc = Document(doc_path)
+    return [
+        para.text for para in doc.paragraphs
+        if para.text.strip() and ai_service.clause_matcher.match(para.text)
+    ]
+
+def score_per_paragraph(ai_service: AIService, texts: List[str]) -> List[float]:
+    """Reference path: one forward pass per paragraph, as check_document used to do."""
+    confidences = []
+    for text in texts:
+        inputs = ai_service.tokenizer(text, return_tensors="pt",
+                                      truncation=True, max_length=512)
+        logits = ai_service.classifier_backend.predict_logits(inputs)
+        confidences.append(float(torch.softmax(logits, dim=1)[0][1]))
+    return confidences
+
+def score_batched(ai_service: AIService, texts: List[str]) -> List[float]:
+    """Batched path used by check_document."""
+    return [probs[1] for probs in ai_service._score_texts(ai_service.classifier_backend, texts)]
+
+def run_benchmark(doc_path: str, repeat: int, batch_size: int):
+    ai_service = AIService(batch_size=batch_size)
+    texts = load_paragraphs(doc_path, ai_service) * repeat
+    if not texts:
+        print("No flagged paragraphs found in the document")
+        return
+
+    print(f"Scoring {len(texts)} flagged paragraphs (batch size {batch_size})")
+
+    start = time.perf_counter()
+    baseline = score_per_paragraph(ai_service, texts)
+    baseline_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batched = score_batched(ai_service, texts)
+    batched_time = time.perf_counter() - start
+
+    max_diff = max(abs(a - b) for a, b in zip(baseline, batched))
+    print(f"Per-paragraph: {len(texts) / baseline_time:.1f} paragraphs/sec ({baseline_time:.2f}s)")
+    print(f"Batched:       {len(texts) / batched_time:.1f} paragraphs/sec ({batched_time:.2f}s)")
+    print(f"Speedup:       {baseline_time / batched_time:.2f}x")
+    print(f"Max confidence difference: {max_diff:.2e}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark paragraph inference throughput")
+    parser.add_argument("--document", required=True, help="Path to a .docx NDA to score")
+    parser.add_argument("--repeat", type=int, default=1, help="Repeat the paragraph set to simulate longer documents")
+    parser.add_argument("--batch-size", type=int, default=16, help="Batch size for the batched path")
+
+    args = parser.parse_args()
+    run_benchmark(args.document, args.repeat, args.batch_size)
+
+if __name__ == "__main__":
+    main()
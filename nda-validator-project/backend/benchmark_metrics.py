@@ -0,0 +1,58 @@
+import argparse
+import time
+
+from services.metrics import Metrics, request_spans
+from services.profiler import StackSampler
+
+def busy_work(iterations: int) -> int:
+    """Pure-Python loop standing in for a request's CPU time."""
+    total = 0
+    for i in range(iterations):
+        total += i * i % 7
+    return total
+
+def time_spans(metrics: Metrics, count: int, in_request: bool) -> float:
+    token = request_spans.set({}) if in_request else None
+    start = time.perf_counter()
+    for i in range(count):
+        with metrics.span("parse" if i % 2 else "score"):
+            pass
+    elapsed = time.perf_counter() - start
+    if token is not None:
+        request_spans.reset(token)
+    return elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the cost of timing spans, /metrics rendering and profiling")
+    parser.add_argument("--spans", type=int, default=200000, help="Spans recorded per measurement")
+    parser.add_argument("--work", type=int, default=2000000, help="Loop iterations of simulated request work")
+    parser.add_argument("--interval-ms", type=float, default=5.0, help="Profiler sampling interval")
+
+    args = parser.parse_args()
+    metrics = Metrics()
+    for in_request in (False, True):
+        elapsed = time_spans(metrics, args.spans, in_request)
+        label = "in a request" if in_request else "background"
+        print(f"span ({label}): {elapsed * 1e9 / args.spans:.0f} ns")
+
+    for i in range(50):
+        metrics.observe("nda_http_request_seconds", 0.01, handler=f"handler_{i}", method="POST", status="200")
+    start = time.perf_counter()
+    body = metrics.render()
+    print(f"render: {(time.perf_counter() - start) * 1000:.2f} ms for {body.count(chr(10))} lines")
+
+    start = time.perf_counter()
+    busy_work(args.work)
+    baseline = time.perf_counter() - start
+
+    sampler = StackSampler(args.interval_ms / 1000.0)
+    sampler.start()
+    start = time.perf_counter()
+    busy_work(args.work)
+    profiled = time.perf_counter() - start
+    sampler.stop()
+    print(f"profiler at {args.interval_ms:g} ms: {baseline:.3f}s -> {profiled:.3f}s "
+          f"({(profiled / baseline - 1) * 100:+.1f}%), {sampler.samples} samples, {len(sampler.stacks)} stacks")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+import argparse
+import time
+from typing import List
+
+import numpy as np
+
+from services.precedent_index import PrecedentIndex
+from services import config
+
+def clustered_vectors(rng: np.random.Generator, centers: np.ndarray, count: int, noise: float) -> np.ndarray:
+    """Vectors scattered around topic centers, like embeddings of boilerplate clause families."""
+    vectors = centers[rng.integers(0, len(centers), count)]
+    return (vectors + noise * rng.standard_normal(vectors.shape, dtype=np.float32)).astype(np.float32)
+
+def run_benchmark(size: int, dim: int, queries: int, k: int, nlist: int, nprobes: List[int], chunk: int):
+    rng = np.random.default_rng(0)
+    centers = rng.standard_normal((max(size // 500, 16), dim), dtype=np.float32)
+    index = PrecedentIndex(dim, nlist=nlist, min_train_size=config.PRECEDENT_MIN_TRAIN_SIZE)
+
+    start = time.perf_counter()
+    sample = None
+    for offset in range(0, size, chunk):
+        count = min(chunk, size - offset)
+        vectors = clustered_vectors(rng, centers, count, 0.5)
+        if sample is None:
+            sample = vectors[:queries].copy()
+        index.add(vectors, [{"original": str(offset + i), "accepted": ""} for i in range(count)])
+    build = time.perf_counter() - start
+    stats = index.stats()
+    print(f"{size} clauses, dim {dim}: built in {build:.1f}s ({stats['mode']}, {stats['lists']} lists, "
+          f"{stats['memory_bytes'] / 2 ** 20:.0f} MiB)")
+
+    # Queries are reworded versions of indexed clauses
+    batch = sample + 0.1 * rng.standard_normal(sample.shape, dtype=np.float32)
+    start = time.perf_counter()
+    exact = index.search(batch, k, nprobe=len(index.centroids) if index.trained else None)
+    exact_ms = (time.perf_counter() - start) * 1000 / queries
+    expected = [{entry["original"] for entry in result} for result in exact]
+
+    print(f"{'nprobe':>8} {'ms/query':>9} {'ms/batch':>9} {'recall@' + str(k):>9}")
+    print(f"{'exact':>8} {exact_ms:>9.2f} {exact_ms * queries:>9.1f} {1.0:>9.3f}")
+    for nprobe in nprobes:
+        start = time.perf_counter()
+        results = index.search(batch, k, nprobe=nprobe)
+        elapsed = time.perf_counter() - start
+        recall = np.mean([len(truth & {entry["original"] for entry in result}) / max(len(truth), 1)
+                          for truth, result in zip(expected, results)])
+        print(f"{nprobe:>8} {elapsed * 1000 / queries:>9.2f} {elapsed * 1000:>9.1f} {recall:>9.3f}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure precedent index query latency and recall as it grows")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100000, 1000000], help="Indexed clauses per run")
+    parser.add_argument("--dim", type=int, default=768, help="Vector size (legal-bert: 768); 1M x 768 needs about 3 GB")
+    parser.add_argument("--queries", type=int, default=64, help="Clauses per batched query, like one document")
+    parser.add_argument("--k", type=int, default=config.PRECEDENT_TOP_K, help="Precedents per clause")
+    parser.add_argument("--nlist", type=int, default=config.PRECEDENT_NLIST, help="IVF lists")
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[4, 16, 64], help="Lists scanned per query")
+    parser.add_argument("--chunk", type=int, default=50000, help="Clauses inserted per add() call")
+
+    args = parser.parse_args()
+    for size in args.sizes:
+        run_benchmark(size, args.dim, args.queries, args.k, args.nlist, args.nprobe, args.chunk)
+
+if __name__ == "__main__":
+    main()
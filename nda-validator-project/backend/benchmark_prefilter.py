@@ -0,0 +1,58 @@
+import argparse
+import random
+import string
+import time
+from typing import Dict, List
+
+from services.clause_matcher import ClauseMatcher
+
+WORDS = [
+    "the", "receiving", "party", "shall", "not", "disclose", "any", "confidential",
+    "information", "agreement", "termination", "liabilities", "recipient", "notice",
+    "written", "obligations", "survive", "years", "affiliates", "employees",
+]
+
+def make_patterns(num_keywords: int, seed: int) -> Dict[str, List[str]]:
+    rng = random.Random(seed)
+    patterns = {"termination": ["termination"], "liability": ["liability"]}
+    for i in range(num_keywords):
+        keyword = "".join(rng.choices(string.ascii_lowercase + " -", k=rng.randint(6, 24)))
+        patterns.setdefault(f"category_{i % 50}", []).append(keyword)
+    return patterns
+
+def make_paragraphs(count: int, seed: int) -> List[str]:
+    rng = random.Random(seed)
+    return [" ".join(rng.choice(WORDS) for _ in range(rng.randint(40, 160))) for _ in range(count)]
+
+def run_benchmark(sizes: List[int], paragraphs: int):
+    texts = make_paragraphs(paragraphs, seed=1)
+    print(f"{'keywords':>10} {'matcher us/para':>16} {'substring us/para':>18}")
+    for size in sizes:
+        patterns = make_patterns(size, seed=size)
+        matcher = ClauseMatcher(patterns)
+        keywords = [(keyword, category) for category, values in patterns.items() for keyword in values]
+
+        start = time.perf_counter()
+        for text in texts:
+            matcher.match(text)
+        matcher_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for text in texts:
+            lowered = text.lower()
+            {category for keyword, category in keywords if keyword in lowered}
+        substring_time = time.perf_counter() - start
+
+        print(f"{len(matcher):>10} {matcher_time / len(texts) * 1e6:>16.1f} "
+              f"{substring_time / len(texts) * 1e6:>18.1f}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the clause keyword prefilter as the keyword list grows")
+    parser.add_argument("--sizes", default="10,100,1000,5000", help="Comma-separated keyword counts")
+    parser.add_argument("--paragraphs", type=int, default=500, help="Number of synthetic paragraphs")
+
+    args = parser.parse_args()
+    run_benchmark([int(size) for size in args.sizes.split(",")], args.paragraphs)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+import argparse
+import io
+import os
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, List
+
+from docx import Document
+from docx.shared import RGBColor
+
+from services.redline import RedlineRenderer
+
+SAMPLE_CLAUSES = [
+    "The Receiving Party shall hold all Confidential Information in strict confidentiality.",
+    "This Agreement may be terminated by either party upon thirty days written notice.",
+    "Neither party shall be liable for any indirect or consequential damages.",
+    "All intellectual property rights in the Confidential Information remain with the Disclosing Party.",
+    "The Recipient shall indemnify the Discloser against all losses arising from a breach of this Agreement.",
+]
+
+def build_nda(path: str, paragraphs: int) -> Dict[int, str]:
+    """Write a synthetic NDA and return suggestions for every fifth paragraph."""
+    doc = Document()
+    suggestions = {}
+    for i in range(paragraphs):
+        text = f"{i + 1}. {SAMPLE_CLAUSES[i % len(SAMPLE_CLAUSES)]}"
+        doc.add_paragraph(text)
+        if i % 5 == 0:
+            suggestions[i] = text.replace("shall", "must").replace("all", "any")
+    doc.save(path)
+    return suggestions
+
+def rebuild_redline(source_path: str, suggestions: Dict[int, str]) -> io.BytesIO:
+    """The previous approach: rebuild the whole document with add_paragraph/add_run."""
+    source = Document(source_path)
+    redline = Document()
+    for index, paragraph in enumerate(source.paragraphs):
+        if index in suggestions:
+            run = redline.add_paragraph().add_run(paragraph.text)
+            run.font.strike = True
+            run = redline.add_paragraph().add_run(suggestions[index])
+            run.font.color.rgb = RGBColor(0, 128, 0)
+        else:
+            redline.add_paragraph(paragraph.text)
+    buffer = io.BytesIO()
+    redline.save(buffer)
+    return buffer
+
+def measure(render: Callable[[str, Dict[int, str]], io.BytesIO], path: str,
+            suggestions: Dict[int, str], repeats: int):
+    """Return (best seconds, peak traced bytes) for a render function."""
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        render(path, suggestions)
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    render(path, suggestions)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak
+
+def run_benchmark(sizes: List[int], repeats: int):
+    renderer = RedlineRenderer()
+    print(f"{'paragraphs':>10} {'rebuild ms':>11} {'patch ms':>9} {'ms/para':>8} {'update ms':>10} "
+          f"{'rebuild MB':>11} {'patch MB':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            path = os.path.join(tmp, f"nda_{size}.docx")
+            suggestions = build_nda(path, size)
+            rebuild_time, rebuild_peak = measure(rebuild_redline, path, suggestions, repeats)
+            patch_time, patch_peak = measure(renderer.render, path, suggestions, repeats)
+
+            # A feedback round re-renders a handful of paragraphs of the latest redline
+            redline_path = os.path.join(tmp, f"nda_{size}_redline.docx")
+            with open(redline_path, "wb") as file:
+                file.write(renderer.render(path, suggestions).getbuffer())
+            changes = {index: f"{index + 1}. Revised clause text." for index in range(0, size, max(size // 3, 1))}
+            update_time, _ = measure(renderer.update, redline_path, changes, repeats)
+            print(f"{size:>10} {rebuild_time * 1000:>11.1f} {patch_time * 1000:>9.1f} "
+                  f"{patch_time * 1000 / size:>8.3f} {update_time * 1000:>10.1f} {rebuild_peak / 1e6:>11.1f} {patch_peak / 1e6:>9.1f}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare rebuilding redlines against patching tracked changes into the source")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 250, 500, 1000], help="Paragraph counts to test")
+    parser.add_argument("--repeats", type=int, default=3, help="Timed runs per size; the best is reported")
+
+    args = parser.parse_args()
+    run_benchmark(args.sizes, args.repeats)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+import argparse
+import asyncio
+import time
+from typing import Awaitable, Callable, List
+
+from services.ai_service import AIService
+
+SAMPLE_CLAUSES = [
+    "The Receiving Party shall hold all Confidential Information in strict confidentiality.",
+    "This Agreement may be terminated by either party upon thirty days written notice.",
+    "Neither party shall be liable for any indirect or consequential damages.",
+    "All intellectual property rights in the Confidential Information remain with the Disclosing Party.",
+    "The Recipient shall indemnify the Discloser against all losses arising from a breach of this Agreement.",
+]
+
+def percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+async def run_load(score: Callable[[List[str]], Awaitable], clients: int, requests_per_client: int,
+                   paragraphs_per_request: int):
+    """Fire concurrent scoring requests and return (total time, request latencies)."""
+    texts = (SAMPLE_CLAUSES * paragraphs_per_request)[:paragraphs_per_request]
+    latencies = []
+
+    async def client():
+        for _ in range(requests_per_client):
+            start = time.perf_counter()
+            await score(texts)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(clients)))
+    return time.perf_counter() - start, latencies
+
+def report(label: str, elapsed: float, latencies: List[float], paragraphs_per_request: int):
+    total = len(latencies) * paragraphs_per_request
+    print(f"{label}: {total / elapsed:.1f} paragraphs/sec, "
+          f"p50 {percentile(latencies, 50) * 1000:.0f} ms, "
+          f"p99 {percentile(latencies, 99) * 1000:.0f} ms")
+
+async def run_benchmark(clients: int, requests_per_client: int, paragraphs_per_request: int):
+    ai_service = AIService()
+    loop = asyncio.get_running_loop()
+    model_lock = asyncio.Lock()
+
+    async def per_request(texts):
+        # Each request runs its own forward passes on the shared model
+        async with model_lock:
+            return await loop.run_in_executor(None, ai_service._score_texts, ai_service.classifier_backend, texts)
+
+    elapsed, latencies = await run_load(per_request, clients, requests_per_client, paragraphs_per_request)
+    report("Per-request ", elapsed, latencies, paragraphs_per_request)
+
+    elapsed, latencies = await run_load(ai_service.scheduler.submit, clients, requests_per_client,
+                                        paragraphs_per_request)
+    report("Micro-batched", elapsed, latencies, paragraphs_per_request)
+    print(f"Scheduler stats: {ai_service.scheduler.stats()}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark cross-request micro-batching under load")
+    parser.add_argument("--clients", type=int, default=16, help="Number of concurrent clients")
+    parser.add_argument("--requests", type=int, default=10, help="Requests per client")
+    parser.add_argument("--paragraphs", type=int, default=3, help="Paragraphs per request")
+
+    args = parser.parse_args()
+    asyncio.run(run_benchmark(args.clients, args.requests, args.paragraphs))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+import argparse
+import os
+import random
+import tempfile
+import time
+from typing import List, Tuple
+
+from docx import Document
+
+from services.training_service import TrainingService
+from services.paragraph_extraction import ParagraphExtractor
+from services.token_store import TokenStore
+
+CLAUSES = [
+    "The Receiving Party shall hold all Confidential Information in strict confidentiality.",
+    "This Agreement may be terminated by either party upon thirty days written notice.",
+    "Neither party shall be liable for any indirect or consequential damages.",
+    "All intellectual property rights in the Confidential Information remain with the Disclosing Party.",
+    "The Recipient shall indemnify the Discloser against all losses arising from a breach of this Agreement.",
+]
+
+def write_document(path: str, paragraphs: List[str]):
+    doc = Document()
+    for text in paragraphs:
+        doc.add_paragraph(text)
+    doc.save(path)
+
+def build_corpus(root: str, documents: int, paragraphs: int) -> Tuple[List[str], List[str], List[str]]:
+    """Write synthetic triples where the redline inserts a paragraph near the top."""
+    rng = random.Random(0)
+    triples = ([], [], [])
+    for doc_type in ("original", "redline", "clean"):
+        os.makedirs(os.path.join(root, doc_type), exist_ok=True)
+    for i in range(documents):
+        original = [f"{n + 1}. {rng.choice(CLAUSES)} (NDA {i})" for n in range(paragraphs)]
+        redline = list(original)
+        redline.insert(1, "The parties agree to the following additional terms.")
+        for n in range(2, len(redline), 7):
+            redline[n] = redline[n].replace("Agreement", "NDA") + " This obligation survives termination."
+        clean = [text if rng.random() < 0.7 else original_text
+                 for text, original_text in zip(redline[:1] + redline[2:], original)]
+        for doc_type, texts, paths in zip(("original", "redline", "clean"), (original, redline, clean), triples):
+            path = os.path.join(root, doc_type, f"nda{i}_{doc_type}.docx")
+            write_document(path, texts)
+            paths.append(path)
+    return triples
+
+def run_benchmark(sizes: List[int], paragraphs: int, workers: int):
+    print(f"{'documents':>10} {'cold s':>8} {'ms/doc':>8} {'cached s':>9} {'pairs':>7} {'tokens':>9} {'padded':>9}")
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            originals, redlines, cleans = build_corpus(os.path.join(tmp, "corpus"), size, paragraphs)
+            service = TrainingService()
+            service.extractor = ParagraphExtractor(os.path.join(tmp, "cache"), workers)
+
+            start = time.perf_counter()
+            texts, _ = service.prepare_training_data(originals, redlines, cleans)
+            cold = time.perf_counter() - start
+
+            start = time.perf_counter()
+            service.prepare_training_data(originals, redlines, cleans)
+            cached = time.perf_counter() - start
+
+            # Real token count vs. padding the whole corpus to its longest sample
+            lengths = TokenStore.build(texts, service.tokenizer).lengths()
+            padded = int(lengths.max()) * len(lengths) if len(lengths) else 0
+
+            print(f"{size:>10} {cold:>8.2f} {cold * 1000 / (size * 3):>8.1f} {cached:>9.2f} {len(texts):>7} "
+                  f"{int(lengths.sum()):>9} {padded:>9}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure training data preparation time, cold and cached, as the corpus grows")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[25, 100, 400], help="Document triples per run")
+    parser.add_argument("--paragraphs", type=int, default=40, help="Paragraphs per document")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Extraction worker processes")
+
+    args = parser.parse_args()
+    run_benchmark(args.sizes, args.paragraphs, args.workers)
+
+if __name__ == "__main__":
+    main()
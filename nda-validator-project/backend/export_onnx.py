@@ -0,0 +1,31 @@
+import argparse
+import os
+
+from transformers import AutoTokenizer, AutoModelForSequenceClassification
+
+from services import config
+from services.inference_backends import export_onnx, onnx_model_path
+
+def export_model(model_dir: str, roles, output_dir: str = None):
+    """Export one ONNX graph per role for the given checkpoint."""
+    tokenizer = AutoTokenizer.from_pretrained(model_dir)
+    for role in roles:
+        model = AutoModelForSequenceClassification.from_pretrained(model_dir)
+        if output_dir:
+            path = os.path.join(output_dir, f"{role}.onnx")
+        else:
+            path = onnx_model_path(model_dir, role)
+        export_onnx(model, tokenizer, path)
+        print(f"Exported {model_dir} ({role}) to {path} ({os.path.getsize(path) / 1e6:.1f} MB)")
+
+def main():
+    parser = argparse.ArgumentParser(description="Export models to ONNX for the onnxruntime inference backend")
+    parser.add_argument("--model-dir", default=config.MODEL_NAME, help="Hub name or fine-tuned model directory")
+    parser.add_argument("--roles", nargs="+", default=["classifier", "validator"], help="Model roles to export")
+    parser.add_argument("--output-dir", help="Where to write the .onnx files (default: where the server looks for them)")
+
+    args = parser.parse_args()
+    export_model(args.model_dir, args.roles, args.output_dir)
+
+if __name__ == "__main__":
+    main()
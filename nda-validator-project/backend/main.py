@@ -1,15 +1,150 @@
-from fastapi import FastAPI, UploadFile, File, HTTPException
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
+from starlette.datastructures import Headers, MutableHeaders
 from pydantic import BaseModel
-from typing import Optional, List
+from typing import Any, Dict, Optional, List
 import uvicorn
-from services.document_service import DocumentService
+import anyio
+import asyncio
+import functools
+import json
+import logging
+import os
+import re
+import shutil
+import time
+import uuid
+from services.document_service import DocumentService, UploadTooLargeError
 from services.ai_service import AIService
 from services.memory_service import MemoryService
 from services.training_service import TrainingService
+from services.worker_pool import WorkerPool, ServerBusyError
+from services.model_registry import ModelRegistry
+from services.score_cache import ScoreCache
+from services.file_response import file_response
+from services.event_stream import event_stream_response, wants_ndjson
+from services.batch import collect_documents, run_batch
+from services.job_queue import FINISHED, Job, JobQueue, JobStore
+from services.pipeline import ANALYSIS_STAGES, AnalysisPipeline
+from services.retention import RetentionSweeper
+from services.metrics import metrics, request_id, request_spans
+from services.profiler import StackSampler
+from services.training_service import TrainingProgressCallback
+from services import config
 
 app = FastAPI(title="NDA Validator AI Assistant")
 
+@app.middleware("http")
+async def limit_upload_size(request: Request, call_next):
+    # Reject declared oversized uploads before the multipart body is read,
+    # leaving some room for multipart framing around the file itself
+    content_length = request.headers.get("content-length")
+    if (request.url.path == "/upload" and content_length and content_length.isdigit()
+            and int(content_length) > config.MAX_UPLOAD_BYTES + 64 * 1024):
+        return JSONResponse(
+            status_code=413,
+            content={"detail": f"Upload exceeds the maximum size of {config.MAX_UPLOAD_BYTES} bytes"}
+        )
+    return await call_next(request)
+
+request_log = logging.getLogger("nda.requests")
+if config.JSON_LOGS:
+    request_log.addHandler(logging.StreamHandler())
+    request_log.setLevel(logging.INFO)
+    request_log.propagate = False
+
+# Caller-supplied request IDs end up in log lines and profile file names
+REQUEST_ID_PATTERN = re.compile(r"[A-Za-z0-9_-]{1,64}")
+
+class InstrumentRequests:
+    """Time, profile and log each HTTP request, tagged with its request ID.
+
+    A plain ASGI middleware rather than ``@app.middleware``: the request is
+    only finished once the last body chunk has been sent, so streamed
+    responses (SSE, NDJSON, file downloads) are covered to the end. A
+    response whose body never completed, usually because the client went
+    away mid-stream, is recorded with status 499 and ``disconnected``.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        # Requests keep the caller's X-Request-ID so logs can be joined across services
+        rid = headers.get("x-request-id", "")
+        if not REQUEST_ID_PATTERN.fullmatch(rid):
+            rid = uuid.uuid4().hex
+        sampler = None
+        if config.PROFILING_ENABLED and headers.get("x-profile") == "1":
+            sampler = StackSampler(config.PROFILE_SAMPLE_INTERVAL_MS / 1000.0)
+            if not sampler.start():
+                sampler = None
+        profile_path = os.path.join(config.PROFILE_DIR, f"{rid}.folded") if sampler is not None else None
+        response = {"status": 500, "complete": False}
+
+        async def send_instrumented(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+                response_headers = MutableHeaders(scope=message)
+                response_headers["X-Request-ID"] = rid
+                if profile_path:
+                    response_headers["X-Profile-Path"] = profile_path
+            elif message["type"] == "http.response.body" and not message.get("more_body", False):
+                response["complete"] = True
+            await send(message)
+
+        rid_token = request_id.set(rid)
+        spans = {}
+        spans_token = request_spans.set(spans)
+        start = time.perf_counter()
+        failed = False
+        try:
+            await self.app(scope, receive, send_instrumented)
+        except BaseException as e:
+            # Cancellation means the client or server went away, not a handler error
+            failed = not isinstance(e, anyio.get_cancelled_exc_class())
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            request_spans.reset(spans_token)
+            request_id.reset(rid_token)
+            disconnected = not failed and not response["complete"]
+            status = 500 if failed else 499 if disconnected else response["status"]
+            # Runs even when the request task is being cancelled
+            with anyio.CancelScope(shield=True):
+                await self._finish(scope, rid, status, disconnected, elapsed, spans, sampler, profile_path)
+
+    @staticmethod
+    async def _finish(scope, rid: str, status: int, disconnected: bool, elapsed: float, spans: Dict[str, float],
+                      sampler: Optional[StackSampler], profile_path: Optional[str]):
+        handler = getattr(scope.get("endpoint"), "__name__", "unmatched")
+        metrics.observe("nda_http_request_seconds", elapsed, handler=handler, method=scope["method"],
+                        status=str(status))
+        if sampler is not None:
+            sampler.stop()
+            await asyncio.get_running_loop().run_in_executor(None, sampler.save, profile_path)
+        if config.JSON_LOGS:
+            request_log.info(json.dumps({
+                "timestamp": time.time(),
+                "request_id": rid,
+                "method": scope["method"],
+                "path": scope["path"],
+                "handler": handler,
+                "status": status,
+                "seconds": round(elapsed, 6),
+                "spans": {stage: round(seconds, 6) for stage, seconds in spans.items()},
+                **({"disconnected": True} if disconnected else {}),
+                **({"profile": profile_path} if profile_path else {}),
+            }))
+
+app.add_middleware(InstrumentRequests)
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -19,15 +154,113 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Bounded pools for blocking model, docx and training work
+model_pool = WorkerPool("model", max_workers=config.MODEL_WORKERS,
+                        max_queue=config.MODEL_QUEUE, retry_after=config.RETRY_AFTER_SECONDS)
+document_pool = WorkerPool("documents", kind=config.DOCUMENT_POOL_KIND, max_workers=config.DOCUMENT_WORKERS,
+                           max_queue=config.DOCUMENT_QUEUE, retry_after=config.RETRY_AFTER_SECONDS)
+training_pool = WorkerPool("training", max_workers=config.TRAINING_WORKERS,
+                           max_queue=config.TRAINING_QUEUE, retry_after=config.RETRY_AFTER_SECONDS)
+# Each batch drives its own process pool from one of these threads
+batch_pool = WorkerPool("batch", max_workers=config.BATCH_JOB_CONCURRENCY, max_queue=0,
+                        retry_after=config.RETRY_AFTER_SECONDS)
+
+# Models are loaded once per process and shared between services
+model_registry = ModelRegistry()
+score_cache = ScoreCache(
+    max_entries=config.SCORE_CACHE_SIZE,
+    persist_path=config.SCORE_CACHE_PATH or None,
+    max_disk_entries=config.SCORE_CACHE_DISK_SIZE
+)
+
 # Initialize services
-document_service = DocumentService()
-ai_service = AIService()
-memory_service = MemoryService()
-training_service = TrainingService()
+document_service = DocumentService(pool=document_pool)
+ai_service = AIService(pool=model_pool, registry=model_registry, score_cache=score_cache)
+# Memory reuses the classifier's pooled vectors instead of embedding texts again
+memory_service = MemoryService(embed=ai_service.embed)
+training_service = TrainingService(registry=model_registry)
+pipeline = AnalysisPipeline(document_service, ai_service)
+# Files of documents with an analysis in memory stay until it is evicted
+retention = RetentionSweeper(memory_service, document_service, keep=ai_service.analysis_store)
+
+# Long-running work is submitted as jobs and polled through /jobs
+job_queue = JobQueue(JobStore(config.JOB_STORE_PATH))
+
+@metrics.collector
+def service_metrics():
+    caches = {
+        "scores": ai_service.score_cache.stats(),
+        "embeddings": ai_service.embedding_cache.stats(),
+        "documents": document_service.cache_stats(),
+        "analyses": ai_service.analysis_store.stats(),
+    }
+    for cache, stats in caches.items():
+        yield "nda_cache_hits_total", "counter", {"cache": cache}, stats["hits"] + stats.get("disk_hits", 0)
+        yield "nda_cache_misses_total", "counter", {"cache": cache}, stats["misses"]
+    for role, scheduler in (("classifier", ai_service.scheduler), ("validator", ai_service.validation_scheduler)):
+        yield "nda_scheduler_queue_depth", "gauge", {"role": role}, scheduler.stats()["queue_depth"]
+    for pool in (model_pool, document_pool, training_pool, batch_pool):
+        stats = pool.stats()
+        yield "nda_pool_active", "gauge", {"pool": pool.name}, stats["active"]
+        yield "nda_pool_waiting", "gauge", {"pool": pool.name}, stats["waiting"]
+        yield "nda_pool_rejected_total", "counter", {"pool": pool.name}, stats["rejected"]
+    for kind, stats in job_queue.stats()["kinds"].items():
+        yield "nda_jobs_running", "gauge", {"kind": kind}, stats["running"]
+        yield "nda_jobs_queued", "gauge", {"kind": kind}, stats["queued"]
+    yield "nda_memory_writes_pending", "gauge", {}, memory_service.stats()["pending"]
+
+@app.exception_handler(ServerBusyError)
+async def server_busy_handler(request: Request, exc: ServerBusyError):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(exc.retry_after)}
+    )
+
+startup_log = logging.getLogger("nda.startup")
+# The background warmup and, if it raised, its error for /ready
+warmup_state: Dict[str, Any] = {"future": None, "error": None}
+
+def _warmup_done(future: asyncio.Future):
+    if future.cancelled() or future.exception() is None:
+        return
+    error = future.exception()
+    warmup_state["error"] = f"{type(error).__name__}: {error}"
+    startup_log.error("Model warmup failed", exc_info=error)
+
+@app.on_event("startup")
+async def warmup_models():
+    # Load weights in the background; /ready reports when serving can start
+    if config.WARMUP_ON_STARTUP:
+        warmup_state["future"] = asyncio.get_running_loop().run_in_executor(None, ai_service.warmup)
+        warmup_state["future"].add_done_callback(_warmup_done)
+    else:
+        model_registry.warmup([])
+
+@app.on_event("startup")
+async def resume_jobs():
+    job_queue.resume()
+
+@app.on_event("startup")
+async def start_retention():
+    retention.start()
+
+@app.on_event("shutdown")
+async def flush_memory():
+    await retention.stop()
+    await memory_service.close()
+
+@app.on_event("shutdown")
+def shutdown_pools():
+    job_queue.shutdown()
+    for pool in (model_pool, document_pool, training_pool, batch_pool):
+        pool.shutdown()
 
 class Feedback(BaseModel):
     document_id: str
     feedback_text: str
+    # Paragraph indices the feedback is about; inferred from the text when omitted
+    paragraph_indices: Optional[List[int]] = None
 
 class TrainingData(BaseModel):
     original_docs: List[str]
@@ -37,83 +270,299 @@ class TrainingData(BaseModel):
 @app.post("/upload")
 async def upload_document(file: UploadFile = File(...)):
     try:
-        document_id = await document_service.parse_document(file)
+        with metrics.span("upload"):
+            document_id = await document_service.parse_document(file)
         return {"document_id": document_id}
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ServerBusyError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 @app.post("/analyze/{document_id}")
 async def analyze_document(document_id: str):
     try:
-        document = await document_service.get_document(document_id)
-        analysis = await ai_service.check_document(document)
-        suggestions = await ai_service.make_suggestions(analysis)
-        validated_suggestions = await ai_service.validate_suggestions(suggestions)
-        redline_doc = await document_service.create_redline_document(document, validated_suggestions)
-        return {"redline_document_id": redline_doc}
+        return await pipeline.run(document_id)
+    except ServerBusyError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+@app.get("/analyze/{document_id}/stream")
+async def stream_analysis(document_id: str, request: Request):
+    try:
+        document_service.resolve_document_path(document_id)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return event_stream_response(
+        request,
+        pipeline.stream(document_id),
+        ndjson=wants_ndjson(request),
+        keepalive_seconds=config.STREAM_KEEPALIVE_SECONDS,
+        max_buffered=config.STREAM_MAX_BUFFERED_EVENTS
+    )
+
 @app.post("/feedback")
 async def process_feedback(feedback: Feedback):
     try:
-        interpreted_feedback = await ai_service.interpret_feedback(feedback.feedback_text)
+        with metrics.span("interpret_feedback"):
+            interpreted_feedback = await ai_service.interpret_feedback(feedback.feedback_text)
         await memory_service.save_feedback(feedback.document_id, interpreted_feedback)
-        new_suggestions = await ai_service.adjust_suggestions(feedback.document_id, interpreted_feedback)
-        redline_doc = await document_service.create_redline_document(
-            await document_service.get_document(feedback.document_id),
-            new_suggestions
-        )
-        return {"redline_document_id": redline_doc}
+        with metrics.span("parse"):
+            document = await document_service.get_document(feedback.document_id)
+        with metrics.span("adjust"):
+            changes = await ai_service.adjust_suggestions(
+                document, interpreted_feedback, feedback.paragraph_indices
+            )
+        with metrics.span("render"):
+            redline_doc = await document_service.update_redline_document(document, changes)
+        return {"redline_document_id": redline_doc, "updated_paragraphs": sorted(changes)}
+    except ServerBusyError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+@app.get("/feedback/stats")
+async def feedback_statistics(document_id: Optional[str] = None):
+    return await memory_service.get_feedback_statistics(document_id)
+
+@app.post("/feedback/stats/rebuild")
+async def rebuild_feedback_statistics():
+    return await memory_service.rebuild_feedback_statistics()
+
+@app.post("/retention/sweep")
+async def sweep_expired():
+    return await retention.sweep()
+
+@app.get("/retention/stats")
+async def retention_stats():
+    return retention.stats()
+
 @app.post("/accept/{document_id}")
 async def accept_suggestions(document_id: str):
     try:
         clean_doc = await document_service.create_clean_document(document_id)
-        return {"clean_document_id": clean_doc}
+        # Accepted suggestions become precedents for later analyses
+        analysis = ai_service.analysis_store.get(document_service.upload_for(document_id))
+        added = 0
+        if analysis is not None:
+            with metrics.span("index_precedents"):
+                added = await ai_service.add_precedents(
+                    [(entry["text"], entry["suggestion"]) for entry in analysis.paragraphs.values()],
+                    document_id=analysis.document_id
+                )
+        return {"clean_document_id": clean_doc, "precedents_added": added}
+    except ServerBusyError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 @app.get("/download/{document_id}")
-async def download_document(document_id: str):
+async def download_document(document_id: str, request: Request):
     try:
-        return await document_service.return_document(document_id)
+        file_path = document_service.resolve_document_path(document_id)
+        return file_response(request, file_path, os.path.basename(file_path))
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
-@app.post("/train")
+def _run_training(training_data: Dict[str, List[str]], job: Job):
+    job.stage("prepare")
+    texts, labels = training_service.prepare_training_data(
+        training_data["original_docs"],
+        training_data["redline_docs"],
+        training_data["clean_docs"]
+    )
+    # Read before anything else can prepare a corpus on the shared service
+    accepted_pairs = list(training_service.accepted_pairs)
+    
+    # Train the model; cancelling the job aborts at the next step
+    job.stage("train")
+    model_dir = training_service.train_model(
+        texts, labels, callbacks=[TrainingProgressCallback(job.advance)]
+    )
+    
+    # Evaluate the model
+    job.stage("evaluate")
+    evaluation_results = training_service.evaluate_model(output_dir=model_dir)  # Held-out split saved with the model
+    
+    return {
+        "model_dir": model_dir,
+        "evaluation_results": evaluation_results,
+        "num_training_samples": len(texts),
+        "accepted_pairs": accepted_pairs
+    }
+
+async def _analyze_job(job: Job):
+    return await pipeline.run(job.params["document_id"], on_stage=job.stage)
+
+async def _train_job(job: Job):
+    result = await training_pool.run(_run_training, job.params, job)
+    # The clean versions of the training set are accepted revisions too
+    job.stage("index")
+    accepted_pairs = result.pop("accepted_pairs")
+    result["precedents_added"] = await ai_service.add_precedents(accepted_pairs, source="training")
+    return result
+
+def _run_batch(params: Dict[str, Any], job: Job):
+    batch_dir = os.path.join(config.BATCH_DIR, params["batch_id"])
+    job.stage("collect")
+    paths = collect_documents(params["source"], os.path.join(batch_dir, "input"))
+    job.stage("analyze", len(paths))
+    # Workers serve what this process serves now, including a model installed with /load-model
+    return run_batch(paths, os.path.join(batch_dir, "output"), workers=min(params["workers"], config.BATCH_MAX_WORKERS),
+                     documents_dir=document_service.documents_dir, on_file=job.advance,
+                     model_dir=ai_service.serving["classifier"].model_dir, cascade_path=ai_service.cascade_path)
+
+async def _batch_job(job: Job):
+    return await batch_pool.run(_run_batch, job.params, job)
+
+job_queue.register("analyze", _analyze_job, ANALYSIS_STAGES, config.ANALYZE_JOB_CONCURRENCY)
+# One at a time: every job fine-tunes the same cached training model
+job_queue.register("train", _train_job, ("prepare", "train", "evaluate", "index"), 1)
+job_queue.register("batch", _batch_job, ("collect", "analyze"), config.BATCH_JOB_CONCURRENCY)
+
+@app.post("/train", status_code=202)
 async def train_model(training_data: TrainingData):
+    job_id = job_queue.submit("train", training_data.model_dump())
+    return {"job_id": job_id}
+
+@app.post("/jobs/analyze/{document_id}", status_code=202)
+async def submit_analysis(document_id: str):
     try:
-        # Prepare training data
-        texts, labels = training_service.prepare_training_data(
-            training_data.original_docs,
-            training_data.redline_docs,
-            training_data.clean_docs
-        )
-        
-        # Train the model
-        model_dir = training_service.train_model(texts, labels)
-        
-        # Evaluate the model
-        evaluation_results = training_service.evaluate_model(texts[-100:], labels[-100:])  # Use last 100 samples for evaluation
-        
-        return {
-            "model_dir": model_dir,
-            "evaluation_results": evaluation_results,
-            "num_training_samples": len(texts)
-        }
-    except Exception as e:
+        document_service.resolve_document_path(document_id)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    return {"job_id": job_queue.submit("analyze", {"document_id": document_id})}
+
+@app.post("/analyze-batch", status_code=202)
+async def analyze_batch(file: Optional[UploadFile] = File(None), directory: Optional[str] = Form(None),
+                        workers: int = Form(config.BATCH_WORKERS)):
+    """Queue a batch over an uploaded zip or a directory under the batch input root."""
+    # Every worker process loads its own copy of the models
+    if not 1 <= workers <= config.BATCH_MAX_WORKERS:
+        raise HTTPException(status_code=400, detail=f"workers must be between 1 and {config.BATCH_MAX_WORKERS}")
+    batch_id = uuid.uuid4().hex
+    batch_dir = os.path.join(config.BATCH_DIR, batch_id)
+    
+    if file is not None:
+        source = os.path.join(batch_dir, "input.zip")
+        try:
+            # Copied in one executor call, off the event loop
+            saved = await asyncio.get_running_loop().run_in_executor(None, _save_archive, file.file, source)
+            if not saved:
+                raise HTTPException(status_code=413, detail="Batch archive is too large")
+        except BaseException:
+            # Nothing will ever refer to a batch that was not queued
+            shutil.rmtree(batch_dir, ignore_errors=True)
+            raise
+    elif directory is not None:
+        root = os.path.realpath(config.BATCH_INPUT_DIR)
+        source = os.path.realpath(os.path.join(root, directory))
+        if os.path.commonpath([root, source]) != root or not os.path.isdir(source):
+            raise HTTPException(status_code=400, detail=f"{directory} is not a directory under the batch input root")
+    else:
+        raise HTTPException(status_code=400, detail="Provide a zip file or a directory")
+    
+    job_id = job_queue.submit("batch", {"batch_id": batch_id, "source": source, "workers": workers})
+    return {"job_id": job_id, "batch_id": batch_id}
+
+def _save_archive(upload, path: str) -> bool:
+    """Copy an uploaded batch archive to ``path``; False if it exceeds the size limit."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    size = 0
+    with open(path, "wb") as f:
+        while chunk := upload.read(config.UPLOAD_CHUNK_BYTES):
+            size += len(chunk)
+            if size > config.BATCH_MAX_UPLOAD_BYTES:
+                return False
+            f.write(chunk)
+    return True
+
+@app.get("/jobs")
+async def list_jobs(kind: Optional[str] = None, status: Optional[str] = None, limit: int = 100):
+    return job_queue.list(kind, status, limit)
+
+@app.get("/jobs/stats")
+async def job_stats():
+    return job_queue.stats()
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return job
+
+@app.delete("/jobs/{job_id}")
+async def cancel_job(job_id: str):
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    if job["status"] in FINISHED or not job_queue.cancel(job_id):
+        raise HTTPException(status_code=409, detail=f"Job {job_id} is already {job['status']}")
+    return {"job_id": job_id, "status": "cancelling"}
 
 @app.post("/load-model")
 async def load_trained_model(model_dir: str):
     try:
+        # Read from disk once, on a model pool slot; analyses keep running on the old model meanwhile
+        loaded = await model_pool.run(ai_service.serving["classifier"].load, model_dir)
+        # Warmup and draining wait on scoring batches, so they must not hold a model pool slot
+        swap = await asyncio.get_running_loop().run_in_executor(
+            None, functools.partial(ai_service.swap_model, model_dir, loaded=loaded)
+        )
         training_service.load_trained_model(model_dir)
-        return {"status": "Model loaded successfully"}
+        return {"status": "Model loaded successfully", **swap}
+    except ServerBusyError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+@app.get("/ready")
+async def readiness():
+    if warmup_state["error"] is not None:
+        # Never becomes ready on its own; the process needs a restart
+        return JSONResponse(status_code=503, content={"ready": False, "error": warmup_state["error"]})
+    if not model_registry.ready:
+        return JSONResponse(status_code=503, content={"ready": False})
+    return {"ready": True}
+
+@app.get("/models")
+async def model_stats():
+    return {**model_registry.stats(), "serving": ai_service.serving_stats()}
+
+@app.get("/cascade/stats")
+async def cascade_stats():
+    return ai_service.cascade_stats()
+
+@app.get("/cache/stats")
+async def cache_stats():
+    return {
+        "scores": ai_service.cache_stats(),
+        "documents": document_service.cache_stats(),
+        "analyses": ai_service.analysis_store.stats(),
+        "embeddings": ai_service.embedding_cache.stats(),
+        "precedents": ai_service.precedent_index.stats(),
+        "memory_writes": memory_service.stats()
+    }
+
+@app.get("/metrics")
+async def prometheus_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/scheduler/stats")
+async def scheduler_stats():
+    return {
+        **ai_service.scheduler_stats(),
+        "pools": {pool.name: pool.stats() for pool in (model_pool, document_pool, training_pool, batch_pool)}
+    }
+
 if __name__ == "__main__":
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True) 
\ No newline at end of file
@@ -1,85 +1,337 @@
-from transformers import AutoTokenizer, AutoModelForSequenceClassification
+import asyncio
 import torch
-from typing import Dict, Any, List
+from typing import AsyncIterator, Dict, Any, List, Optional, Tuple
 import numpy as np
-from docx import Document
+import os
+from services import config
+from services.analysis_store import AnalysisStore, DocumentAnalysis
+from services.batch_scheduler import BatchScheduler
+from services.cascade import CascadeClassifier, BENIGN, UNCERTAIN
+from services.clause_matcher import ClauseMatcher
+from services.metrics import BATCH_SIZE_BUCKETS, metrics
+from services.model_registry import LoadedModel, ModelRegistry
+from services.parsed_document import ParsedDocument, ParsedParagraph
+from services.precedent_index import PrecedentIndex
+from services.paragraph_extraction import file_hash
+from services.score_cache import ScoreCache
+from services.serving import ServingModel
+from services.worker_pool import WorkerPool
 
 class AIService:
-    def __init__(self):
-        self.model_name = "nlpaueb/legal-bert-base-uncased"
-        self.tokenizer = AutoTokenizer.from_pretrained(self.model_name)
-        self.model = AutoModelForSequenceClassification.from_pretrained(self.model_name)
-        self.validation_model = AutoModelForSequenceClassification.from_pretrained(self.model_name)
-        
-        # Define problematic clause patterns
-        self.problematic_patterns = [
-            "confidentiality",
-            "non-disclosure",
-            "intellectual property",
-            "termination",
-            "liability",
-            "warranty",
-            "indemnification"
-        ]
-
-    async def check_document(self, document: Document) -> Dict[str, Any]:
+    def __init__(self, batch_size: int = config.INFERENCE_BATCH_SIZE,
+                 pool: Optional[WorkerPool] = None,
+                 registry: Optional[ModelRegistry] = None,
+                 score_cache: Optional[ScoreCache] = None,
+                 analysis_store: Optional[AnalysisStore] = None,
+                 precedent_index: Optional[PrecedentIndex] = None,
+                 classifier_dir: Optional[str] = None):
+        self.model_name = config.MODEL_NAME
+        self.batch_size = batch_size
+        self.backend = config.INFERENCE_BACKEND
+        # Weights are loaded lazily through the shared registry
+        self.registry = registry or ModelRegistry()
+        # Boilerplate clauses repeat across NDAs; reuse their scores
+        self.score_cache = score_cache or ScoreCache(max_entries=config.SCORE_CACHE_SIZE)
+        # Pooled vectors from recent forward passes, so memory writes never re-encode a text
+        self.embedding_cache = ScoreCache(max_entries=config.EMBEDDING_CACHE_SIZE)
+        # Per-paragraph results, so feedback rounds only redo what they touch
+        self.analysis_store = analysis_store or AnalysisStore(config.ANALYSIS_STORE_SIZE)
+        # Past original -> accepted clause revisions, searched for every flagged clause
+        self.precedent_index = precedent_index or PrecedentIndex(
+            path=config.PRECEDENT_INDEX_DIR or None,
+            nlist=config.PRECEDENT_NLIST,
+            nprobe=config.PRECEDENT_NPROBE,
+            min_train_size=config.PRECEDENT_MIN_TRAIN_SIZE
+        )
+        # Swappable serving pointers; a fine-tuned classifier replaces the base one at runtime
+        self.serving = {
+            role: ServingModel(self.registry, self.model_name, role, self.backend)
+            for role in ("classifier", "validator")
+        }
+        if classifier_dir:
+            # Loaded lazily like the base model, e.g. a batch worker serving the server's fine-tuned one
+            self.serving["classifier"].model_dir = classifier_dir
+        
+        # Concurrent requests share forward passes through one scheduler per model
+        self.scheduler = BatchScheduler(
+            lambda texts: self._score_batch("classifier", texts),
+            max_batch_size=config.SCHEDULER_MAX_BATCH_SIZE,
+            max_wait_ms=config.SCHEDULER_MAX_WAIT_MS,
+            pool=pool,
+            max_queue_depth=config.SCHEDULER_MAX_QUEUE_DEPTH,
+            retry_after=config.RETRY_AFTER_SECONDS
+        )
+        self.validation_scheduler = BatchScheduler(
+            lambda texts: self._score_batch("validator", texts),
+            max_batch_size=config.SCHEDULER_MAX_BATCH_SIZE,
+            max_wait_ms=config.SCHEDULER_MAX_WAIT_MS,
+            pool=pool,
+            max_queue_depth=config.SCHEDULER_MAX_QUEUE_DEPTH,
+            retry_after=config.RETRY_AFTER_SECONDS
+        )
+        
+        # Clause keywords per category, matched in a single pass per paragraph
+        self.clause_matcher = ClauseMatcher.from_file(config.CLAUSE_PATTERNS_PATH)
+        
+        # Optional cheap classifier that settles clear-cut paragraphs before legal-bert
+        self.cascade: Optional[CascadeClassifier] = None
+        self.cascade_version: Optional[str] = None
+        self.cascade_path: Optional[str] = None
+        self.cascade_counts = {
+            "paragraphs_screened": 0,
+            "skipped_benign": 0,
+            "accepted_by_cascade": 0,
+            "sent_to_transformer": 0
+        }
+        if config.CASCADE_MODEL_PATH and os.path.exists(config.CASCADE_MODEL_PATH):
+            self.load_cascade(config.CASCADE_MODEL_PATH)
+
+    def load_cascade(self, path: str):
+        """Load a trained cascade classifier with the configured thresholds."""
+        cascade = CascadeClassifier.load(path, config.CASCADE_LOW_THRESHOLD,
+                                         config.CASCADE_HIGH_THRESHOLD)
+        self.cascade_version = f"cascade-{file_hash(path)[:16]}"
+        self.cascade = cascade
+        self.cascade_path = path
+
+    def swap_model(self, model_dir: str, role: str = "classifier",
+                   loaded: Optional[LoadedModel] = None) -> Dict[str, Any]:
+        """Serve a (fine-tuned) model for ``role`` without stopping traffic.
+
+        The model (unless already ``loaded`` with ``self.serving[role].load``)
+        is loaded and warmed up on the calling thread while the old one keeps
+        serving; a cascade saved next to it is picked up as well.
+        """
+        swap = self.serving[role].swap(
+            model_dir,
+            warmup=lambda new: self._score_texts(new.backend, ["warmup"],
+                                                 self.registry.get_tokenizer(new.model_dir)),
+            drain_timeout=config.SWAP_DRAIN_TIMEOUT_SECONDS,
+            loaded=loaded,
+        )
+        cascade_path = os.path.join(model_dir, "cascade.joblib")
+        if role == "classifier" and os.path.exists(cascade_path):
+            self.load_cascade(cascade_path)
+        self._prune_scores()
+        return swap
+
+    @property
+    def model_version(self) -> str:
+        """Version of the classifier currently serving."""
+        return self.serving["classifier"].version
+
+    def serving_stats(self) -> Dict[str, Any]:
+        return {
+            **{role: serving.stats() for role, serving in self.serving.items()},
+            "cascade_version": self.cascade_version,
+        }
+
+    @property
+    def tokenizer(self):
+        return self.serving["classifier"].tokenizer
+
+    @property
+    def model(self):
+        return self._loaded("classifier").model
+
+    @property
+    def validation_model(self):
+        return self._loaded("validator").model
+
+    @property
+    def classifier_backend(self):
+        return self._loaded("classifier").backend
+
+    @property
+    def validation_backend(self):
+        return self._loaded("validator").backend
+
+    def _loaded(self, role: str):
+        return self.serving[role].current
+
+    def warmup(self):
+        """Load both models and run a forward pass through each."""
+        self.registry.warmup([(self.model_name, "classifier"), (self.model_name, "validator")],
+                             backend=self.backend)
+        self._score_batch("classifier", ["warmup"])
+        self._score_batch("validator", ["warmup"])
+        self._prune_scores()
+
+    def _prune_scores(self):
+        # Persisted scores of models no longer served can never be hit again
+        self.score_cache.prune(serving.version for serving in self.serving.values())
+
+    async def check_document(self, document: ParsedDocument) -> Dict[str, Any]:
         """Analyze the document for problematic clauses."""
-        analysis = {}
+        return await self.score_candidates(document, self.prefilter(document))
+
+    def prefilter(self, document: ParsedDocument) -> List[Tuple[ParsedParagraph, List[str]]]:
+        """Return the paragraphs that mention a clause category, with their categories."""
+        candidates = []
         
         for paragraph in document.paragraphs:
             if not paragraph.text.strip():
                 continue
                 
             # Check for problematic patterns
-            is_problematic = any(pattern in paragraph.text.lower() 
-                               for pattern in self.problematic_patterns)
+            categories = self.clause_matcher.match(paragraph.text)
             
-            if is_problematic:
-                # Get model prediction
-                inputs = self.tokenizer(paragraph.text, return_tensors="pt", 
-                                      truncation=True, max_length=512)
-                outputs = self.model(**inputs)
-                prediction = torch.softmax(outputs.logits, dim=1)
-                
-                analysis[paragraph.text] = {
-                    "is_problematic": True,
-                    "confidence": float(prediction[0][1]),
-                    "context": self._get_context(document, paragraph)
-                }
+            if categories:
+                candidates.append((paragraph, categories))
+        
+        return candidates
+
+    async def score_candidates(self, document: ParsedDocument,
+                               candidates: List[Tuple[ParsedParagraph, List[str]]]) -> Dict[str, Any]:
+        """Score prefiltered paragraphs with the cascade and legal-bert."""
+        analysis = {}
+        async for partial in self.iter_scores(document, candidates):
+            analysis.update(partial)
+        return dict(sorted(analysis.items()))
+
+    async def iter_scores(self, document: ParsedDocument,
+                          candidates: List[Tuple[ParsedParagraph, List[str]]],
+                          chunk_size: Optional[int] = None) -> AsyncIterator[Dict[str, Any]]:
+        """Score prefiltered paragraphs, yielding partial analyses as batches finish.
+
+        Analyses are keyed by paragraph index, so paragraphs with the same
+        text stay separate entries. Paragraphs the cascade settles come first. The rest are submitted to
+        the scheduler in chunks all at once, so they batch as usual, and each
+        chunk is yielded as soon as its scores are in.
+        """
+        chunk_size = chunk_size or config.SCHEDULER_MAX_BATCH_SIZE
+        texts = [paragraph.text for paragraph, _ in candidates]
+        if self.cascade is not None:
+            routes = self.cascade.route(texts)
+        else:
+            routes = [{"decision": UNCERTAIN, "score": None} for _ in texts]
         
-        return analysis
+        uncertain = [i for i, route in enumerate(routes) if route["decision"] == UNCERTAIN]
+        benign = sum(route["decision"] == BENIGN for route in routes)
+        self.cascade_counts["paragraphs_screened"] += len(texts)
+        self.cascade_counts["sent_to_transformer"] += len(uncertain)
+        self.cascade_counts["skipped_benign"] += benign
+        self.cascade_counts["accepted_by_cascade"] += len(texts) - len(uncertain) - benign
+        
+        settled = {}
+        for i, route in enumerate(routes):
+            if route["decision"] not in (BENIGN, UNCERTAIN):
+                paragraph, categories = candidates[i]
+                settled[paragraph.index] = self._analysis_entry(document, paragraph, categories,
+                                                               route["score"], "cascade", self.cascade_version)
+        if settled:
+            yield settled
+        
+        async def score_chunk(chunk: List[int]):
+            return chunk, await self._score(self.scheduler, "classifier", [texts[i] for i in chunk])
+        
+        tasks = [asyncio.ensure_future(score_chunk(uncertain[start:start + chunk_size]))
+                 for start in range(0, len(uncertain), chunk_size)]
+        try:
+            for next_chunk in asyncio.as_completed(tasks):
+                chunk, predictions = await next_chunk
+                yield {
+                    candidates[i][0].index: self._analysis_entry(document, candidates[i][0], candidates[i][1],
+                                                                probabilities[1], "transformer", version)
+                    for i, (version, probabilities) in zip(chunk, predictions)
+                }
+        finally:
+            # A consumer that stops early should not keep the model busy
+            for task in tasks:
+                task.cancel()
+
+    def _analysis_entry(self, document: ParsedDocument, paragraph: ParsedParagraph, categories: List[str],
+                        confidence: Optional[float], scored_by: str, model_version: Optional[str]) -> Dict[str, Any]:
+        return {
+            "text": paragraph.text,
+            "paragraph_index": paragraph.index,
+            "is_problematic": True,
+            "confidence": confidence,
+            "scored_by": scored_by,
+            "model_version": model_version,
+            "categories": categories,
+            "context": self._get_context(document, paragraph)
+        }
 
     async def make_suggestions(self, analysis: Dict[str, Any]) -> Dict[str, Any]:
-        """Generate suggestions for problematic clauses."""
+        """Generate suggestions for problematic clauses.
+
+        Precedents for all flagged clauses are fetched in one batched index
+        query; a close enough precedent supplies the suggested wording.
+        Suggestions keep the paragraph index keys of ``analysis``.
+        """
         suggestions = {}
+        flagged = [index for index, details in analysis.items() if details["is_problematic"]]
+        precedents = dict(zip(flagged, await self.find_precedents([analysis[index]["text"] for index in flagged])))
         
-        for clause, details in analysis.items():
-            if details["is_problematic"]:
-                # Generate suggestion based on the clause and context
-                suggestion = self._generate_suggestion(clause, details["context"])
-                suggestions[clause] = {
-                    "suggestion": suggestion,
-                    "confidence": details["confidence"]
-                }
+        for index in flagged:
+            details = analysis[index]
+            # Generate suggestion based on the clause, context and precedents
+            suggestion = self._generate_suggestion(details["text"], details["context"], precedents=precedents[index])
+            suggestions[index] = {
+                "text": details["text"],
+                "suggestion": suggestion,
+                "precedents": precedents[index],
+                "confidence": details["confidence"],
+                "model_version": details.get("model_version"),
+                "paragraph_index": details["paragraph_index"],
+                "categories": details["categories"],
+                "context": details["context"]
+            }
         
         return suggestions
 
+    async def find_precedents(self, clauses: List[str], k: int = config.PRECEDENT_TOP_K) -> List[List[Dict[str, Any]]]:
+        """Return the ``k`` most similar past revisions of each clause, best first."""
+        if not clauses or not len(self.precedent_index):
+            return [[] for _ in clauses]
+        with metrics.span("embed"):
+            vectors = await self.embed(clauses)
+        with metrics.span("precedent_search"):
+            return await asyncio.get_running_loop().run_in_executor(None, self.precedent_index.search, vectors, k)
+
+    async def add_precedents(self, pairs: List[Tuple[str, str]], document_id: Optional[str] = None,
+                             source: str = "accepted") -> int:
+        """Index (original clause, accepted clause) pairs; returns how many were new.
+
+        Pairs that left the clause unchanged or kept the fallback wording teach
+        nothing and are skipped. Vectors come from the classifier serving now.
+        """
+        pairs = [(original, accepted) for original, accepted in pairs
+                 if original.strip() and accepted.strip() and original != accepted
+                 and not self._is_placeholder(original, accepted)]
+        added = 0
+        loop = asyncio.get_running_loop()
+        # Chunked so a large training corpus never overflows the scheduler queue
+        for start in range(0, len(pairs), config.SCHEDULER_MAX_BATCH_SIZE):
+            chunk = pairs[start:start + config.SCHEDULER_MAX_BATCH_SIZE]
+            vectors = await self.embed([original for original, _ in chunk])
+            version = self.model_version
+            entries = [{"original": original, "accepted": accepted, "document_id": document_id,
+                        "source": source, "model_version": version} for original, accepted in chunk]
+            added += await loop.run_in_executor(None, self.precedent_index.add, vectors, entries)
+        return added
+
     async def validate_suggestions(self, suggestions: Dict[str, Any]) -> Dict[str, Any]:
-        """Validate suggestions using a second model."""
+        """Validate suggestions using a second model; keys are passed through unchanged."""
         validated_suggestions = {}
         
-        for clause, details in suggestions.items():
-            # Validate the suggestion
-            inputs = self.tokenizer(details["suggestion"], return_tensors="pt",
-                                  truncation=True, max_length=512)
-            outputs = self.validation_model(**inputs)
-            validation_score = float(torch.softmax(outputs.logits, dim=1)[0][1])
+        keys = list(suggestions.keys())
+        with metrics.span("validate_suggestions"):
+            predictions = await self._score(
+                self.validation_scheduler, "validator",
+                [suggestions[key]["suggestion"] for key in keys]
+            )
+        
+        for key, (_, probabilities) in zip(keys, predictions):
+            details = suggestions[key]
+            validation_score = probabilities[1]
             
             if validation_score > 0.7:  # High confidence threshold
-                validated_suggestions[clause] = details
+                validated_suggestions[key] = details
             else:
                 # If validation fails, keep original suggestion but mark it
-                validated_suggestions[clause] = {
+                validated_suggestions[key] = {
                     **details,
                     "needs_review": True
                 }
@@ -88,13 +340,8 @@ class AIService:
 
     async def interpret_feedback(self, feedback: str) -> Dict[str, Any]:
         """Interpret user feedback and extract key points."""
-        # Tokenize and analyze feedback
-        inputs = self.tokenizer(feedback, return_tensors="pt",
-                              truncation=True, max_length=512)
-        outputs = self.model(**inputs)
-        
         # Extract sentiment and key points
-        sentiment = float(torch.softmax(outputs.logits, dim=1)[0][1])
+        sentiment = (await self._score(self.scheduler, "classifier", [feedback]))[0][1][1]
         
         return {
             "sentiment": sentiment,
@@ -102,37 +349,249 @@ class AIService:
             "key_points": self._extract_key_points(feedback)
         }
 
-    async def adjust_suggestions(self, document_id: str, feedback: Dict[str, Any]) -> Dict[str, Any]:
-        """Adjust suggestions based on user feedback."""
-        # Implementation would depend on the specific feedback and document context
-        # This is a placeholder for the actual implementation
-        return {}
+    async def adjust_suggestions(self, document: ParsedDocument, feedback: Dict[str, Any],
+                                 paragraph_indices: Optional[List[int]] = None) -> Dict[int, str]:
+        """Apply feedback to the stored analysis of a document.
+
+        Only the paragraphs the feedback touches get a new suggestion, and only
+        suggestions whose text actually changed are validated again. Returns
+        the changed suggestions keyed by paragraph index, which is exactly the
+        part of the redline that has to be regenerated. Without a stored
+        analysis the full pipeline runs once and every suggestion is returned.
+        """
+        analysis = self.analysis_store.get(document.document_id)
+        if analysis is None:
+            validated = await self.validate_suggestions(
+                await self.make_suggestions(await self.check_document(document))
+            )
+            analysis = self.analysis_store.put(document.document_id, validated, self.model_version)
+            touched, rerun = list(analysis.paragraphs), True
+        else:
+            touched, rerun = self._touched_paragraphs(analysis, feedback, paragraph_indices), False
+        
+        analysis.feedback_rounds += 1
+        changed = {}
+        for index in sorted(touched):
+            entry = analysis.paragraphs[index]
+            entry["feedback"].extend(feedback["key_points"])
+            suggestion = self._generate_suggestion(entry["text"], entry["context"], entry["feedback"],
+                                                   entry.get("precedents"))
+            if rerun or suggestion != entry["suggestion"]:
+                changed[index] = entry
+            entry["suggestion"] = suggestion
+        
+        # Validation depends only on the suggestion text, so unchanged ones keep their result
+        validated = await self.validate_suggestions(changed)
+        for index, details in validated.items():
+            entry = analysis.paragraphs[index]
+            entry.pop("needs_review", None)
+            entry.update(details)
+        
+        return {index: entry["suggestion"] for index, entry in changed.items()}
+
+    def _touched_paragraphs(self, analysis: DocumentAnalysis, feedback: Dict[str, Any],
+                            paragraph_indices: Optional[List[int]] = None) -> List[int]:
+        """Pick the flagged paragraphs a feedback round applies to.
+
+        Explicit paragraph indices win; otherwise paragraphs sharing a clause
+        category with the feedback text. Feedback that names no category
+        applies to every flagged paragraph.
+        """
+        if paragraph_indices:
+            return [index for index in paragraph_indices if index in analysis.paragraphs]
+        
+        categories = set(self.clause_matcher.match(feedback["feedback_text"]))
+        if categories:
+            return [index for index, entry in analysis.paragraphs.items()
+                    if categories.intersection(entry["categories"])]
+        return list(analysis.paragraphs)
+
+    def cascade_stats(self) -> Dict[str, Any]:
+        """Return how many paragraphs the cascade kept away from legal-bert."""
+        screened = self.cascade_counts["paragraphs_screened"]
+        skipped = screened - self.cascade_counts["sent_to_transformer"]
+        return {
+            **self.cascade_counts,
+            "enabled": self.cascade is not None,
+            "low_threshold": self.cascade.low if self.cascade else None,
+            "high_threshold": self.cascade.high if self.cascade else None,
+            "transformer_skip_fraction": skipped / screened if screened else 0.0
+        }
+
+    def cache_stats(self) -> Dict[str, Any]:
+        return self.score_cache.stats()
 
-    def _get_context(self, document: Document, paragraph) -> List[str]:
+    def scheduler_stats(self) -> Dict[str, Any]:
+        """Return queue depth and batch size statistics for both models."""
+        return {
+            "model": self.scheduler.stats(),
+            "validation_model": self.validation_scheduler.stats()
+        }
+
+    async def _score(self, scheduler: BatchScheduler, role: str,
+                     texts: List[str]) -> List[Tuple[str, List[float]]]:
+        """Score texts with the model for role, going through the score cache.
+
+        Returns (model version, class probabilities) per text. A swap can land
+        while texts wait in the scheduler, so the version is the one of the
+        model that actually scored each text.
+        """
+        if not texts:
+            return []
+        
+        version = self.serving[role].version
+        cached, missing = await self.score_cache.get_many_async(texts, version)
+        results = {i: (version, scores) for i, scores in cached.items()}
+        
+        if missing:
+            # Identical paragraphs within one request are scored once
+            unique_texts = list(dict.fromkeys(texts[i] for i in missing))
+            scored = await scheduler.submit(unique_texts)
+            self._cache_scores(unique_texts, scored)
+            by_text = {text: (scored_version, scores) for text, (scored_version, scores, _)
+                       in zip(unique_texts, scored)}
+            for i in missing:
+                results[i] = by_text[texts[i]]
+        
+        return [results[i] for i in range(len(texts))]
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        """Return the pooled legal-bert vector of each text from the serving classifier.
+
+        Vectors of texts scored recently are kept from that forward pass; the
+        rest are scored once through the scheduler, which caches their scores
+        as well. Vectors from before a model swap are not reused.
+        """
+        if not texts:
+            return []
+        
+        version = self.serving["classifier"].version
+        found, missing = self.embedding_cache.get_many(texts, version)
+        if missing:
+            unique_texts = list(dict.fromkeys(texts[i] for i in missing))
+            scored = await self.scheduler.submit(unique_texts)
+            self._cache_scores(unique_texts, scored)
+            by_text = {text: vector for text, (_, _, vector) in zip(unique_texts, scored)}
+            for i in missing:
+                found[i] = by_text[texts[i]]
+        
+        if any(found[i] is None for i in range(len(texts))):
+            raise RuntimeError(f"The {self.backend} backend does not return embeddings")
+        return [found[i].tolist() for i in range(len(texts))]
+
+    def _cache_scores(self, texts: List[str], scored: List[Tuple[str, List[float], Any]]):
+        by_version: Dict[str, Tuple[List[str], List[List[float]]]] = {}
+        for text, (version, scores, _) in zip(texts, scored):
+            group = by_version.setdefault(version, ([], []))
+            group[0].append(text)
+            group[1].append(scores)
+        for version, (group_texts, group_scores) in by_version.items():
+            self.score_cache.put_many(group_texts, group_scores, version)
+
+    def _score_batch(self, role: str, texts: List[str]) -> List[Tuple[str, List[float], Optional[np.ndarray]]]:
+        """Score one scheduler batch on the model serving ``role``, pinned until it finishes.
+
+        Returns (model version, class probabilities, pooled embedding) per text.
+        """
+        with self.serving[role].acquire() as loaded:
+            # Only classifier vectors are reused, for memory writes
+            scores, embeddings = self._forward(loaded.backend, texts, self.registry.get_tokenizer(loaded.model_dir),
+                                               with_embeddings=role == "classifier")
+        if embeddings[0] is not None:
+            self.embedding_cache.put_many(texts, embeddings, loaded.version)
+        metrics.inc("nda_paragraphs_scored_total", len(texts), role=role)
+        metrics.observe("nda_batch_size", len(texts), BATCH_SIZE_BUCKETS, role=role)
+        return [(loaded.version, probabilities, vector) for probabilities, vector in zip(scores, embeddings)]
+
+    def _score_texts(self, backend, texts: List[str], tokenizer=None) -> List[List[float]]:
+        """Return softmax class probabilities for each text."""
+        return self._forward(backend, texts, tokenizer, with_embeddings=False)[0]
+
+    def _forward(self, backend, texts: List[str], tokenizer=None,
+                 with_embeddings: bool = True) -> Tuple[List[List[float]], List[Optional[np.ndarray]]]:
+        """Return softmax class probabilities and pooled embeddings for each text.
+
+        Embeddings come from the same forward pass as the scores.
+        Texts are tokenized once, sorted by token length and run in fixed-size
+        batches padded only to the longest member of each batch, so short
+        clauses do not pay for long ones. Results come back in input order;
+        embeddings are None for backends that do not produce them.
+        """
+        if not texts:
+            return [], []
+        
+        tokenizer = tokenizer or self.tokenizer
+        with metrics.span("tokenize"):
+            encodings = tokenizer(texts, truncation=True, max_length=config.MAX_SEQUENCE_LENGTH)
+        order = sorted(range(len(texts)), key=lambda i: len(encodings["input_ids"][i]))
+        results: List[List[float]] = [None] * len(texts)
+        embeddings: List[Optional[np.ndarray]] = [None] * len(texts)
+        
+        with torch.inference_mode():
+            for start in range(0, len(order), self.batch_size):
+                batch_indices = order[start:start + self.batch_size]
+                features = [{key: encodings[key][i] for key in encodings.keys()}
+                            for i in batch_indices]
+                inputs = tokenizer.pad(features, return_tensors="pt")
+                with metrics.span("forward"):
+                    if with_embeddings:
+                        logits, pooled = backend.predict(inputs)
+                    else:
+                        logits, pooled = backend.predict_logits(inputs), None
+                probabilities = torch.softmax(logits, dim=1).tolist()
+                for i, probs in zip(batch_indices, probabilities):
+                    results[i] = probs
+                if pooled is not None:
+                    # float32 rows take a tenth of the memory of Python float lists
+                    for i, vector in zip(batch_indices, pooled.float().numpy()):
+                        embeddings[i] = vector
+        
+        return results, embeddings
+
+    def _get_context(self, document: ParsedDocument, paragraph: ParsedParagraph) -> List[str]:
         """Get surrounding context for a paragraph."""
         context = []
-        current_paragraph = paragraph
         
         # Get previous paragraph
-        if current_paragraph._element.getprevious() is not None:
-            prev_para = current_paragraph._element.getprevious()
-            if prev_para.text.strip():
-                context.append(prev_para.text)
+        prev_para = paragraph.previous
+        if prev_para is not None and prev_para.text.strip():
+            context.append(prev_para.text)
         
         # Get next paragraph
-        if current_paragraph._element.getnext() is not None:
-            next_para = current_paragraph._element.getnext()
-            if next_para.text.strip():
-                context.append(next_para.text)
+        next_para = paragraph.next
+        if next_para is not None and next_para.text.strip():
+            context.append(next_para.text)
         
         return context
 
-    def _generate_suggestion(self, clause: str, context: List[str]) -> str:
-        """Generate a suggestion for a problematic clause."""
-        # This is a simplified version - in practice, this would use more sophisticated
-        # language generation techniques
+    def _generate_suggestion(self, clause: str, context: List[str],
+                             feedback: Optional[List[str]] = None,
+                             precedents: Optional[List[Dict[str, Any]]] = None) -> str:
+        """Generate a suggestion for a problematic clause.
+
+        Uses the accepted wording of the closest past revision when it is
+        similar enough; otherwise falls back to a placeholder revision.
+        Feedback means the reviewer has seen that wording and asked for
+        changes, so precedents are skipped and the revision names the
+        feedback points it has to address.
+        """
+        if not feedback:
+            for precedent in precedents or []:
+                if precedent["similarity"] >= config.PRECEDENT_MIN_SIMILARITY and precedent["accepted"] != clause:
+                    return precedent["accepted"]
+        return self._fallback_suggestion(clause, feedback)
+
+    @staticmethod
+    def _fallback_suggestion(clause: str, feedback: Optional[List[str]] = None) -> str:
+        if feedback:
+            # Repeated points from several rounds are listed once
+            return f"Suggested revision (addressing: {'; '.join(dict.fromkeys(feedback))}): {clause}"
         return f"Suggested revision: {clause}"
 
+    @staticmethod
+    def _is_placeholder(clause: str, suggestion: str) -> bool:
+        return suggestion.startswith("Suggested revision") and suggestion.endswith(f": {clause}")
+
     def _extract_key_points(self, feedback: str) -> List[str]:
         """Extract key points from user feedback."""
         # Simple implementation - in practice, this would use NLP techniques
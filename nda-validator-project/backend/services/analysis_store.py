@@ -0,0 +1,64 @@
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+class DocumentAnalysis:
+    """Analysis results of one document, keyed by paragraph index.
+
+    Each entry holds what the pipeline derived for a flagged paragraph:
+    text, categories, confidence, context, the suggestion and its validation,
+    plus the feedback points applied to it so far. Paragraph indices are
+    stable for a document ID, so entries stay valid across feedback rounds.
+    """
+
+    __slots__ = ("document_id", "paragraphs", "feedback_rounds", "model_version")
+
+    def __init__(self, document_id: str, paragraphs: Dict[int, Dict[str, Any]],
+                 model_version: Optional[str] = None):
+        self.document_id = document_id
+        self.paragraphs = paragraphs
+        self.feedback_rounds = 0
+        # Classifier version the analysis was produced with
+        self.model_version = model_version
+
+class AnalysisStore:
+    """LRU of per-document analysis results."""
+
+    def __init__(self, max_documents: int = 256):
+        self.max_documents = max_documents
+        self._documents: "OrderedDict[str, DocumentAnalysis]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __contains__(self, document_id: str) -> bool:
+        return document_id in self._documents
+
+    def get(self, document_id: str) -> Optional[DocumentAnalysis]:
+        analysis = self._documents.get(document_id)
+        if analysis is None:
+            self.misses += 1
+            return None
+        self._documents.move_to_end(document_id)
+        self.hits += 1
+        return analysis
+
+    def put(self, document_id: str, suggestions: Dict[str, Any],
+            model_version: Optional[str] = None) -> DocumentAnalysis:
+        """Store validated suggestions keyed by paragraph index."""
+        paragraphs = {index: {"feedback": [], **details} for index, details in suggestions.items()}
+        analysis = DocumentAnalysis(document_id, paragraphs, model_version)
+        self._documents[document_id] = analysis
+        self._documents.move_to_end(document_id)
+        while len(self._documents) > self.max_documents:
+            self._documents.popitem(last=False)
+            self.evictions += 1
+        return analysis
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "documents": len(self._documents),
+            "max_documents": self.max_documents,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
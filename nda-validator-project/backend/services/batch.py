@@ -0,0 +1,169 @@
+import asyncio
+import csv
+import json
+import multiprocessing
+import os
+import shutil
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Callable, Dict, List, Optional
+
+SUMMARY_FIELDS = ("file", "status", "document_id", "redline_document_id", "flagged_paragraphs", "model_version",
+                  "seconds", "error")
+
+# Per-process state of batch workers, set up once by _init_worker
+_worker: Dict[str, Any] = {}
+
+def collect_documents(source: str, work_dir: str) -> List[str]:
+    """Return the .docx files in a directory tree or a zip archive.
+
+    Zip members are extracted under ``work_dir``; only the base name of
+    each member is kept, so archive paths cannot escape it.
+    """
+    if os.path.isdir(source):
+        paths = []
+        for root, _, files in os.walk(source):
+            paths.extend(os.path.join(root, name) for name in files
+                         if name.lower().endswith(".docx") and not name.startswith("~$"))
+        return sorted(paths)
+
+    if not zipfile.is_zipfile(source):
+        raise ValueError(f"{source} is neither a directory nor a zip archive")
+
+    paths = []
+    with zipfile.ZipFile(source) as archive:
+        for i, member in enumerate(archive.infolist()):
+            name = os.path.basename(member.filename)
+            if member.is_dir() or not name.lower().endswith(".docx") or name.startswith("~$"):
+                continue
+            # One folder per member so equal names in different folders stay apart
+            member_dir = os.path.join(work_dir, f"{i:05d}")
+            os.makedirs(member_dir, exist_ok=True)
+            path = os.path.join(member_dir, name)
+            with archive.open(member) as src, open(path, "wb") as dst:
+                shutil.copyfileobj(src, dst)
+            paths.append(path)
+    return paths
+
+def _init_worker(torch_threads: int, model_dir: Optional[str], cascade_path: Optional[str]):
+    # Imported here so the parent process never loads a model
+    import torch
+    from services.ai_service import AIService
+    from services.document_service import DocumentService
+    from services.pipeline import AnalysisPipeline
+
+    torch.set_num_threads(torch_threads)
+    document_service = DocumentService()
+    ai_service = AIService(classifier_dir=model_dir)
+    # Screen with the same cascade as the caller, or none if it serves without one
+    if cascade_path != ai_service.cascade_path:
+        if cascade_path:
+            ai_service.load_cascade(cascade_path)
+        else:
+            ai_service.cascade = ai_service.cascade_version = ai_service.cascade_path = None
+    _worker["ai_service"] = ai_service
+    _worker["pipeline"] = AnalysisPipeline(document_service, ai_service)
+    _worker["document_service"] = document_service
+    _worker["loop"] = asyncio.new_event_loop()
+
+def _analyze_file(path: str) -> Dict[str, Any]:
+    """Run upload -> analysis -> redline for one file inside a batch worker."""
+    start = time.perf_counter()
+    result: Dict[str, Any] = {"file": path}
+    try:
+        document_id = _worker["document_service"].import_document(path)
+        outcome = _worker["loop"].run_until_complete(_worker["pipeline"].run(document_id))
+        analysis = _worker["ai_service"].analysis_store.get(document_id)
+        result.update(
+            status="ok",
+            document_id=document_id,
+            redline_document_id=outcome["redline_document_id"],
+            flagged_paragraphs=outcome["flagged_paragraphs"],
+            model_version=outcome["model_version"],
+            suggestions=[
+                {
+                    "paragraph_index": index,
+                    "original": details["text"],
+                    "suggestion": details["suggestion"],
+                    "confidence": details["confidence"],
+                    "model_version": details.get("model_version"),
+                    "needs_review": details.get("needs_review", False),
+                }
+                for index, details in (sorted(analysis.paragraphs.items()) if analysis else [])
+            ],
+        )
+    except Exception as e:
+        result.update(status="failed", error=str(e))
+    result["seconds"] = round(time.perf_counter() - start, 3)
+    return result
+
+def run_batch(paths: List[str], output_dir: str, workers: int = 1, documents_dir: str = "documents",
+              on_file: Optional[Callable[[int, int], None]] = None, model_dir: Optional[str] = None,
+              cascade_path: Optional[str] = None) -> Dict[str, Any]:
+    """Analyze files across a process pool and write per-file results plus a summary.
+
+    Each worker process loads the models once and reuses them for every
+    file it gets. Workers classify with ``model_dir`` and screen with
+    ``cascade_path`` when given, else with the configured ones. ``on_file`` is called with (done, total) after each file;
+    an exception it raises stops the batch and cancels pending files.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    torch_threads = max(1, (os.cpu_count() or 1) // workers)
+    names = _result_names(paths)
+    results = []
+    start = time.perf_counter()
+
+    # Spawned, not forked: forking a process that already runs torch threads can deadlock
+    executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                                   initializer=_init_worker, initargs=(torch_threads, model_dir, cascade_path))
+    try:
+        futures = [executor.submit(_analyze_file, path) for path in paths]
+        for future in as_completed(futures):
+            result = future.result()
+            _write_file_result(result, names[result["file"]], output_dir, documents_dir)
+            results.append(result)
+            if on_file is not None:
+                on_file(len(results), len(paths))
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+    elapsed = time.perf_counter() - start
+    summary = {
+        "files": len(paths),
+        "succeeded": sum(result["status"] == "ok" for result in results),
+        "failed": sum(result["status"] != "ok" for result in results),
+        "workers": workers,
+        "elapsed_seconds": round(elapsed, 3),
+        "docs_per_minute": round(len(results) / elapsed * 60, 2) if elapsed else 0.0,
+        "output_dir": output_dir,
+    }
+    _write_summary(summary, sorted(results, key=lambda result: result["file"]), output_dir)
+    return summary
+
+def _result_names(paths: List[str]) -> Dict[str, str]:
+    """Name output files after their inputs, numbering repeated names."""
+    names, seen = {}, {}
+    for path in paths:
+        name = os.path.splitext(os.path.basename(path))[0]
+        seen[name] = seen.get(name, 0) + 1
+        names[path] = name if seen[name] == 1 else f"{name}_{seen[name]}"
+    return names
+
+def _write_file_result(result: Dict[str, Any], name: str, output_dir: str, documents_dir: str):
+    with open(os.path.join(output_dir, f"{name}.json"), "w") as f:
+        json.dump(result, f, indent=2)
+    if result["status"] == "ok":
+        redline_path = os.path.join(documents_dir, f"{result['redline_document_id']}_redline.docx")
+        shutil.copyfile(redline_path, os.path.join(output_dir, f"{name}_redline.docx"))
+
+def _write_summary(summary: Dict[str, Any], results: List[Dict[str, Any]], output_dir: str):
+    with open(os.path.join(output_dir, "summary.csv"), "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=SUMMARY_FIELDS, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(results)
+    with open(os.path.join(output_dir, "summary.json"), "w") as f:
+        json.dump({
+            **summary,
+            "results": [{field: result.get(field) for field in SUMMARY_FIELDS} for result in results],
+        }, f, indent=2)
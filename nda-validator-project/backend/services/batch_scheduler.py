@@ -0,0 +1,111 @@
+import asyncio
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from services.worker_pool import ServerBusyError, WorkerPool
+
+class BatchScheduler:
+    """Collect scoring requests from concurrent callers into shared batches.
+
+    Callers submit texts and await their own results. A single worker task
+    drains the queue, flushing a batch once it holds ``max_batch_size`` texts
+    or ``max_wait_ms`` has passed since the first text of the batch arrived.
+    Only one batch runs at a time, so texts that arrive while the model is
+    busy simply join the next, larger batch.
+
+    Batches run on ``pool`` when one is given. Once ``max_queue_depth`` texts
+    are waiting, new submissions are rejected with ``ServerBusyError``.
+    """
+
+    def __init__(self, score_fn: Callable[[List[str]], List[Any]],
+                 max_batch_size: int = 32, max_wait_ms: float = 5.0,
+                 pool: Optional[WorkerPool] = None, max_queue_depth: int = 0, retry_after: int = 5):
+        self.score_fn = score_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.pool = pool
+        self.max_queue_depth = max_queue_depth
+        self.retry_after = retry_after
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self.batch_size_histogram: Dict[int, int] = {}
+        self.batches_run = 0
+        self.texts_scored = 0
+
+    async def submit(self, texts: List[str]) -> List[Any]:
+        """Queue texts for scoring and wait for their results, in order."""
+        if not texts:
+            return []
+
+        self._ensure_started()
+        if self.max_queue_depth and self._queue.qsize() + len(texts) > self.max_queue_depth:
+            raise ServerBusyError("Model queue is full, try again later", retry_after=self.retry_after)
+
+        loop = asyncio.get_running_loop()
+        futures = []
+        for text in texts:
+            future = loop.create_future()
+            self._queue.put_nowait((text, future))
+            futures.append(future)
+
+        return list(await asyncio.gather(*futures))
+
+    def stats(self) -> Dict[str, Any]:
+        """Return queue depth and batch size distribution."""
+        return {
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "batches_run": self.batches_run,
+            "texts_scored": self.texts_scored,
+            "average_batch_size": self.texts_scored / self.batches_run if self.batches_run else 0,
+            "batch_size_histogram": dict(sorted(self.batch_size_histogram.items())),
+        }
+
+    def _ensure_started(self):
+        if self._worker is None or self._worker.done():
+            self._queue = self._queue or asyncio.Queue()
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def _collect_batch(self) -> List[Tuple[str, asyncio.Future]]:
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+
+        # Callers that went away (e.g. a cancelled request) do not need scoring
+        return [(text, future) for text, future in batch if not future.done()]
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect_batch()
+            if not batch:
+                continue
+
+            texts = [text for text, _ in batch]
+            try:
+                if self.pool is not None:
+                    results = await self.pool.run(self.score_fn, texts)
+                else:
+                    results = await loop.run_in_executor(None, self.score_fn, texts)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            self.batches_run += 1
+            self.texts_scored += len(batch)
+            self.batch_size_histogram[len(batch)] = self.batch_size_histogram.get(len(batch), 0) + 1
+
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
@@ -0,0 +1,69 @@
+import os
+from typing import Any, Dict, List
+
+import joblib
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import Pipeline
+
+BENIGN = "benign"
+PROBLEMATIC = "problematic"
+UNCERTAIN = "uncertain"
+
+class CascadeClassifier:
+    """Cheap first-stage clause classifier that runs before legal-bert.
+
+    Hashed word n-grams with TF-IDF weighting feed a logistic regression
+    trained on the same labels as the transformer. Paragraphs scoring below
+    ``low`` are treated as benign and paragraphs above ``high`` as
+    problematic without a transformer call; only the band in between is
+    sent to legal-bert.
+    """
+
+    def __init__(self, pipeline: Pipeline, low: float = 0.2, high: float = 0.9):
+        if not 0.0 <= low <= high <= 1.0:
+            raise ValueError("Cascade thresholds must satisfy 0 <= low <= high <= 1")
+        self.pipeline = pipeline
+        self.low = low
+        self.high = high
+
+    @classmethod
+    def train(cls, texts: List[str], labels: List[int], low: float = 0.2, high: float = 0.9) -> "CascadeClassifier":
+        if len(set(labels)) < 2:
+            raise ValueError("Cascade training needs examples of both labels")
+
+        pipeline = Pipeline([
+            ("hashing", HashingVectorizer(ngram_range=(1, 2), n_features=2 ** 18,
+                                          alternate_sign=False, norm=None)),
+            ("tfidf", TfidfTransformer(sublinear_tf=True)),
+            ("classifier", LogisticRegression(class_weight="balanced", max_iter=1000)),
+        ])
+        pipeline.fit(texts, labels)
+        return cls(pipeline, low, high)
+
+    @classmethod
+    def load(cls, path: str, low: float = 0.2, high: float = 0.9) -> "CascadeClassifier":
+        return cls(joblib.load(path), low, high)
+
+    def save(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        joblib.dump(self.pipeline, path)
+
+    def predict_proba(self, texts: List[str]) -> List[float]:
+        """Return the probability that each text is problematic."""
+        if not texts:
+            return []
+        return self.pipeline.predict_proba(texts)[:, 1].tolist()
+
+    def route(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """Decide for each text whether it is benign, problematic or needs the transformer."""
+        routes = []
+        for score in self.predict_proba(texts):
+            if score < self.low:
+                decision = BENIGN
+            elif score > self.high:
+                decision = PROBLEMATIC
+            else:
+                decision = UNCERTAIN
+            routes.append({"decision": decision, "score": score})
+        return routes
@@ -0,0 +1,86 @@
+import json
+import re
+from typing import Dict, List
+
+class ClauseMatcher:
+    """Find every configured clause keyword in a paragraph in a single pass.
+
+    All keywords are merged into one trie and compiled into a single regular
+    expression, so the regex engine walks each paragraph once and only
+    follows branches that share a prefix with the text. Scan time is driven
+    by paragraph length, not by how many keywords are configured.
+
+    Patterns map a category to its keywords, e.g.
+    ``{"termination": ["termination", "terminate this agreement"]}``.
+    Matching is case-insensitive and, like a substring check, does not
+    require word boundaries.
+    """
+
+    def __init__(self, patterns: Dict[str, List[str]]):
+        self.patterns = patterns
+        self._categories: Dict[str, List[str]] = {}
+        for category, keywords in patterns.items():
+            for keyword in keywords:
+                keyword = keyword.lower().strip()
+                if keyword:
+                    self._categories.setdefault(keyword, []).append(category)
+
+        # The regex reports only the longest keyword at each position; every
+        # shorter keyword matching there is a prefix of it, so a match stands
+        # for the categories of all its keyword prefixes, shortest first
+        self._matched: Dict[str, List[str]] = {}
+        for keyword in self._categories:
+            categories: Dict[str, None] = {}
+            for end in range(1, len(keyword) + 1):
+                for category in self._categories.get(keyword[:end], ()):
+                    categories[category] = None
+            self._matched[keyword] = list(categories)
+
+        if self._categories:
+            # The lookahead lets matches overlap, so every start position is tried
+            self._regex = re.compile(f"(?=({self._trie_pattern(list(self._categories))}))")
+        else:
+            self._regex = None
+
+    @classmethod
+    def from_file(cls, path: str) -> "ClauseMatcher":
+        """Load category -> keywords patterns from a JSON file."""
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def __len__(self) -> int:
+        return len(self._categories)
+
+    def match(self, text: str) -> List[str]:
+        """Return the categories whose keywords appear in text, in order of first appearance."""
+        if self._regex is None:
+            return []
+
+        # Lowercasing once is far cheaper than a case-insensitive regex
+        found: Dict[str, None] = {}
+        for match in self._regex.finditer(text.lower()):
+            for category in self._matched[match.group(1)]:
+                found[category] = None
+        return list(found)
+
+    @staticmethod
+    def _trie_pattern(keywords: List[str]) -> str:
+        trie: Dict = {}
+        for keyword in keywords:
+            node = trie
+            for char in keyword:
+                node = node.setdefault(char, {})
+            node[""] = {}
+
+        def build(node: Dict) -> str:
+            is_end = "" in node
+            branches = [re.escape(char) + build(child)
+                        for char, child in sorted(node.items()) if char]
+            if not branches:
+                return ""
+            if len(branches) == 1 and not is_end:
+                return branches[0]
+            group = "(?:" + "|".join(branches) + ")"
+            return group + "?" if is_end else group
+
+        return build(trie)
@@ -0,0 +1,105 @@
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Inference
+MODEL_NAME = os.getenv("NDA_MODEL_NAME", "nlpaueb/legal-bert-base-uncased")
+MAX_SEQUENCE_LENGTH = int(os.getenv("NDA_MAX_SEQUENCE_LENGTH", "512"))
+INFERENCE_BATCH_SIZE = int(os.getenv("NDA_INFERENCE_BATCH_SIZE", "16"))
+# One of "torch", "quantized" (dynamic int8) or "onnx" (onnxruntime)
+INFERENCE_BACKEND = os.getenv("NDA_INFERENCE_BACKEND", "torch")
+WARMUP_ON_STARTUP = os.getenv("NDA_WARMUP_ON_STARTUP", "true").lower() == "true"
+# Longest wait for in-flight batches on a model being swapped out
+SWAP_DRAIN_TIMEOUT_SECONDS = float(os.getenv("NDA_SWAP_DRAIN_TIMEOUT_SECONDS", "60"))
+
+# Keyword prefilter
+CLAUSE_PATTERNS_PATH = os.getenv(
+    "NDA_CLAUSE_PATTERNS_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "config", "clause_patterns.json")
+)
+
+# Classical-ML cascade in front of legal-bert
+CASCADE_MODEL_PATH = os.getenv("NDA_CASCADE_MODEL_PATH", "fine_tuned_model/cascade.joblib")
+CASCADE_LOW_THRESHOLD = float(os.getenv("NDA_CASCADE_LOW_THRESHOLD", "0.2"))
+CASCADE_HIGH_THRESHOLD = float(os.getenv("NDA_CASCADE_HIGH_THRESHOLD", "0.9"))
+
+# Clause score cache
+SCORE_CACHE_SIZE = int(os.getenv("NDA_SCORE_CACHE_SIZE", "50000"))
+SCORE_CACHE_PATH = os.getenv("NDA_SCORE_CACHE_PATH", "cache/scores.sqlite3")
+SCORE_CACHE_DISK_SIZE = int(os.getenv("NDA_SCORE_CACHE_DISK_SIZE", "1000000"))
+
+# Cross-request micro-batching
+SCHEDULER_MAX_BATCH_SIZE = int(os.getenv("NDA_SCHEDULER_MAX_BATCH_SIZE", "32"))
+SCHEDULER_MAX_WAIT_MS = float(os.getenv("NDA_SCHEDULER_MAX_WAIT_MS", "5"))
+SCHEDULER_MAX_QUEUE_DEPTH = int(os.getenv("NDA_SCHEDULER_MAX_QUEUE_DEPTH", "2048"))
+
+# Worker pools for blocking work
+MODEL_WORKERS = int(os.getenv("NDA_MODEL_WORKERS", "1"))
+MODEL_QUEUE = int(os.getenv("NDA_MODEL_QUEUE", "4"))
+DOCUMENT_WORKERS = int(os.getenv("NDA_DOCUMENT_WORKERS", "4"))
+DOCUMENT_QUEUE = int(os.getenv("NDA_DOCUMENT_QUEUE", "32"))
+# "thread" or "process"; processes parse and render docx in parallel across CPUs
+DOCUMENT_POOL_KIND = os.getenv("NDA_DOCUMENT_POOL_KIND", "thread")
+TRAINING_WORKERS = int(os.getenv("NDA_TRAINING_WORKERS", "1"))
+TRAINING_QUEUE = int(os.getenv("NDA_TRAINING_QUEUE", "0"))
+RETRY_AFTER_SECONDS = int(os.getenv("NDA_RETRY_AFTER_SECONDS", "5"))
+
+# Documents
+PARSED_DOCUMENT_CACHE_SIZE = int(os.getenv("NDA_PARSED_DOCUMENT_CACHE_SIZE", "64"))
+MAX_UPLOAD_BYTES = int(os.getenv("NDA_MAX_UPLOAD_BYTES", str(50 * 1024 * 1024)))
+UPLOAD_CHUNK_BYTES = int(os.getenv("NDA_UPLOAD_CHUNK_BYTES", str(1024 * 1024)))
+ANALYSIS_STORE_SIZE = int(os.getenv("NDA_ANALYSIS_STORE_SIZE", "256"))
+
+# Background jobs
+JOB_STORE_PATH = os.getenv("NDA_JOB_STORE_PATH", "cache/jobs.sqlite3")
+ANALYZE_JOB_CONCURRENCY = int(os.getenv("NDA_ANALYZE_JOB_CONCURRENCY", "4"))
+
+# Streaming analysis
+STREAM_KEEPALIVE_SECONDS = float(os.getenv("NDA_STREAM_KEEPALIVE_SECONDS", "15"))
+STREAM_MAX_BUFFERED_EVENTS = int(os.getenv("NDA_STREAM_MAX_BUFFERED_EVENTS", "1000"))
+
+# Batch analysis
+BATCH_DIR = os.getenv("NDA_BATCH_DIR", "batches")
+BATCH_INPUT_DIR = os.getenv("NDA_BATCH_INPUT_DIR", "batch_input")
+BATCH_WORKERS = int(os.getenv("NDA_BATCH_WORKERS", "2"))
+# Each batch worker holds its own copy of the models
+BATCH_MAX_WORKERS = int(os.getenv("NDA_BATCH_MAX_WORKERS", str(max(BATCH_WORKERS, os.cpu_count() or 1))))
+BATCH_JOB_CONCURRENCY = int(os.getenv("NDA_BATCH_JOB_CONCURRENCY", "1"))
+BATCH_MAX_UPLOAD_BYTES = int(os.getenv("NDA_BATCH_MAX_UPLOAD_BYTES", str(1024 * 1024 * 1024)))
+
+# Training data preparation
+PARAGRAPH_CACHE_DIR = os.getenv("NDA_PARAGRAPH_CACHE_DIR", "cache/paragraphs")
+EXTRACTION_WORKERS = int(os.getenv("NDA_EXTRACTION_WORKERS", "0"))  # 0 = one per CPU
+TOKEN_CACHE_DIR = os.getenv("NDA_TOKEN_CACHE_DIR", "cache/tokens")
+
+# Evaluation
+HOLDOUT_FRACTION = float(os.getenv("NDA_HOLDOUT_FRACTION", "0.1"))
+EVAL_BATCH_SIZE = int(os.getenv("NDA_EVAL_BATCH_SIZE", "32"))
+
+# Long-term memory
+MEMORY_DIR = os.getenv("NDA_MEMORY_DIR", "memory")
+MEMORY_FLUSH_BATCH_SIZE = int(os.getenv("NDA_MEMORY_FLUSH_BATCH_SIZE", "64"))
+MEMORY_FLUSH_INTERVAL_SECONDS = float(os.getenv("NDA_MEMORY_FLUSH_INTERVAL_SECONDS", "1.0"))
+EMBEDDING_CACHE_SIZE = int(os.getenv("NDA_EMBEDDING_CACHE_SIZE", "4096"))
+
+# Precedent index
+PRECEDENT_INDEX_DIR = os.getenv("NDA_PRECEDENT_INDEX_DIR", "cache/precedents")
+PRECEDENT_TOP_K = int(os.getenv("NDA_PRECEDENT_TOP_K", "3"))
+PRECEDENT_MIN_SIMILARITY = float(os.getenv("NDA_PRECEDENT_MIN_SIMILARITY", "0.9"))
+PRECEDENT_NLIST = int(os.getenv("NDA_PRECEDENT_NLIST", "1024"))
+PRECEDENT_NPROBE = int(os.getenv("NDA_PRECEDENT_NPROBE", "16"))
+PRECEDENT_MIN_TRAIN_SIZE = int(os.getenv("NDA_PRECEDENT_MIN_TRAIN_SIZE", "20000"))
+
+# Retention
+RETENTION_DAYS = int(os.getenv("NDA_RETENTION_DAYS", "365"))  # 0 = keep memory forever
+DOCUMENT_RETENTION_DAYS = float(os.getenv("NDA_DOCUMENT_RETENTION_DAYS", "30"))  # 0 = keep files forever
+RETENTION_SWEEP_INTERVAL_SECONDS = float(os.getenv("NDA_RETENTION_SWEEP_INTERVAL_SECONDS", "3600"))  # 0 = manual only
+RETENTION_BATCH_SIZE = int(os.getenv("NDA_RETENTION_BATCH_SIZE", "500"))
+RETENTION_MAX_DELETES_PER_SECOND = float(os.getenv("NDA_RETENTION_MAX_DELETES_PER_SECOND", "1000"))
+
+# Observability
+JSON_LOGS = os.getenv("NDA_JSON_LOGS", "false").lower() == "true"
+PROFILING_ENABLED = os.getenv("NDA_PROFILING_ENABLED", "false").lower() == "true"
+PROFILE_DIR = os.getenv("NDA_PROFILE_DIR", "cache/profiles")
+PROFILE_SAMPLE_INTERVAL_MS = float(os.getenv("NDA_PROFILE_SAMPLE_INTERVAL_MS", "5"))
@@ -1,80 +1,287 @@
-from fastapi import UploadFile
-from docx import Document
+import asyncio
+import hashlib
+import io
+import re
+import shutil
+import time
 import uuid
 import os
-from typing import Dict, Any
+from typing import Container, Dict, Any, Optional
+from starlette.datastructures import UploadFile
+from services import config
+from services.metrics import metrics
+from services.parsed_document import ParsedDocument, ParsedDocumentCache, load_parsed_document
+from services.redline import RedlineRenderer, accept_all_changes
+from services.worker_pool import WorkerPool
+
+DOCUMENT_ID_PATTERN = re.compile(r"^[A-Za-z0-9-]+$")
+
+# Uploads, redlines and clean copies share one directory under these names
+ARTIFACT_SUFFIXES = ("", "_redline", "_clean")
+ARTIFACT_PATTERN = re.compile(r"^([A-Za-z0-9-]+)(_redline|_clean)?\.docx$")
+# Partial uploads this old were left behind by a crash
+PARTIAL_UPLOAD_MAX_AGE_SECONDS = 3600
+
+def append_to_file(path: str, data: bytes):
+    """Append ``data`` to ``path``; a plain function so it can run on either kind of pool."""
+    with open(path, "ab") as f:
+        f.write(data)
+
+class UploadTooLargeError(Exception):
+    """Raised when an upload exceeds the configured maximum size."""
 
 class DocumentService:
-    def __init__(self):
+    def __init__(self, pool: Optional[WorkerPool] = None):
         self.documents_dir = "documents"
         os.makedirs(self.documents_dir, exist_ok=True)
+        # python-docx parsing and saving block, so they run on a bounded pool
+        self.pool = pool or WorkerPool("documents")
+        self.parsed_documents = ParsedDocumentCache(config.PARSED_DOCUMENT_CACHE_SIZE)
+        self.max_upload_bytes = config.MAX_UPLOAD_BYTES
+        self.renderer = RedlineRenderer()
+        # Most recent redline per uploaded document, used by /accept
+        self.latest_redlines: Dict[str, str] = {}
+        # When each upload was last stored or read; retention counts age from the
+        # later of this and the file's mtime, which the parse cache validates against
+        self.last_used: Dict[str, float] = {}
 
     async def parse_document(self, file: UploadFile) -> str:
-        """Parse the uploaded document and save it to disk."""
-        document_id = str(uuid.uuid4())
-        file_path = os.path.join(self.documents_dir, f"{document_id}.docx")
+        """Stream the uploaded document to disk and return its content-addressed ID.
+
+        The upload is written in fixed-size chunks and hashed on the way, so
+        memory use does not grow with file size; the writes run on the
+        document pool, not the event loop. Identical uploads map to the same
+        document ID and are stored once.
+        """
+        digest = hashlib.sha256()
+        size = 0
+        partial_path = os.path.join(self.documents_dir, f".upload-{uuid.uuid4()}.part")
         
-        # Save the uploaded file
-        with open(file_path, "wb") as buffer:
-            content = await file.read()
-            buffer.write(content)
+        try:
+            while True:
+                chunk = await file.read(config.UPLOAD_CHUNK_BYTES)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > self.max_upload_bytes:
+                    raise UploadTooLargeError(
+                        f"Upload exceeds the maximum size of {self.max_upload_bytes} bytes"
+                    )
+                digest.update(chunk)
+                await self.pool.run(append_to_file, partial_path, chunk)
+            if not size:
+                await self.pool.run(append_to_file, partial_path, b"")
+            
+            document_id = digest.hexdigest()[:32]
+            file_path = os.path.join(self.documents_dir, f"{document_id}.docx")
+            if os.path.exists(file_path):
+                # Already stored; everything derived from it can be reused
+                os.remove(partial_path)
+            else:
+                os.replace(partial_path, file_path)
+        except BaseException:
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+            raise
         
+        self.last_used[document_id] = time.time()
+        return document_id
+
+    def import_document(self, path: str) -> str:
+        """Store a .docx from the local filesystem and return its content-addressed ID."""
+        digest = hashlib.sha256()
+        with open(path, "rb") as source:
+            for chunk in iter(lambda: source.read(config.UPLOAD_CHUNK_BYTES), b""):
+                digest.update(chunk)
+
+        document_id = digest.hexdigest()[:32]
+        file_path = os.path.join(self.documents_dir, f"{document_id}.docx")
+        self.last_used[document_id] = time.time()
+        if not os.path.exists(file_path):
+            partial_path = os.path.join(self.documents_dir, f".upload-{uuid.uuid4()}.part")
+            shutil.copyfile(path, partial_path)
+            os.replace(partial_path, file_path)
         return document_id
 
-    async def get_document(self, document_id: str) -> Document:
-        """Retrieve a document by its ID."""
+    async def get_document(self, document_id: str) -> ParsedDocument:
+        """Retrieve a document by its ID, parsing it only when the file changed."""
         file_path = os.path.join(self.documents_dir, f"{document_id}.docx")
         if not os.path.exists(file_path):
             raise FileNotFoundError(f"Document {document_id} not found")
-        return Document(file_path)
+        
+        mtime_ns = os.stat(file_path).st_mtime_ns
+        self.last_used[document_id] = time.time()
+        document = self.parsed_documents.get(document_id, mtime_ns)
+        if document is None:
+            with metrics.span("docx_parse"):
+                document = await self.pool.run(load_parsed_document, document_id, file_path, mtime_ns)
+            self.parsed_documents.put(document)
+        return document
+
+    async def render_redline(self, document: ParsedDocument, suggestions: Dict[str, Any]) -> io.BytesIO:
+        """Render the redline for suggestions keyed by paragraph index into memory without touching disk."""
+        changes = {
+            index: details["suggestion"]
+            for index, details in suggestions.items()
+            if details.get("suggestion") is not None
+        }
+        with metrics.span("redline_render"):
+            return await self.pool.run(self.renderer.render, document.source_path, changes)
 
-    async def create_redline_document(self, document: Document, suggestions: Dict[str, Any]) -> str:
+    async def create_redline_document(self, document: ParsedDocument, suggestions: Dict[str, Any]) -> str:
         """Create a redline version of the document with suggested changes."""
         redline_id = str(uuid.uuid4())
-        redline_doc = Document()
-        
-        for paragraph in document.paragraphs:
-            if paragraph.text in suggestions:
-                # Add the original text with strikethrough
-                p = redline_doc.add_paragraph()
-                run = p.add_run(paragraph.text)
-                run.font.strike = True
-                
-                # Add the suggested text
-                p = redline_doc.add_paragraph()
-                run = p.add_run(suggestions[paragraph.text]["suggestion"])
-                run.font.color.rgb = (0, 128, 0)  # Green color
-            else:
-                # Copy the original paragraph
-                p = redline_doc.add_paragraph(paragraph.text)
-        
-        # Save the redline document
         redline_path = os.path.join(self.documents_dir, f"{redline_id}_redline.docx")
-        redline_doc.save(redline_path)
+        buffer = await self.render_redline(document, suggestions)
+        with metrics.span("redline_save"):
+            await self.pool.run(self._write_buffer, buffer, redline_path)
+        self.latest_redlines[document.document_id] = redline_id
+        return redline_id
+
+    async def update_redline_document(self, document: ParsedDocument, changes: Dict[int, Optional[str]]) -> str:
+        """Create a new redline that differs from the latest one only in the changed paragraphs.
+
+        Falls back to patching the source document when there is no earlier
+        redline, in which case ``changes`` should hold every suggestion.
+        """
+        previous_id = self.latest_redlines.get(document.document_id)
+        base_path = document.source_path
+        if previous_id is not None:
+            previous_path = os.path.join(self.documents_dir, f"{previous_id}_redline.docx")
+            if os.path.exists(previous_path):
+                base_path = previous_path
+
+        redline_id = str(uuid.uuid4())
+        redline_path = os.path.join(self.documents_dir, f"{redline_id}_redline.docx")
+        with metrics.span("redline_render"):
+            buffer = await self.pool.run(self.renderer.update, base_path, changes)
+        with metrics.span("redline_save"):
+            await self.pool.run(self._write_buffer, buffer, redline_path)
+        self.latest_redlines[document.document_id] = redline_id
         return redline_id
 
     async def create_clean_document(self, document_id: str) -> str:
-        """Create a clean version of the document with accepted changes."""
+        """Create a clean version of the document with all suggested changes accepted.
+
+        Accepts either a redline ID or the ID of an uploaded document, in which
+        case its most recent redline is used.
+        """
         clean_id = str(uuid.uuid4())
-        doc = await self.get_document(document_id)
-        clean_doc = Document()
-        
-        for paragraph in doc.paragraphs:
-            if paragraph.text.startswith("Suggested:"):
-                # Skip the original text and only keep the suggestion
-                continue
-            clean_doc.add_paragraph(paragraph.text)
-        
-        # Save the clean document
+        source_id = self.latest_redlines.get(document_id, document_id)
+        source_path = self.resolve_document_path(source_id)
         clean_path = os.path.join(self.documents_dir, f"{clean_id}_clean.docx")
-        clean_doc.save(clean_path)
+        with metrics.span("accept_changes"):
+            buffer = await self.pool.run(accept_all_changes, source_path)
+        with metrics.span("clean_save"):
+            await self.pool.run(self._write_buffer, buffer, clean_path)
         return clean_id
 
-    async def return_document(self, document_id: str) -> bytes:
-        """Return the document as bytes for download."""
-        file_path = os.path.join(self.documents_dir, f"{document_id}.docx")
-        if not os.path.exists(file_path):
-            raise FileNotFoundError(f"Document {document_id} not found")
+    def latest_redline(self, document_id: str) -> Optional[str]:
+        """Return the ID of the upload's most recent redline, if it is still on disk."""
+        redline_id = self.latest_redlines.get(document_id)
+        if redline_id is None or not os.path.exists(os.path.join(self.documents_dir, f"{redline_id}_redline.docx")):
+            return None
+        return redline_id
+
+    def upload_for(self, document_id: str) -> str:
+        """Return the upload a redline ID was rendered from (an upload ID maps to itself)."""
+        for upload_id, redline_id in self.latest_redlines.items():
+            if redline_id == document_id:
+                return upload_id
+        return document_id
+
+    async def sweep_files(self, max_age_seconds: float, keep: Container[str] = (), batch_size: int = 500,
+                          pause: float = 0.0) -> Dict[str, int]:
+        """Delete uploads, redlines and clean copies no longer in use, ``batch_size`` files at a time.
+
+        A file is removed once it is older than ``max_age_seconds`` unless
+        its document ID is in ``keep``; an upload's age counts from when it
+        was last uploaded or read. An upload and its latest redline are
+        kept, or removed, together. Crashed partial uploads are removed
+        after an hour.
+        """
+        loop = asyncio.get_running_loop()
+        now = time.time()
+        modified = await loop.run_in_executor(None, self._modified_times)
+        cutoff = now - max_age_seconds
+        for document_id, used in list(self.last_used.items()):
+            name = f"{document_id}.docx"
+            if name in modified:
+                modified[name] = max(modified[name], used)
+            else:
+                del self.last_used[document_id]
+
+        live = set()
+        released = []
+        for upload_id, redline_id in list(self.latest_redlines.items()):
+            upload_time = modified.get(f"{upload_id}.docx", 0.0)
+            redline_time = modified.get(f"{redline_id}_redline.docx", 0.0)
+            if upload_id in keep or max(upload_time, redline_time) >= cutoff:
+                live.update((upload_id, redline_id))
+            else:
+                released.append((upload_id, redline_id))
+
+        expired = []
+        for name, mtime in modified.items():
+            if name.startswith(".upload-") and name.endswith(".part"):
+                if mtime < now - PARTIAL_UPLOAD_MAX_AGE_SECONDS:
+                    expired.append((name, mtime))
+                continue
+            match = ARTIFACT_PATTERN.match(name)
+            if match and mtime < cutoff and match.group(1) not in live and match.group(1) not in keep:
+                expired.append((name, mtime))
+
+        for upload_id, redline_id in released:
+            if self.latest_redlines.get(upload_id) == redline_id:
+                del self.latest_redlines[upload_id]
+        deleted = 0
+        for start in range(0, len(expired), batch_size):
+            # Skip uploads stored or read again since the scan
+            batch = [(name, mtime) for name, mtime in expired[start:start + batch_size]
+                     if self.last_used.get(name[:-len(".docx")], 0.0) < now]
+            deleted += await loop.run_in_executor(None, self._remove_files, batch)
+            await asyncio.sleep(pause)
+        return {"files_deleted": deleted, "redlines_released": len(released)}
+
+    def _modified_times(self) -> Dict[str, float]:
+        modified = {}
+        with os.scandir(self.documents_dir) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_file():
+                        modified[entry.name] = entry.stat().st_mtime
+                except FileNotFoundError:
+                    continue
+        return modified
+
+    def _remove_files(self, files) -> int:
+        removed = 0
+        for name, mtime in files:
+            path = os.path.join(self.documents_dir, name)
+            try:
+                # Skip files rewritten since the scan
+                if os.stat(path).st_mtime <= mtime:
+                    os.remove(path)
+                    removed += 1
+            except FileNotFoundError:
+                pass
+        return removed
+
+    @staticmethod
+    def _write_buffer(buffer: io.BytesIO, path: str):
+        with open(path, "wb") as file:
+            file.write(buffer.getbuffer())
+
+    def cache_stats(self) -> Dict[str, Any]:
+        return self.parsed_documents.stats()
+
+    def resolve_document_path(self, document_id: str) -> str:
+        """Return the path of an uploaded, redline or clean document by its ID."""
+        if not DOCUMENT_ID_PATTERN.match(document_id):
+            raise ValueError(f"Invalid document ID: {document_id}")
         
-        with open(file_path, "rb") as file:
-            return file.read() 
\ No newline at end of file
+        for suffix in ARTIFACT_SUFFIXES:
+            file_path = os.path.join(self.documents_dir, f"{document_id}{suffix}.docx")
+            if os.path.exists(file_path):
+                return file_path
+        raise FileNotFoundError(f"Document {document_id} not found")
\ No newline at end of file
@@ -0,0 +1,89 @@
+import hashlib
+import json
+import os
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+HOLDOUT_FILE = "holdout.json"
+
+def split_holdout(texts: List[str], labels: List[int], fraction: float,
+                  seed: str = "") -> Tuple[Tuple[List[str], List[int]], Tuple[List[str], List[int]]]:
+    """Split examples into (train, held-out) by a hash of each text.
+
+    The split depends only on the text and ``seed``, never on order, so
+    retraining on a grown corpus keeps earlier held-out paragraphs held out
+    and duplicates of a paragraph always land on the same side.
+    """
+    train, holdout = ([], []), ([], [])
+    for text, label in zip(texts, labels):
+        digest = hashlib.sha256(f"{seed}\0{text}".encode("utf-8")).digest()
+        side = holdout if int.from_bytes(digest[:8], "big") / 2 ** 64 < fraction else train
+        side[0].append(text)
+        side[1].append(label)
+    return train, holdout
+
+def save_holdout(model_dir: str, texts: List[str], labels: List[int]):
+    with open(os.path.join(model_dir, HOLDOUT_FILE), "w") as f:
+        json.dump({"texts": texts, "labels": labels}, f)
+
+def load_holdout(model_dir: str) -> Tuple[List[str], List[int]]:
+    with open(os.path.join(model_dir, HOLDOUT_FILE)) as f:
+        holdout = json.load(f)
+    return holdout["texts"], holdout["labels"]
+
+def classification_metrics(labels: Sequence[int], probabilities: Sequence[float],
+                           threshold: float = 0.5, bins: int = 10) -> Dict[str, Any]:
+    """Accuracy, precision/recall/F1, confusion matrix and calibration for binary labels.
+
+    ``probabilities`` are the predicted probability of label 1. Calibration
+    is reported as expected calibration error over ``bins`` equal-width
+    confidence bins, the Brier score and the per-bin reliability table.
+    """
+    labels = np.asarray(labels, dtype=np.int64)
+    probabilities = np.asarray(probabilities, dtype=np.float64)
+    predictions = (probabilities >= threshold).astype(np.int64)
+
+    tp = int(np.sum((predictions == 1) & (labels == 1)))
+    fp = int(np.sum((predictions == 1) & (labels == 0)))
+    fn = int(np.sum((predictions == 0) & (labels == 1)))
+    tn = int(np.sum((predictions == 0) & (labels == 0)))
+    precision = tp / (tp + fp) if tp + fp else 0.0
+    recall = tp / (tp + fn) if tp + fn else 0.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+
+    # Confidence is the probability of the predicted label
+    confidence = np.where(predictions == 1, probabilities, 1.0 - probabilities)
+    correct = predictions == labels
+    edges = np.linspace(0.5, 1.0, bins + 1)
+    reliability = []
+    ece = 0.0
+    for i, (low, high) in enumerate(zip(edges[:-1], edges[1:])):
+        in_bin = (confidence >= low) & ((confidence < high) if i < bins - 1 else (confidence <= high))
+        count = int(in_bin.sum())
+        if not count:
+            continue
+        bin_confidence = float(confidence[in_bin].mean())
+        bin_accuracy = float(correct[in_bin].mean())
+        ece += count / len(labels) * abs(bin_accuracy - bin_confidence)
+        reliability.append({
+            "bin": [round(float(low), 3), round(float(high), 3)],
+            "count": count,
+            "confidence": round(bin_confidence, 4),
+            "accuracy": round(bin_accuracy, 4),
+        })
+
+    return {
+        "num_samples": int(len(labels)),
+        "accuracy": float(correct.mean()) if len(labels) else 0.0,
+        "precision": precision,
+        "recall": recall,
+        "f1": f1,
+        # Rows are true labels, columns predicted labels: [[tn, fp], [fn, tp]]
+        "confusion_matrix": [[tn, fp], [fn, tp]],
+        "calibration": {
+            "ece": ece,
+            "brier": float(np.mean((probabilities - labels) ** 2)) if len(labels) else 0.0,
+            "bins": reliability,
+        },
+    }
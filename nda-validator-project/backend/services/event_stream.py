@@ -0,0 +1,70 @@
+import asyncio
+import json
+from typing import Any, AsyncIterator, Dict
+
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+
+SSE_MEDIA_TYPE = "text/event-stream"
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+_END = object()
+
+def event_stream_response(request: Request, events: AsyncIterator[Dict[str, Any]], ndjson: bool = False,
+                          keepalive_seconds: float = 15.0, max_buffered: int = 1000) -> StreamingResponse:
+    """Stream event dicts as server-sent events or NDJSON.
+
+    Events are pulled from ``events`` by a separate task into a buffer, so
+    the producer (and the model work behind it) never waits on a slow
+    client. A client that falls ``max_buffered`` events behind gets an
+    ``error`` event and the producer is stopped. When nothing has been sent
+    for ``keepalive_seconds`` a keep-alive is written, and a client that
+    went away cancels the producer.
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+
+    async def pump():
+        try:
+            async for event in events:
+                if queue.qsize() >= max_buffered:
+                    queue.put_nowait({"event": "error", "detail": "Client is reading too slowly"})
+                    await events.aclose()
+                    break
+                queue.put_nowait(event)
+        except Exception as e:
+            queue.put_nowait({"event": "error", "detail": str(e)})
+        finally:
+            queue.put_nowait(_END)
+
+    async def body():
+        producer = asyncio.create_task(pump())
+        try:
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), keepalive_seconds)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield _keepalive(ndjson)
+                    continue
+                if event is _END:
+                    break
+                yield _format(event, ndjson)
+        finally:
+            producer.cancel()
+
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    return StreamingResponse(body(), media_type=NDJSON_MEDIA_TYPE if ndjson else SSE_MEDIA_TYPE,
+                             headers=headers)
+
+def wants_ndjson(request: Request) -> bool:
+    return (request.query_params.get("format") == "ndjson"
+            or NDJSON_MEDIA_TYPE in request.headers.get("accept", ""))
+
+def _format(event: Dict[str, Any], ndjson: bool) -> str:
+    if ndjson:
+        return json.dumps(event) + "\n"
+    return f"event: {event['event']}\ndata: {json.dumps(event)}\n\n"
+
+def _keepalive(ndjson: bool) -> str:
+    return '{"event": "keep-alive"}\n' if ndjson else ": keep-alive\n\n"
@@ -0,0 +1,118 @@
+import json
+import os
+import threading
+import uuid
+from datetime import datetime
+from typing import Any, Dict, Iterable, Optional
+
+class FeedbackStats:
+    """Running feedback aggregates, kept in step with the feedback collection.
+
+    Holds the count and sentiment sum overall, per month and per document,
+    so reading statistics never touches the stored feedback. ``add`` and
+    ``remove`` take feedback metadata as written to the store; ``save``
+    persists the aggregates as JSON, and ``rebuild`` recomputes them from
+    the raw records when the file is missing or suspected stale.
+
+    All methods are thread-safe: the write-behind flusher updates the
+    aggregates on the event loop while a rebuild may run on another thread.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self._lock = threading.Lock()
+        # Orders snapshots on disk; kept apart from _lock so updates never wait on file I/O
+        self._save_lock = threading.Lock()
+        self.reset()
+        if path and os.path.exists(path):
+            with open(path) as f:
+                state = json.load(f)
+            self.count = state["count"]
+            self.sentiment_sum = state["sentiment_sum"]
+            self.by_month = state["by_month"]
+            self.by_document = state["by_document"]
+
+    @property
+    def persisted(self) -> bool:
+        return bool(self.path) and os.path.exists(self.path)
+
+    def reset(self):
+        with self._lock:
+            self.count = 0
+            self.sentiment_sum = 0.0
+            self.by_month: Dict[str, int] = {}
+            self.by_document: Dict[str, Dict[str, float]] = {}
+
+    def add(self, metadatas: Iterable[Dict[str, Any]]):
+        metadatas = list(metadatas)
+        with self._lock:
+            for metadata in metadatas:
+                self._apply(metadata, 1)
+
+    def remove(self, metadatas: Iterable[Dict[str, Any]]):
+        metadatas = list(metadatas)
+        with self._lock:
+            for metadata in metadatas:
+                self._apply(metadata, -1)
+
+    def rebuild(self, metadatas: Iterable[Dict[str, Any]]):
+        """Recompute from ``metadatas`` into fresh aggregates, swapped in once complete."""
+        fresh = FeedbackStats()
+        fresh.add(metadatas)
+        with self._lock:
+            self.count = fresh.count
+            self.sentiment_sum = fresh.sentiment_sum
+            self.by_month = fresh.by_month
+            self.by_document = fresh.by_document
+        self.save()
+
+    def save(self):
+        if not self.path:
+            return
+        with self._save_lock:
+            with self._lock:
+                state = json.dumps({
+                    "count": self.count,
+                    "sentiment_sum": self.sentiment_sum,
+                    "by_month": self.by_month,
+                    "by_document": self.by_document,
+                })
+            partial = f"{self.path}.{uuid.uuid4().hex}.part"
+            try:
+                with open(partial, "w") as f:
+                    f.write(state)
+                os.replace(partial, self.path)
+            except BaseException:
+                if os.path.exists(partial):
+                    os.remove(partial)
+                raise
+
+    def summary(self, document_id: Optional[str] = None) -> Dict[str, Any]:
+        with self._lock:
+            if document_id is not None:
+                bucket = self.by_document.get(document_id, {"count": 0, "sentiment_sum": 0.0})
+                return {
+                    "document_id": document_id,
+                    "total_feedback": bucket["count"],
+                    "average_sentiment": bucket["sentiment_sum"] / bucket["count"] if bucket["count"] else 0,
+                }
+            return {
+                "total_feedback": self.count,
+                "average_sentiment": self.sentiment_sum / self.count if self.count else 0,
+                "feedback_by_month": dict(sorted(self.by_month.items())),
+            }
+
+    def _apply(self, metadata: Dict[str, Any], sign: int):
+        sentiment = float(metadata.get("sentiment", 0))
+        month = datetime.fromisoformat(metadata["timestamp"]).strftime("%Y-%m")
+        self.count += sign
+        self.sentiment_sum += sign * sentiment
+        self.by_month[month] = self.by_month.get(month, 0) + sign
+        if not self.by_month[month]:
+            del self.by_month[month]
+
+        bucket = self.by_document.setdefault(metadata["document_id"], {"count": 0, "sentiment_sum": 0.0})
+        bucket["count"] += sign
+        bucket["sentiment_sum"] += sign * sentiment
+        if not bucket["count"]:
+            del self.by_document[metadata["document_id"]]
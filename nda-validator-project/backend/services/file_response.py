@@ -0,0 +1,101 @@
+import os
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Iterator, Optional, Tuple
+
+from fastapi import Request
+from fastapi.responses import FileResponse, Response, StreamingResponse
+
+DOCX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+CHUNK_SIZE = 64 * 1024
+
+def file_response(request: Request, path: str, filename: str,
+                  media_type: str = DOCX_MEDIA_TYPE) -> Response:
+    """Serve a file from disk with validators, conditional GET and single byte ranges.
+
+    The body is streamed from disk in chunks and never held in memory as a
+    whole. Repeat requests carrying a matching If-None-Match or
+    If-Modified-Since get an empty 304.
+    """
+    stat = os.stat(path)
+    etag = f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+    last_modified = formatdate(stat.st_mtime, usegmt=True)
+    validators = {"ETag": etag, "Last-Modified": last_modified}
+
+    if _not_modified(request, etag, stat.st_mtime):
+        return Response(status_code=304, headers=validators)
+
+    headers = {**validators, "Accept-Ranges": "bytes"}
+    range_header = request.headers.get("range")
+    if range_header and _if_range_matches(request, etag, last_modified):
+        byte_range = _parse_range(range_header, stat.st_size)
+        if byte_range == (-1, -1):
+            return Response(status_code=416, headers={"Content-Range": f"bytes */{stat.st_size}"})
+        if byte_range is not None:
+            start, end = byte_range
+            headers["Content-Range"] = f"bytes {start}-{end}/{stat.st_size}"
+            headers["Content-Length"] = str(end - start + 1)
+            headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+            return StreamingResponse(_iter_file(path, start, end - start + 1), status_code=206,
+                                     media_type=media_type, headers=headers)
+
+    return FileResponse(path, media_type=media_type, filename=filename,
+                        headers=headers, stat_result=stat)
+
+def _not_modified(request: Request, etag: str, mtime: float) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # If-None-Match takes precedence over If-Modified-Since
+        tags = [tag.strip() for tag in if_none_match.split(",")]
+        return "*" in tags or any(tag.removeprefix("W/") == etag for tag in tags)
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return int(mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+def _if_range_matches(request: Request, etag: str, last_modified: str) -> bool:
+    if_range = request.headers.get("if-range")
+    return if_range is None or if_range.strip() in (etag, last_modified)
+
+def _parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """Parse a single ``bytes=`` range.
+
+    Returns (start, end) inclusive, None to ignore the header and serve the
+    whole file, or (-1, -1) when the range cannot be satisfied.
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        # Multipart ranges are not worth supporting for .docx downloads
+        return None
+
+    first, _, last = spec.strip().partition("-")
+    try:
+        if not first:
+            suffix = int(last)
+            if suffix <= 0:
+                return -1, -1
+            start, end = max(size - suffix, 0), size - 1
+        else:
+            start = int(first)
+            if last and int(last) < start:
+                return None
+            end = min(int(last), size - 1) if last else size - 1
+    except ValueError:
+        return None
+
+    if start >= size:
+        return -1, -1
+    return start, end
+
+def _iter_file(path: str, start: int, length: int) -> Iterator[bytes]:
+    with open(path, "rb") as file:
+        file.seek(start)
+        while length > 0:
+            chunk = file.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
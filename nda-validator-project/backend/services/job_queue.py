@@ -0,0 +1,285 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+
+from services.worker_pool import ServerBusyError
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED = (SUCCEEDED, FAILED, CANCELLED)
+
+class JobCancelledError(Exception):
+    """Raised inside a job handler once cancellation has been requested."""
+
+class JobStore:
+    """SQLite table of jobs, their progress and their results."""
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        # Progress is reported from worker threads as well as the event loop
+        self._lock = threading.Lock()
+        with self._lock:
+            self._db.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    params TEXT NOT NULL,
+                    progress TEXT NOT NULL,
+                    result TEXT,
+                    error TEXT,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            """)
+            self._db.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status)")
+            self._db.commit()
+
+    def create(self, job_id: str, kind: str, params: Dict[str, Any], progress: Dict[str, Any]):
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO jobs (id, kind, status, params, progress, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (job_id, kind, QUEUED, json.dumps(params), json.dumps(progress), now, now)
+            )
+            self._db.commit()
+
+    def update(self, job_id: str, status: Optional[str] = None, progress: Optional[Dict[str, Any]] = None,
+               result: Any = None, error: Optional[str] = None):
+        fields = {"updated_at": time.time()}
+        if status is not None:
+            fields["status"] = status
+        if progress is not None:
+            fields["progress"] = json.dumps(progress)
+        if result is not None:
+            fields["result"] = json.dumps(result)
+        if error is not None:
+            fields["error"] = error
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        with self._lock:
+            self._db.execute(f"UPDATE jobs SET {assignments} WHERE id = ?", (*fields.values(), job_id))
+            self._db.commit()
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._db.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._to_dict(row) if row is not None else None
+
+    def list(self, kind: Optional[str] = None, status: Optional[str] = None, limit: int = 100) -> List[Dict[str, Any]]:
+        query, args = "SELECT * FROM jobs WHERE 1 = 1", []
+        if kind is not None:
+            query += " AND kind = ?"
+            args.append(kind)
+        if status is not None:
+            query += " AND status = ?"
+            args.append(status)
+        query += " ORDER BY created_at DESC LIMIT ?"
+        args.append(limit)
+        with self._lock:
+            rows = self._db.execute(query, args).fetchall()
+        return [self._to_dict(row) for row in rows]
+
+    def unfinished(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT * FROM jobs WHERE status IN (?, ?) ORDER BY created_at", (QUEUED, RUNNING)
+            ).fetchall()
+        return [self._to_dict(row) for row in rows]
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._db.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return {status: count for status, count in rows}
+
+    @staticmethod
+    def _to_dict(row: sqlite3.Row) -> Dict[str, Any]:
+        return {
+            "job_id": row["id"],
+            "kind": row["kind"],
+            "status": row["status"],
+            "params": json.loads(row["params"]),
+            "progress": json.loads(row["progress"]),
+            "result": json.loads(row["result"]) if row["result"] is not None else None,
+            "error": row["error"],
+            "created_at": row["created_at"],
+            "updated_at": row["updated_at"],
+        }
+
+class Job:
+    """Handle a running job uses to report progress and notice cancellation."""
+
+    def __init__(self, store: JobStore, job_id: str, kind: str, params: Dict[str, Any], stages: Sequence[str]):
+        self.store = store
+        self.job_id = job_id
+        self.kind = kind
+        self.params = params
+        self.progress = {
+            "stage": None,
+            "stages": {name: {"status": "pending", "done": 0, "total": None} for name in stages},
+        }
+        self.cancel_requested = False
+
+    def stage(self, name: str, total: Optional[int] = None):
+        """Mark the current stage done and start ``name``."""
+        self.check_cancelled()
+        current = self.progress["stage"]
+        if current is not None:
+            self.progress["stages"][current]["status"] = "done"
+        self.progress["stage"] = name
+        self.progress["stages"].setdefault(name, {"done": 0})
+        self.progress["stages"][name].update(status="running", total=total)
+        self.store.update(self.job_id, progress=self.progress)
+
+    def advance(self, done: int, total: Optional[int] = None):
+        """Report how far the current stage has got."""
+        self.check_cancelled()
+        stage = self.progress["stages"][self.progress["stage"]]
+        stage["done"] = done
+        if total is not None:
+            stage["total"] = total
+        self.store.update(self.job_id, progress=self.progress)
+
+    def finish(self):
+        current = self.progress["stage"]
+        if current is not None:
+            self.progress["stages"][current]["status"] = "done"
+        self.progress["stage"] = None
+
+    def check_cancelled(self):
+        if self.cancel_requested:
+            raise JobCancelledError(f"Job {self.job_id} was cancelled")
+
+Handler = Callable[[Job], Awaitable[Any]]
+
+class JobQueue:
+    """Run background jobs with persisted status, progress and results.
+
+    Each job kind has a handler, a list of stages for progress reporting and
+    its own concurrency limit; jobs beyond the limit wait in the queue.
+    Cancelling a queued job drops it; cancelling a running one stops it at
+    its next await or progress report. Work it started in a worker pool
+    holds its pool slot until it notices the cancellation. Jobs still queued or running when
+    the process stopped are started again by ``resume``.
+    """
+
+    def __init__(self, store: JobStore):
+        self.store = store
+        self._kinds: Dict[str, Dict[str, Any]] = {}
+        self._jobs: Dict[str, Job] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    def register(self, kind: str, handler: Handler, stages: Sequence[str], max_concurrent: int = 1):
+        self._kinds[kind] = {
+            "handler": handler,
+            "stages": list(stages),
+            "max_concurrent": max_concurrent,
+            "semaphore": None,
+            "running": 0,
+        }
+
+    def submit(self, kind: str, params: Dict[str, Any]) -> str:
+        """Queue a job and return its ID; ``params`` must be JSON-serializable."""
+        if kind not in self._kinds:
+            raise ValueError(f"Unknown job kind: {kind}")
+        job_id = uuid.uuid4().hex
+        job = Job(self.store, job_id, kind, params, self._kinds[kind]["stages"])
+        self.store.create(job_id, kind, params, job.progress)
+        self._start(job)
+        return job_id
+
+    def resume(self) -> int:
+        """Restart jobs left unfinished by a previous process; return how many."""
+        resumed = 0
+        for record in self.store.unfinished():
+            if record["kind"] not in self._kinds or record["job_id"] in self._jobs:
+                continue
+            job = Job(self.store, record["job_id"], record["kind"], record["params"],
+                      self._kinds[record["kind"]]["stages"])
+            self.store.update(job.job_id, status=QUEUED, progress=job.progress)
+            self._start(job)
+            resumed += 1
+        return resumed
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return self.store.get(job_id)
+
+    def list(self, kind: Optional[str] = None, status: Optional[str] = None, limit: int = 100) -> List[Dict[str, Any]]:
+        return self.store.list(kind, status, limit)
+
+    def cancel(self, job_id: str) -> bool:
+        """Request cancellation; return False if the job is unknown or already finished."""
+        job = self._jobs.get(job_id)
+        if job is None:
+            return False
+        job.cancel_requested = True
+        self._tasks[job_id].cancel()
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "jobs": self.store.counts(),
+            "kinds": {
+                kind: {
+                    "max_concurrent": spec["max_concurrent"],
+                    "running": spec["running"],
+                    "queued": sum(job.kind == kind for job in self._jobs.values()) - spec["running"],
+                }
+                for kind, spec in self._kinds.items()
+            },
+        }
+
+    def shutdown(self):
+        # Unfinished jobs keep their status and are picked up by resume()
+        for task in self._tasks.values():
+            task.cancel()
+
+    def _start(self, job: Job):
+        self._jobs[job.job_id] = job
+        self._tasks[job.job_id] = asyncio.get_running_loop().create_task(self._run(job))
+
+    async def _run(self, job: Job):
+        spec = self._kinds[job.kind]
+        if spec["semaphore"] is None:
+            spec["semaphore"] = asyncio.Semaphore(spec["max_concurrent"])
+
+        try:
+            async with spec["semaphore"]:
+                spec["running"] += 1
+                try:
+                    result = await self._run_handler(spec, job)
+                finally:
+                    spec["running"] -= 1
+            job.finish()
+            self.store.update(job.job_id, status=SUCCEEDED, progress=job.progress, result=result)
+        except (JobCancelledError, asyncio.CancelledError):
+            if not job.cancel_requested:
+                # Process shutdown: leave the job for resume()
+                raise
+            self.store.update(job.job_id, status=CANCELLED, progress=job.progress)
+        except Exception as e:
+            self.store.update(job.job_id, status=FAILED, progress=job.progress, error=str(e))
+        finally:
+            self._jobs.pop(job.job_id, None)
+            self._tasks.pop(job.job_id, None)
+
+    async def _run_handler(self, spec: Dict[str, Any], job: Job) -> Any:
+        while True:
+            job.check_cancelled()
+            self.store.update(job.job_id, status=RUNNING)
+            try:
+                return await spec["handler"](job)
+            except ServerBusyError as e:
+                # Pools are shared with interactive requests; wait for room
+                self.store.update(job.job_id, status=QUEUED)
+                await asyncio.sleep(e.retry_after)
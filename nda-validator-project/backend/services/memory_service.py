@@ -1,51 +1,190 @@
+import asyncio
 import chromadb
 from chromadb.config import Settings
 import json
-from typing import Dict, Any, List
+from typing import Any, Awaitable, Callable, Dict, List, Optional
 import os
+import time
 from datetime import datetime
+from services import config
+from services.feedback_stats import FeedbackStats
 
 class MemoryService:
-    def __init__(self):
-        self.client = chromadb.Client(Settings(
-            persist_directory="memory",
-            anonymized_telemetry=False
-        ))
+    """Long-term memory of NDAs and feedback in a persistent Chroma store.
+
+    Writes are queued and flushed in bulk, either once ``batch_size`` records
+    wait or every ``flush_interval`` seconds, so requests never wait on the
+    store. Vectors are the pooled legal-bert embeddings: passed in by the
+    caller, or fetched in one call to ``embed`` per flush, which reuses the
+    vectors of texts the classifier has just scored. Chroma's own embedding
+    model is never loaded.
+
+    Feedback statistics are running aggregates updated as feedback is
+    written, so reading them costs the same however much feedback exists.
+
+    Every record carries its write time as numeric ``epoch`` metadata next
+    to the ISO ``timestamp``, so expired records are selected by one
+    filtered query instead of a scan.
+    """
+
+    def __init__(self, embed: Optional[Callable[[List[str]], Awaitable[List[List[float]]]]] = None,
+                 path: str = config.MEMORY_DIR, batch_size: int = config.MEMORY_FLUSH_BATCH_SIZE,
+                 flush_interval: float = config.MEMORY_FLUSH_INTERVAL_SECONDS):
+        os.makedirs(path, exist_ok=True)
+        self.client = chromadb.PersistentClient(path=path, settings=Settings(anonymized_telemetry=False))
         
-        # Create or get collections
-        self.nda_collection = self.client.get_or_create_collection("ndas")
-        self.feedback_collection = self.client.get_or_create_collection("feedback")
+        # Create or get collections; vectors are always supplied, never computed by Chroma
+        self.nda_collection = self.client.get_or_create_collection(
+            "ndas", embedding_function=None, metadata={"hnsw:space": "cosine"})
+        self.feedback_collection = self.client.get_or_create_collection(
+            "feedback", embedding_function=None, metadata={"hnsw:space": "cosine"})
         
-        # Ensure memory directory exists
-        os.makedirs("memory", exist_ok=True)
-
-    async def save_document(self, document_id: str, content: str, metadata: Dict[str, Any]):
-        """Save an NDA document to the memory system."""
-        self.nda_collection.add(
-            documents=[content],
-            metadatas=[{
-                **metadata,
-                "timestamp": datetime.now().isoformat(),
-                "document_id": document_id
-            }],
-            ids=[document_id]
-        )
+        # Aggregates saved before this store existed (or lost) are recomputed once
+        self.feedback_stats = FeedbackStats(os.path.join(path, "feedback_stats.json"))
+        if not self.feedback_stats.persisted and self.feedback_collection.count():
+            self._rebuild_feedback_statistics()
+        # Records written before ``epoch`` existed are stamped once so retention can filter on it
+        self._epoch_marker = os.path.join(path, "epochs_backfilled")
+        if not os.path.exists(self._epoch_marker):
+            self.backfill_epochs()
+        
+        self.embed = embed
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._pending: List[Dict[str, Any]] = []
+        self._flusher: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._closing = False
+        self.records_written = 0
+        self.flushes = 0
+        self.last_error: Optional[str] = None
 
-    async def save_feedback(self, document_id: str, feedback: Dict[str, Any]):
-        """Save user feedback to the memory system."""
-        feedback_id = f"{document_id}_feedback_{datetime.now().isoformat()}"
-        self.feedback_collection.add(
-            documents=[json.dumps(feedback)],
-            metadatas=[{
-                "document_id": document_id,
-                "timestamp": datetime.now().isoformat(),
-                "sentiment": feedback.get("sentiment", 0)
-            }],
-            ids=[feedback_id]
-        )
+    async def save_document(self, document_id: str, content: str, metadata: Dict[str, Any],
+                            embedding: Optional[List[float]] = None):
+        """Queue an NDA document for the memory system."""
+        now = time.time()
+        self._enqueue(self.nda_collection, document_id, content, content, embedding, {
+            **metadata,
+            "timestamp": datetime.fromtimestamp(now).isoformat(),
+            "epoch": now,
+            "document_id": document_id
+        })
+
+    async def save_feedback(self, document_id: str, feedback: Dict[str, Any],
+                            embedding: Optional[List[float]] = None):
+        """Queue user feedback for the memory system."""
+        now = time.time()
+        timestamp = datetime.fromtimestamp(now).isoformat()
+        self._enqueue(self.feedback_collection, f"{document_id}_feedback_{timestamp}", json.dumps(feedback),
+                      feedback.get("feedback_text", ""), embedding, {
+                          "document_id": document_id,
+                          "timestamp": timestamp,
+                          "epoch": now,
+                          "sentiment": feedback.get("sentiment", 0)
+                      })
+
+    async def flush(self):
+        """Write every queued record now, in one bulk upsert per collection."""
+        self._ensure_started()
+        async with self._flush_lock:
+            records, self._pending = self._pending, []
+            if not records:
+                return
+            remaining = records
+            try:
+                missing = [record for record in records if record["embedding"] is None]
+                if missing:
+                    if self.embed is None:
+                        raise RuntimeError("MemoryService needs embeddings or an embed function")
+                    # The embedded text is the feedback itself, not its JSON wrapper
+                    vectors = await self.embed([record["embed_text"] for record in missing])
+                    for record, vector in zip(missing, vectors):
+                        record["embedding"] = vector
+                
+                loop = asyncio.get_running_loop()
+                for collection in {id(record["collection"]): record["collection"] for record in records}.values():
+                    batch = [record for record in remaining if record["collection"] is collection]
+                    await loop.run_in_executor(None, lambda: collection.upsert(
+                        ids=[record["id"] for record in batch],
+                        documents=[record["document"] for record in batch],
+                        metadatas=[record["metadata"] for record in batch],
+                        embeddings=[record["embedding"] for record in batch],
+                    ))
+                    remaining = [record for record in remaining if record["collection"] is not collection]
+                    if collection is self.feedback_collection:
+                        self.feedback_stats.add(record["metadata"] for record in batch)
+                        self.feedback_stats.save()
+            except BaseException as e:
+                # Keep unwritten records for the next flush, also when the flush is
+                # cancelled; written ones are never counted twice
+                self._pending[:0] = remaining
+                if isinstance(e, Exception):
+                    self.last_error = str(e)
+                raise
+            self.records_written += len(records)
+            self.flushes += 1
+            self.last_error = None
+
+    async def close(self):
+        """Stop the background flusher once it has written what is still queued."""
+        self._closing = True
+        if self._flusher is not None:
+            # Cancelling could interrupt a flush halfway; let the current one finish
+            self._wakeup.set()
+            await self._flusher
+            self._flusher = None
+        if self._pending:
+            await self.flush()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "pending": len(self._pending),
+            "records_written": self.records_written,
+            "flushes": self.flushes,
+            "average_flush_size": self.records_written / self.flushes if self.flushes else 0,
+            "last_error": self.last_error,
+        }
+
+    def _enqueue(self, collection, record_id: str, document: str, embed_text: str,
+                 embedding: Optional[List[float]], metadata: Dict[str, Any]):
+        self._ensure_started()
+        self._pending.append({
+            "collection": collection,
+            "id": record_id,
+            "document": document,
+            "embed_text": embed_text,
+            "embedding": embedding,
+            "metadata": metadata,
+        })
+        if len(self._pending) >= self.batch_size:
+            self._wakeup.set()
+
+    def _ensure_started(self):
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+            self._wakeup = asyncio.Event()
+        if not self._closing and (self._flusher is None or self._flusher.done()):
+            self._flusher = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self):
+        # Exits after the flush that follows close()
+        while not self._closing:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            if self._pending:
+                try:
+                    await self.flush()
+                except Exception:
+                    # Already recorded in last_error; retried on the next tick
+                    pass
 
     async def get_document_history(self, document_id: str) -> List[Dict[str, Any]]:
         """Retrieve the history of a document including all feedback."""
+        await self.flush()
         # Get the document
         document = self.nda_collection.get(
             where={"document_id": document_id}
@@ -61,55 +200,113 @@ class MemoryService:
             "feedback": feedback
         }
 
-    async def search_similar_documents(self, query: str, n_results: int = 5) -> List[Dict[str, Any]]:
+    async def search_similar_documents(self, query: str, n_results: int = 5,
+                                       query_embedding: Optional[List[float]] = None) -> List[Dict[str, Any]]:
         """Search for similar documents in the memory system."""
+        await self.flush()
+        if query_embedding is None:
+            query_embedding = (await self.embed([query]))[0]
         results = self.nda_collection.query(
-            query_texts=[query],
+            query_embeddings=[query_embedding],
             n_results=n_results
         )
         return results
 
-    async def get_feedback_statistics(self) -> Dict[str, Any]:
-        """Get statistics about feedback patterns."""
-        all_feedback = self.feedback_collection.get()
-        
-        if not all_feedback["metadatas"]:
-            return {
-                "total_feedback": 0,
-                "average_sentiment": 0,
-                "feedback_by_month": {}
-            }
-        
-        # Calculate statistics
-        sentiments = [f["sentiment"] for f in all_feedback["metadatas"]]
-        feedback_by_month = {}
-        
-        for feedback in all_feedback["metadatas"]:
-            month = datetime.fromisoformat(feedback["timestamp"]).strftime("%Y-%m")
-            feedback_by_month[month] = feedback_by_month.get(month, 0) + 1
+    async def get_feedback_statistics(self, document_id: Optional[str] = None) -> Dict[str, Any]:
+        """Get statistics about feedback patterns, overall or for one document.
+
+        Reads the running aggregates without flushing; feedback still queued
+        is counted in ``pending_feedback`` and joins the aggregates on the next flush.
+        """
+        pending = sum(record["collection"] is self.feedback_collection
+                      and (document_id is None or record["metadata"]["document_id"] == document_id)
+                      for record in self._pending)
+        return {**self.feedback_stats.summary(document_id), "pending_feedback": pending}
+
+    async def rebuild_feedback_statistics(self) -> Dict[str, Any]:
+        """Recompute the feedback aggregates from the stored feedback.
+
+        Queued feedback is written first. Flushes and retention deletes wait
+        until the rebuild is done, so no record is missed or counted twice.
+        """
+        await self.flush()
+        async with self._flush_lock:
+            return await asyncio.get_running_loop().run_in_executor(None, self._rebuild_feedback_statistics)
+
+    def _rebuild_feedback_statistics(self, page_size: int = 1000) -> Dict[str, Any]:
+        """Recompute the feedback aggregates from the stored records, page by page."""
+        def metadatas():
+            offset = 0
+            while True:
+                page = self.feedback_collection.get(include=["metadatas"], limit=page_size, offset=offset)
+                yield from page["metadatas"]
+                if len(page["ids"]) < page_size:
+                    return
+                offset += page_size
         
-        return {
-            "total_feedback": len(sentiments),
-            "average_sentiment": sum(sentiments) / len(sentiments),
-            "feedback_by_month": feedback_by_month
-        }
+        self.feedback_stats.rebuild(metadatas())
+        return self.feedback_stats.summary()
+
+    def backfill_epochs(self, page_size: int = 1000):
+        """Add ``epoch`` metadata, derived from ``timestamp``, to records that lack it."""
+        for collection in (self.nda_collection, self.feedback_collection):
+            offset = 0
+            while True:
+                page = collection.get(include=["metadatas"], limit=page_size, offset=offset)
+                stale = [(record_id, metadata) for record_id, metadata in zip(page["ids"], page["metadatas"])
+                         if "epoch" not in metadata]
+                if stale:
+                    collection.update(
+                        ids=[record_id for record_id, _ in stale],
+                        metadatas=[{**metadata, "epoch": datetime.fromisoformat(metadata["timestamp"]).timestamp()}
+                                   for _, metadata in stale],
+                    )
+                if len(page["ids"]) < page_size:
+                    break
+                offset += page_size
+        with open(self._epoch_marker, "w"):
+            pass
 
-    async def clear_old_documents(self, days_threshold: int = 365):
-        """Clear documents and feedback older than the threshold."""
-        current_time = datetime.now()
+    async def clear_old_documents(self, days_threshold: int = 365, batch_size: int = config.RETENTION_BATCH_SIZE,
+                                  pause: float = 0.0) -> Dict[str, int]:
+        """Delete documents and feedback older than the threshold, with the feedback of deleted documents.
+
+        Expired records are selected by an ``epoch`` filter and deleted
+        ``batch_size`` at a time, sleeping ``pause`` seconds between
+        batches so a large sweep does not monopolize the store.
+        """
+        await self.flush()
+        loop = asyncio.get_running_loop()
+        cutoff = time.time() - days_threshold * 86400
+        documents_deleted = feedback_deleted = 0
         
-        # Get all documents
-        all_documents = self.nda_collection.get()
+        while True:
+            expired = await loop.run_in_executor(None, lambda: self.nda_collection.get(
+                where={"epoch": {"$lt": cutoff}}, include=["metadatas"], limit=batch_size))
+            if not expired["ids"]:
+                break
+            document_ids = sorted({metadata["document_id"] for metadata in expired["metadatas"]})
+            # Feedback goes first, so a failed sweep never leaves feedback without its document
+            feedback_deleted += await self._delete_feedback({"document_id": {"$in": document_ids}}, batch_size, pause)
+            await loop.run_in_executor(None, lambda: self.nda_collection.delete(ids=expired["ids"]))
+            documents_deleted += len(expired["ids"])
+            await asyncio.sleep(pause)
         
-        # Filter out old documents
-        for doc_id, metadata in zip(all_documents["ids"], all_documents["metadatas"]):
-            doc_time = datetime.fromisoformat(metadata["timestamp"])
-            if (current_time - doc_time).days > days_threshold:
-                self.nda_collection.delete(ids=[doc_id])
-                
-                # Also delete associated feedback
-                feedback = self.feedback_collection.get(
-                    where={"document_id": metadata["document_id"]}
-                )
-                if feedback["ids"]:
-                    self.feedback_collection.delete(ids=feedback["ids"]) 
\ No newline at end of file
+        feedback_deleted += await self._delete_feedback({"epoch": {"$lt": cutoff}}, batch_size, pause)
+        return {"documents_deleted": documents_deleted, "feedback_deleted": feedback_deleted}
+
+    async def _delete_feedback(self, where: Dict[str, Any], batch_size: int, pause: float) -> int:
+        loop = asyncio.get_running_loop()
+        deleted = 0
+        while True:
+            # Held so a concurrent statistics rebuild never sees half of a batch
+            async with self._flush_lock:
+                batch = await loop.run_in_executor(None, lambda: self.feedback_collection.get(
+                    where=where, include=["metadatas"], limit=batch_size))
+                if not batch["ids"]:
+                    return deleted
+                await loop.run_in_executor(None, lambda: self.feedback_collection.delete(ids=batch["ids"]))
+                self.feedback_stats.remove(batch["metadatas"])
+                self.feedback_stats.save()
+            deleted += len(batch["ids"])
+            await asyncio.sleep(pause)
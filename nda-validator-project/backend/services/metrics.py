@@ -0,0 +1,136 @@
+import bisect
+import contextvars
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Seconds; from a cached prefilter call up to a long document's redline save
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128)
+
+# Set per HTTP request by the middleware; copied into tasks the request starts
+request_id = contextvars.ContextVar("request_id", default=None)
+# Seconds per stage for the current request, summed over repeated stages
+request_spans = contextvars.ContextVar("request_spans", default=None)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+class Metrics:
+    """In-process counters and histograms, rendered in the Prometheus text format.
+
+    Recording is a dict update under a lock, cheap enough to leave on in
+    production. Values that services already track (cache hits, queue
+    depth, ...) are not duplicated: ``collector`` callbacks report them
+    when ``/metrics`` is scraped.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[Labels, float]] = {}
+        # name -> labels -> (bucket counts, sum, count)
+        self._histograms: Dict[str, Dict[Labels, List[Any]]] = {}
+        self._buckets: Dict[str, Sequence[float]] = {}
+        self._help: Dict[str, str] = {}
+        self._collectors: List[Callable[[], Iterator[Tuple[str, str, Dict[str, str], float]]]] = []
+
+    def describe(self, name: str, help_text: str):
+        self._help[name] = help_text
+
+    def inc(self, name: str, value: float = 1, **labels: str):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def observe(self, name: str, value: float, buckets: Sequence[float] = LATENCY_BUCKETS, **labels: str):
+        key = tuple(sorted(labels.items()))
+        index = bisect.bisect_left(buckets, value)
+        with self._lock:
+            self._buckets.setdefault(name, buckets)
+            series = self._histograms.setdefault(name, {})
+            state = series.get(key)
+            if state is None:
+                state = series[key] = [[0] * (len(buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def span(self, stage: str) -> "Span":
+        """Time a ``with`` block into ``nda_stage_seconds`` and the current request's span totals."""
+        return Span(self, stage)
+
+    def collector(self, collect: Callable[[], Iterator[Tuple[str, str, Dict[str, str], float]]]):
+        """Register a callback yielding (name, type, labels, value) samples at scrape time."""
+        self._collectors.append(collect)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        with self._lock:
+            counters = {name: dict(series) for name, series in self._counters.items()}
+            histograms = {name: {key: [list(state[0]), state[1], state[2]] for key, state in series.items()}
+                          for name, series in self._histograms.items()}
+
+        for name, series in sorted(counters.items()):
+            self._header(lines, name, "counter")
+            for key, value in series.items():
+                lines.append(f"{name}{_labels(key)} {_number(value)}")
+
+        for name, series in sorted(histograms.items()):
+            self._header(lines, name, "histogram")
+            bounds = list(self._buckets[name]) + [float("inf")]
+            for key, (counts, total, count) in series.items():
+                cumulative = 0
+                for bound, bucket_count in zip(bounds, counts):
+                    cumulative += bucket_count
+                    le = "+Inf" if bound == float("inf") else _number(bound)
+                    lines.append(f"{name}_bucket{_labels(key + (('le', le),))} {cumulative}")
+                lines.append(f"{name}_sum{_labels(key)} {_number(total)}")
+                lines.append(f"{name}_count{_labels(key)} {count}")
+
+        collected: Dict[str, Tuple[str, List[str]]] = {}
+        for collect in self._collectors:
+            for name, kind, labels, value in collect():
+                samples = collected.setdefault(name, (kind, []))[1]
+                samples.append(f"{name}{_labels(tuple(sorted(labels.items())))} {_number(value)}")
+        for name, (kind, samples) in sorted(collected.items()):
+            self._header(lines, name, kind)
+            lines.extend(samples)
+        return "\n".join(lines) + "\n"
+
+    def _header(self, lines: List[str], name: str, kind: str):
+        if name in self._help:
+            lines.append(f"# HELP {name} {self._help[name]}")
+        lines.append(f"# TYPE {name} {kind}")
+
+class Span:
+    # A plain class rather than @contextmanager: spans sit on every request path
+    __slots__ = ("metrics", "stage", "start")
+
+    def __init__(self, metrics: Metrics, stage: str):
+        self.metrics = metrics
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc_info):
+        elapsed = time.perf_counter() - self.start
+        self.metrics.observe("nda_stage_seconds", elapsed, stage=self.stage)
+        spans = request_spans.get()
+        if spans is not None:
+            spans[self.stage] = spans.get(self.stage, 0.0) + elapsed
+
+def _labels(key: Labels) -> str:
+    if not key:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"') for _, value in key)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(key, escaped)) + "}"
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+metrics = Metrics()
+metrics.describe("nda_stage_seconds", "Time spent per analysis stage")
+metrics.describe("nda_http_request_seconds", "HTTP request latency by handler, method and status")
+metrics.describe("nda_paragraphs_scored_total", "Paragraphs run through a model forward pass")
+metrics.describe("nda_batch_size", "Texts per scheduler batch")
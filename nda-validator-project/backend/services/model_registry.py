@@ -0,0 +1,234 @@
+from transformers import AutoTokenizer, AutoModelForSequenceClassification
+import hashlib
+import io
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+import torch
+from services.inference_backends import (
+    BACKENDS, TorchBackend, QuantizedTorchBackend, OnnxBackend, export_onnx, onnx_model_path
+)
+
+class LoadedModel:
+    """A model loaded by the registry, with its load cost.
+
+    ``version`` fingerprints the checkpoint files the model was loaded from,
+    so anything derived from this model's outputs can be keyed on it.
+    """
+
+    def __init__(self, model_dir: str, role: str, model, backend, version: str, load_seconds: float,
+                 memory_bytes: int, shares_encoder: bool):
+        self.model_dir = model_dir
+        self.role = role
+        # ``model`` is the torch module, or None when serving from ONNX
+        self.model = model
+        self.backend = backend
+        self.version = version
+        self.load_seconds = load_seconds
+        self.memory_bytes = memory_bytes
+        self.shares_encoder = shares_encoder
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "model_dir": self.model_dir,
+            "role": self.role,
+            "backend": self.backend.kind,
+            "version": self.version,
+            "load_seconds": round(self.load_seconds, 3),
+            "memory_bytes": self.memory_bytes,
+            "shares_encoder": self.shares_encoder,
+        }
+
+class ModelRegistry:
+    """Process-wide cache of models and tokenizers.
+
+    Each (model_dir, role) pair is loaded once, on first use or during
+    ``warmup``, and handed to every service that asks for it. Tokenizers are
+    shared per model_dir. Roles that only add a classification head on top of
+    the same checkpoint can share its encoder weights, so the base model is
+    held in memory once no matter how many heads sit on it.
+
+    Each model is served through an inference backend: eager ``torch``,
+    dynamically ``quantized`` int8 torch, or an ``onnx`` export run with
+    onnxruntime (exported on first load if missing).
+    """
+
+    def __init__(self):
+        self._models: Dict[Tuple[str, str], LoadedModel] = {}
+        self._tokenizers: Dict[str, Any] = {}
+        self._encoders: Dict[str, Any] = {}
+        self._lock = threading.RLock()
+        self._ready = threading.Event()
+        self.warmup_seconds: Optional[float] = None
+
+    @property
+    def ready(self) -> bool:
+        return self._ready.is_set()
+
+    def get_tokenizer(self, model_dir: str):
+        """Return the tokenizer for model_dir, loading it on first use."""
+        with self._lock:
+            if model_dir not in self._tokenizers:
+                self._tokenizers[model_dir] = AutoTokenizer.from_pretrained(model_dir)
+            return self._tokenizers[model_dir]
+
+    def get(self, model_dir: str, role: str, share_encoder: bool = True,
+            backend: str = "torch") -> LoadedModel:
+        """Return the model for (model_dir, role), loading it on first use.
+
+        Models that will be trained must pass ``share_encoder=False`` and the
+        ``torch`` backend so that fine-tuning never touches weights another
+        role is serving with.
+        """
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown inference backend: {backend}")
+        key = (model_dir, role)
+        with self._lock:
+            if key not in self._models:
+                self._models[key] = self._load(model_dir, role, share_encoder, backend)
+            return self._models[key]
+
+    def reload(self, model_dir: str, role: str, share_encoder: bool = False,
+               backend: str = "torch") -> LoadedModel:
+        """Load (model_dir, role) and its tokenizer from disk again, replacing any cached copy.
+
+        Loading happens outside the registry lock, so models already being
+        served stay available meanwhile. Callers still holding the previous
+        copy keep using it until they drop it.
+        """
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown inference backend: {backend}")
+        if backend == "onnx" and os.path.exists(onnx_model_path(model_dir, role)):
+            # The export may predate a retrained checkpoint
+            os.remove(onnx_model_path(model_dir, role))
+        tokenizer = AutoTokenizer.from_pretrained(model_dir)
+        loaded = self._load(model_dir, role, share_encoder, backend)
+        with self._lock:
+            self._tokenizers[model_dir] = tokenizer
+            self._models[(model_dir, role)] = loaded
+        return loaded
+
+    def release(self, model_dir: str, role: str):
+        """Drop a loaded model so its weights can be freed."""
+        with self._lock:
+            self._models.pop((model_dir, role), None)
+            if not any(loaded.model_dir == model_dir and loaded.shares_encoder
+                       for loaded in self._models.values()):
+                self._encoders.pop(model_dir, None)
+
+    def warmup(self, targets: List[Tuple[str, str]], backend: str = "torch"):
+        """Load the given (model_dir, role) pairs and mark the registry ready."""
+        start = time.perf_counter()
+        for model_dir, role in targets:
+            self.get_tokenizer(model_dir)
+            self.get(model_dir, role, backend=backend)
+        self.warmup_seconds = time.perf_counter() - start
+        self._ready.set()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            models = [loaded.stats() for loaded in self._models.values()]
+            encoder_bytes = sum(self._module_bytes(encoder) for encoder in self._encoders.values())
+        return {
+            "ready": self.ready,
+            "warmup_seconds": self.warmup_seconds,
+            "models": models,
+            "shared_encoder_bytes": encoder_bytes,
+            "total_memory_bytes": encoder_bytes + sum(m["memory_bytes"] for m in models),
+        }
+
+    def _load(self, model_dir: str, role: str, share_encoder: bool, backend: str) -> LoadedModel:
+        start = time.perf_counter()
+
+        if backend == "onnx":
+            path = onnx_model_path(model_dir, role)
+            if not os.path.exists(path):
+                export_onnx(self._from_pretrained(model_dir, role),
+                            self.get_tokenizer(model_dir), path)
+            serving = OnnxBackend(path)
+            if not serving.has_embeddings:
+                # Re-export older graphs so memory can reuse the pooled vectors
+                export_onnx(self._from_pretrained(model_dir, role),
+                            self.get_tokenizer(model_dir), path)
+                serving = OnnxBackend(path)
+            stat = os.stat(path)
+            version = hashlib.sha256(f"{path}:{stat.st_size}:{stat.st_mtime_ns}".encode("utf-8")).hexdigest()[:16]
+            return LoadedModel(model_dir, role, None, serving, f"{version}-onnx",
+                               time.perf_counter() - start, stat.st_size, False)
+
+        model = self._from_pretrained(model_dir, role)
+        model.eval()
+        version = self._fingerprint(model_dir, role, model)
+
+        if backend == "quantized":
+            serving = QuantizedTorchBackend(model)
+            model = serving.model
+            load_seconds = time.perf_counter() - start
+            return LoadedModel(model_dir, role, model, serving, f"{version}-quantized",
+                               load_seconds, self._state_dict_bytes(model), False)
+
+        shares_encoder = False
+        if share_encoder:
+            prefix = model.base_model_prefix
+            if model_dir in self._encoders:
+                # Identical pretrained weights; keep only this role's head
+                setattr(model, prefix, self._encoders[model_dir])
+            else:
+                self._encoders[model_dir] = getattr(model, prefix)
+            shares_encoder = True
+
+        load_seconds = time.perf_counter() - start
+        if shares_encoder:
+            encoder = self._encoders[model_dir]
+            encoder_tensors = {id(t) for t in list(encoder.parameters()) + list(encoder.buffers())}
+            memory_bytes = self._module_bytes(model, exclude=encoder_tensors)
+        else:
+            memory_bytes = self._module_bytes(model)
+
+        return LoadedModel(model_dir, role, model, TorchBackend(model), version,
+                           load_seconds, memory_bytes, shares_encoder)
+
+    @staticmethod
+    def _from_pretrained(model_dir: str, role: str):
+        """Load a checkpoint, seeding any head it lacks from the role.
+
+        Heads missing from a base checkpoint are initialized randomly. Seeding
+        makes them the same on every load, so versions stay truthful, while a
+        seed per role keeps e.g. the classifier and validator heads independent.
+        """
+        seed = int.from_bytes(hashlib.sha256(role.encode("utf-8")).digest()[:4], "big")
+        with torch.random.fork_rng():
+            torch.manual_seed(seed)
+            return AutoModelForSequenceClassification.from_pretrained(model_dir)
+
+    @staticmethod
+    def _fingerprint(model_dir: str, role: str, model) -> str:
+        """Version from the checkpoint on disk, stable across restarts.
+
+        A local directory is identified by the size and modification time
+        of its config and weight files, a hub checkpoint by the commit it
+        was downloaded at.
+        """
+        digest = hashlib.sha256(f"{model_dir}:{role}".encode("utf-8"))
+        if os.path.isdir(model_dir):
+            for name in sorted(os.listdir(model_dir)):
+                if name == "config.json" or name.endswith((".safetensors", ".bin")):
+                    stat = os.stat(os.path.join(model_dir, name))
+                    digest.update(f"{name}:{stat.st_size}:{stat.st_mtime_ns}".encode("utf-8"))
+        else:
+            digest.update(str(getattr(model.config, "_commit_hash", None)).encode("utf-8"))
+        return digest.hexdigest()[:16]
+
+    @staticmethod
+    def _state_dict_bytes(module) -> int:
+        # Packed int8 weights are not parameters, so measure the serialized state
+        buffer = io.BytesIO()
+        torch.save(module.state_dict(), buffer)
+        return buffer.tell()
+
+    @staticmethod
+    def _module_bytes(module, exclude: Optional[set] = None) -> int:
+        exclude = exclude or set()
+        tensors = list(module.parameters()) + list(module.buffers())
+        return sum(t.numel() * t.element_size() for t in tensors if id(t) not in exclude)
@@ -0,0 +1,147 @@
+import difflib
+import hashlib
+import json
+import multiprocessing
+import os
+import shutil
+import subprocess
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+from docx import Document
+from docx.oxml.ns import qn
+
+# Bump when the extraction output changes so stale cache entries are ignored
+EXTRACTION_VERSION = 1
+
+_TEXT_TAGS = {qn("w:t"): None, qn("w:tab"): "\t", qn("w:br"): "\n", qn("w:cr"): "\n"}
+_DELETED = qn("w:del")
+
+def file_hash(path: str, chunk_size: int = 1024 * 1024) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def extract_paragraphs(path: str) -> List[str]:
+    """Return the non-empty paragraph texts of a .docx or .doc file.
+
+    Tracked changes are read as accepted: inserted text is kept and deleted
+    text dropped, so redlines yield the text they propose. Legacy .doc files
+    are converted with LibreOffice, which must then be on the PATH.
+    """
+    if path.lower().endswith(".doc"):
+        with tempfile.TemporaryDirectory() as tmp:
+            return _extract_docx(_convert_doc(path, tmp))
+    return _extract_docx(path)
+
+def _extract_docx(path: str) -> List[str]:
+    paragraphs = []
+    # Body-level paragraphs only, like the documents seen at inference time
+    for p in Document(path).element.body.xpath("w:p"):
+        parts = []
+        for element in p.iter(*_TEXT_TAGS):
+            if any(ancestor.tag == _DELETED for ancestor in element.iterancestors()):
+                continue
+            text = _TEXT_TAGS[element.tag]
+            parts.append(element.text or "" if text is None else text)
+        text = "".join(parts)
+        if text.strip():
+            paragraphs.append(text)
+    return paragraphs
+
+def _convert_doc(path: str, out_dir: str) -> str:
+    soffice = shutil.which("soffice") or shutil.which("libreoffice")
+    if soffice is None:
+        raise RuntimeError(f"Cannot read {path}: converting .doc files needs LibreOffice (soffice) on the PATH")
+    subprocess.run([soffice, "--headless", "--convert-to", "docx", "--outdir", out_dir, path],
+                   check=True, capture_output=True, timeout=120)
+    return os.path.join(out_dir, os.path.splitext(os.path.basename(path))[0] + ".docx")
+
+class ParagraphExtractor:
+    """Extract paragraphs from many documents in parallel, cached on disk by file hash.
+
+    Cached entries are keyed by the SHA-256 of the file content, so renamed
+    or copied files hit the cache and edited files miss it.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, workers: Optional[int] = None):
+        self.cache_dir = cache_dir
+        self.workers = workers or os.cpu_count() or 1
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+
+    def extract_many(self, paths: Sequence[str]) -> Dict[str, Union[List[str], str]]:
+        """Return paragraphs by path; files that cannot be read map to an error string."""
+        results: Dict[str, Union[List[str], str]] = {}
+        pending: Dict[str, List[str]] = {}
+        for path in dict.fromkeys(paths):
+            digest = file_hash(path)
+            cached = self._load(digest)
+            if cached is not None:
+                results[path] = cached
+                self.hits += 1
+            else:
+                pending.setdefault(digest, []).append(path)
+                self.misses += 1
+
+        for digest, paragraphs in self._extract_pending(pending).items():
+            if isinstance(paragraphs, list):
+                self._store(digest, paragraphs)
+            for path in pending[digest]:
+                results[path] = paragraphs
+        return results
+
+    def _extract_pending(self, pending: Dict[str, List[str]]) -> Dict[str, Union[List[str], str]]:
+        jobs = [(digest, paths[0]) for digest, paths in pending.items()]
+        if len(jobs) <= 1 or self.workers <= 1:
+            return dict(_extract_safely(job) for job in jobs)
+        # Spawned, not forked: the server process may already run torch threads
+        with ProcessPoolExecutor(max_workers=min(self.workers, len(jobs)),
+                                 mp_context=multiprocessing.get_context("spawn")) as executor:
+            return dict(executor.map(_extract_safely, jobs, chunksize=max(1, len(jobs) // (self.workers * 4))))
+
+    def _cache_path(self, digest: str) -> str:
+        return os.path.join(self.cache_dir, f"{digest}.json")
+
+    def _load(self, digest: str) -> Optional[List[str]]:
+        if not self.cache_dir or not os.path.exists(self._cache_path(digest)):
+            return None
+        with open(self._cache_path(digest)) as f:
+            entry = json.load(f)
+        return entry["paragraphs"] if entry.get("version") == EXTRACTION_VERSION else None
+
+    def _store(self, digest: str, paragraphs: List[str]):
+        if not self.cache_dir:
+            return
+        partial = f"{self._cache_path(digest)}.{os.getpid()}.part"
+        with open(partial, "w") as f:
+            json.dump({"version": EXTRACTION_VERSION, "paragraphs": paragraphs}, f)
+        os.replace(partial, self._cache_path(digest))
+
+def _extract_safely(job: Tuple[str, str]) -> Tuple[str, Union[List[str], str]]:
+    digest, path = job
+    try:
+        return digest, extract_paragraphs(path)
+    except Exception as e:
+        return digest, f"{type(e).__name__}: {e}"
+
+def align_paragraphs(source: List[str], target: List[str]) -> List[Optional[str]]:
+    """Map each source paragraph to its counterpart in ``target``.
+
+    Unchanged paragraphs map to themselves, rewritten ones to the paragraph
+    that replaced them, and removed ones to None, so an inserted or deleted
+    paragraph does not shift everything after it.
+    """
+    aligned: List[Optional[str]] = [None] * len(source)
+    matcher = difflib.SequenceMatcher(None, source, target, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal" or tag == "replace":
+            # Inside a replaced block paragraphs are paired in order
+            for offset in range(min(i2 - i1, j2 - j1)):
+                aligned[i1 + offset] = target[j1 + offset]
+    return aligned
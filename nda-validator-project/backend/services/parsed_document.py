@@ -0,0 +1,124 @@
+import sys
+from array import array
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from docx import Document
+
+class ParsedParagraph:
+    """Lightweight view of one paragraph of a ParsedDocument."""
+
+    __slots__ = ("document", "index")
+
+    def __init__(self, document: "ParsedDocument", index: int):
+        self.document = document
+        self.index = index
+
+    @property
+    def text(self) -> str:
+        return self.document.texts[self.index]
+
+    @property
+    def style(self) -> str:
+        return self.document.style_names[self.document.style_ids[self.index]]
+
+    @property
+    def previous(self) -> Optional["ParsedParagraph"]:
+        return self.document.paragraph(self.index - 1)
+
+    @property
+    def next(self) -> Optional["ParsedParagraph"]:
+        return self.document.paragraph(self.index + 1)
+
+class ParsedDocument:
+    """Parse-once, read-only representation of a .docx body.
+
+    Paragraph text and style live in flat parallel arrays indexed by the
+    paragraph's position in the source document, so indices are stable and
+    neighbours are an index away. Style names are interned in a small table.
+    Instances hold no lxml objects and are picklable.
+    """
+
+    __slots__ = ("document_id", "source_path", "mtime_ns", "texts", "style_ids", "style_names")
+
+    def __init__(self, document_id: str, source_path: str, mtime_ns: int,
+                 texts: List[str], style_ids: array, style_names: List[str]):
+        self.document_id = document_id
+        self.source_path = source_path
+        self.mtime_ns = mtime_ns
+        self.texts = texts
+        self.style_ids = style_ids
+        self.style_names = style_names
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def paragraph(self, index: int) -> Optional[ParsedParagraph]:
+        if 0 <= index < len(self.texts):
+            return ParsedParagraph(self, index)
+        return None
+
+    @property
+    def paragraphs(self) -> List[ParsedParagraph]:
+        return [ParsedParagraph(self, index) for index in range(len(self.texts))]
+
+    def nbytes(self) -> int:
+        """Approximate memory held by this document."""
+        return (sys.getsizeof(self.texts) + sum(sys.getsizeof(text) for text in self.texts)
+                + sys.getsizeof(self.style_ids)
+                + sys.getsizeof(self.style_names) + sum(sys.getsizeof(name) for name in self.style_names))
+
+def load_parsed_document(document_id: str, path: str, mtime_ns: int) -> ParsedDocument:
+    """Parse a .docx from disk into a ParsedDocument."""
+    doc = Document(path)
+    texts = []
+    style_ids = array("H")
+    style_names: List[str] = []
+    style_index: Dict[str, int] = {}
+
+    for paragraph in doc.paragraphs:
+        texts.append(paragraph.text)
+        # The raw style id avoids a styles-part lookup per paragraph
+        style = paragraph._p.style or ""
+        if style not in style_index:
+            style_index[style] = len(style_names)
+            style_names.append(style)
+        style_ids.append(style_index[style])
+
+    return ParsedDocument(document_id, path, mtime_ns, texts, style_ids, style_names)
+
+class ParsedDocumentCache:
+    """LRU of parsed documents keyed by document id and file modification time."""
+
+    def __init__(self, max_documents: int = 64):
+        self.max_documents = max_documents
+        self._documents: "OrderedDict[str, ParsedDocument]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, document_id: str, mtime_ns: int) -> Optional[ParsedDocument]:
+        document = self._documents.get(document_id)
+        if document is None or document.mtime_ns != mtime_ns:
+            self.misses += 1
+            return None
+        self._documents.move_to_end(document_id)
+        self.hits += 1
+        return document
+
+    def put(self, document: ParsedDocument):
+        self._documents[document.document_id] = document
+        self._documents.move_to_end(document.document_id)
+        while len(self._documents) > self.max_documents:
+            self._documents.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "documents": len(self._documents),
+            "max_documents": self.max_documents,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "memory_bytes": sum(document.nbytes() for document in self._documents.values()),
+        }
@@ -0,0 +1,112 @@
+from typing import Any, AsyncIterator, Callable, Dict, Optional
+
+from services.ai_service import AIService
+from services.document_service import DocumentService
+from services.metrics import metrics
+
+ANALYSIS_STAGES = ("parse", "prefilter", "score", "validate", "render")
+
+class AnalysisPipeline:
+    """Upload-to-redline analysis, run stage by stage.
+
+    ``on_stage`` is called with the stage name (and an item count when one
+    is known) before each stage starts, which is how jobs report progress.
+
+    Uploads are content-addressed, so a document analyzed before by the
+    model still serving is not analyzed again: ``run`` returns its stored
+    analysis and latest redline.
+    """
+
+    def __init__(self, document_service: DocumentService, ai_service: AIService):
+        self.document_service = document_service
+        self.ai_service = ai_service
+
+    async def run(self, document_id: str,
+                  on_stage: Optional[Callable[..., None]] = None) -> Dict[str, Any]:
+        on_stage = on_stage or (lambda name, total=None: None)
+        model_version = self.ai_service.model_version
+        previous = self.ai_service.analysis_store.get(document_id)
+        redline_id = self.document_service.latest_redline(document_id)
+        if previous is not None and redline_id is not None and previous.model_version == model_version:
+            return {
+                "redline_document_id": redline_id,
+                "flagged_paragraphs": len(previous.paragraphs),
+                "model_version": model_version,
+                "reused": True,
+            }
+
+        on_stage("parse")
+        with metrics.span("parse"):
+            document = await self.document_service.get_document(document_id)
+
+        on_stage("prefilter", len(document))
+        with metrics.span("prefilter"):
+            candidates = self.ai_service.prefilter(document)
+
+        on_stage("score", len(candidates))
+        with metrics.span("score"):
+            analysis = await self.ai_service.score_candidates(document, candidates)
+
+        on_stage("validate", len(analysis))
+        with metrics.span("validate"):
+            suggestions = await self.ai_service.make_suggestions(analysis)
+            validated_suggestions = await self.ai_service.validate_suggestions(suggestions)
+        self.ai_service.analysis_store.put(document_id, validated_suggestions, model_version)
+
+        on_stage("render", len(validated_suggestions))
+        with metrics.span("render"):
+            redline_doc = await self.document_service.create_redline_document(document, validated_suggestions)
+
+        return {
+            "redline_document_id": redline_doc,
+            "flagged_paragraphs": len(validated_suggestions),
+            "model_version": model_version,
+        }
+
+    async def stream(self, document_id: str) -> AsyncIterator[Dict[str, Any]]:
+        """Run the analysis and yield events as results become available.
+
+        Emits ``started``, then one ``clause`` event per flagged paragraph as
+        soon as its scoring batch is validated, then ``done`` with the redline.
+        """
+        with metrics.span("parse"):
+            document = await self.document_service.get_document(document_id)
+        model_version = self.ai_service.model_version
+        with metrics.span("prefilter"):
+            candidates = self.ai_service.prefilter(document)
+        yield {
+            "event": "started",
+            "document_id": document_id,
+            "paragraphs": len(document),
+            "candidates": len(candidates),
+        }
+
+        validated_suggestions = {}
+        async for analysis in self.ai_service.iter_scores(document, candidates):
+            with metrics.span("validate"):
+                suggestions = await self.ai_service.make_suggestions(analysis)
+                validated = await self.ai_service.validate_suggestions(suggestions)
+            validated_suggestions.update(validated)
+            for index, details in validated.items():
+                yield {
+                    "event": "clause",
+                    "paragraph_index": index,
+                    "original": details["text"],
+                    "suggestion": details["suggestion"],
+                    "confidence": details["confidence"],
+                    "scored_by": analysis[index]["scored_by"],
+                    "model_version": details.get("model_version"),
+                    "categories": details["categories"],
+                    "needs_review": details.get("needs_review", False),
+                    "precedents": details.get("precedents", []),
+                }
+
+        self.ai_service.analysis_store.put(document_id, validated_suggestions, model_version)
+        with metrics.span("render"):
+            redline_doc = await self.document_service.create_redline_document(document, validated_suggestions)
+        yield {
+            "event": "done",
+            "redline_document_id": redline_doc,
+            "flagged_paragraphs": len(validated_suggestions),
+            "model_version": model_version,
+        }
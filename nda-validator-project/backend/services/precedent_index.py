@@ -0,0 +1,275 @@
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+class PrecedentIndex:
+    """Vector index of past clause revisions: original clause -> accepted clause.
+
+    Vectors are L2-normalized, so similarity is cosine. Until ``min_train_size``
+    entries exist every query is an exact scan. After that an inverted-file
+    (IVF) index takes over: k-means centroids split the vectors into
+    ``nlist`` contiguous lists and a query only scans the ``nprobe`` lists
+    with the closest centroids. Raising ``nprobe`` trades latency for recall;
+    ``nprobe >= nlist`` is exact again.
+
+    Inserts are incremental: new vectors join the list of their nearest
+    centroid, and the index re-clusters once it has grown fourfold since it
+    was last trained (blocking queries while it does). With a ``path`` new
+    vectors, list assignments and entries are appended to files there, so
+    nothing is rewritten on insert and a restart reloads the index without
+    re-clustering. Entries repeating an (original, accepted) pair already
+    in the index are skipped. ``dim`` may be left out; it is then taken
+    from the first vectors added, or from the files under ``path``.
+    """
+
+    def __init__(self, dim: Optional[int] = None, path: Optional[str] = None, nlist: int = 1024, nprobe: int = 16,
+                 min_train_size: int = 20000):
+        self.dim = dim
+        self.path = path
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.min_train_size = min_train_size
+        self.centroids: Optional[np.ndarray] = None
+        self.entries: List[Dict[str, Any]] = []
+        self._pairs = set()
+        # Per-list vectors and entry ids, grown by doubling; only [:size] is valid
+        self._vectors: List[np.ndarray] = [np.zeros((0, dim or 0), dtype=np.float32)]
+        self._ids: List[np.ndarray] = [np.zeros(0, dtype=np.int64)]
+        self._sizes: List[int] = [0]
+        self._lock = threading.Lock()
+        self.train_seconds: Optional[float] = None
+        self._trained_size = 0
+        if path:
+            os.makedirs(path, exist_ok=True)
+            self._load()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    @property
+    def trained(self) -> bool:
+        return self.centroids is not None
+
+    def add(self, vectors: Sequence[Sequence[float]], entries: List[Dict[str, Any]]):
+        """Insert vectors with one JSON-serializable entry each; returns how many were new."""
+        if not entries:
+            return 0
+        with self._lock:
+            if self.dim is None:
+                self._set_dim(len(vectors[0]))
+            vectors = self._normalize(vectors)
+            new = []
+            for i, entry in enumerate(entries):
+                if self._pair(entry) not in self._pairs:
+                    self._pairs.add(self._pair(entry))
+                    new.append(i)
+            if not new:
+                return 0
+            vectors, entries = vectors[new], [entries[i] for i in new]
+            start = len(self.entries)
+            ids = np.arange(start, start + len(entries), dtype=np.int64)
+            assignments = self._assign(vectors)
+            self.entries.extend(entries)
+            self._insert(vectors, ids, assignments)
+            if self.path:
+                self._append(vectors, assignments, entries)
+            if len(self.entries) >= max(self.min_train_size, 4 * self._trained_size):
+                self._train()
+            return len(entries)
+
+    def search(self, queries: Sequence[Sequence[float]], k: int = 5,
+               nprobe: Optional[int] = None) -> List[List[Dict[str, Any]]]:
+        """Return the ``k`` most similar entries for each query, best first.
+
+        All queries are answered together: each probed list is scanned once
+        with one matrix product against every query that probes it.
+        """
+        with self._lock:
+            if not len(queries) or not self.entries:
+                return [[] for _ in range(len(queries))]
+            queries = self._normalize(queries)
+            if self.trained:
+                nprobe = min(nprobe or self.nprobe, len(self.centroids))
+                closest = queries @ self.centroids.T
+                probes = np.argpartition(-closest, nprobe - 1, axis=1)[:, :nprobe]
+            else:
+                probes = np.zeros((len(queries), 1), dtype=np.int64)
+
+            candidate_scores: List[List[np.ndarray]] = [[] for _ in range(len(queries))]
+            candidate_ids: List[List[np.ndarray]] = [[] for _ in range(len(queries))]
+            for list_id in np.unique(probes):
+                size = self._sizes[list_id]
+                if not size:
+                    continue
+                query_rows = np.nonzero((probes == list_id).any(axis=1))[0]
+                scores = self._vectors[list_id][:size] @ queries[query_rows].T
+                ids = self._ids[list_id][:size]
+                for column, row in enumerate(query_rows):
+                    top = self._top(scores[:, column], k)
+                    candidate_scores[row].append(scores[top, column])
+                    candidate_ids[row].append(ids[top])
+
+            results = []
+            for scores, ids in zip(candidate_scores, candidate_ids):
+                if not scores:
+                    results.append([])
+                    continue
+                scores, ids = np.concatenate(scores), np.concatenate(ids)
+                top = self._top(scores, k)
+                top = top[np.argsort(-scores[top])]
+                results.append([{**self.entries[ids[i]], "similarity": float(scores[i])} for i in top])
+            return results
+
+    def rebuild(self):
+        """Re-cluster every vector, e.g. after the corpus has grown a lot since training."""
+        with self._lock:
+            self._train()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            sizes = [size for size in self._sizes if size]
+            return {
+                "entries": len(self.entries),
+                "mode": "ivf" if self.trained else "exact",
+                "lists": len(self._sizes),
+                "nprobe": self.nprobe,
+                "largest_list": max(sizes) if sizes else 0,
+                "memory_bytes": sum(vectors.nbytes for vectors in self._vectors),
+                "train_seconds": self.train_seconds,
+            }
+
+    @staticmethod
+    def _pair(entry: Dict[str, Any]):
+        return entry.get("original"), entry.get("accepted")
+
+    def _set_dim(self, dim: int):
+        self.dim = dim
+        self._vectors = [np.zeros((0, dim), dtype=np.float32)]
+        if self.path:
+            with open(self._file("meta.json"), "w") as f:
+                json.dump({"dim": dim}, f)
+
+    @staticmethod
+    def _top(scores: np.ndarray, k: int) -> np.ndarray:
+        if len(scores) <= k:
+            return np.arange(len(scores))
+        return np.argpartition(-scores, k - 1)[:k]
+
+    def _normalize(self, vectors) -> np.ndarray:
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, self.dim)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+    def _assign(self, vectors: np.ndarray, chunk_size: int = 8192) -> np.ndarray:
+        if not self.trained:
+            return np.zeros(len(vectors), dtype=np.int32)
+        assignments = np.empty(len(vectors), dtype=np.int32)
+        # Chunked so assigning a million vectors never builds a million-by-nlist matrix
+        for start in range(0, len(vectors), chunk_size):
+            chunk = vectors[start:start + chunk_size]
+            assignments[start:start + chunk_size] = np.argmax(chunk @ self.centroids.T, axis=1)
+        return assignments
+
+    def _insert(self, vectors: np.ndarray, ids: np.ndarray, assignments: np.ndarray):
+        # Group by list with one sort instead of one mask per list
+        order = np.argsort(assignments, kind="stable")
+        list_ids, starts, counts = np.unique(assignments[order], return_index=True, return_counts=True)
+        for list_id, first, count in zip(list_ids.tolist(), starts.tolist(), counts.tolist()):
+            members = order[first:first + count]
+            size = self._sizes[list_id]
+            if size + count > len(self._vectors[list_id]):
+                capacity = max(size + count, 2 * len(self._vectors[list_id]), 16)
+                grown = np.zeros((capacity, self.dim), dtype=np.float32)
+                grown[:size] = self._vectors[list_id][:size]
+                grown_ids = np.zeros(capacity, dtype=np.int64)
+                grown_ids[:size] = self._ids[list_id][:size]
+                self._vectors[list_id], self._ids[list_id] = grown, grown_ids
+            self._vectors[list_id][size:size + count] = vectors[members]
+            self._ids[list_id][size:size + count] = ids[members]
+            self._sizes[list_id] = size + count
+
+    def _train(self, iterations: int = 10, sample_per_list: int = 64):
+        """Spherical k-means on a sample, then redistribute every vector list by list."""
+        start = time.perf_counter()
+        total = len(self.entries)
+        nlist = max(1, min(self.nlist, total // 39))
+        rng = np.random.default_rng(0)
+        keep = min(1.0, nlist * sample_per_list / total)
+        sample = np.concatenate([vectors[:size][rng.random(size) < keep]
+                                 for vectors, size in zip(self._vectors, self._sizes)])
+        centroids = sample[rng.choice(len(sample), min(nlist, len(sample)), replace=False)]
+        nlist = len(centroids)
+        for _ in range(iterations):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            counts = np.bincount(labels, minlength=nlist)
+            filled = counts > 0
+            sums = np.zeros_like(centroids)
+            order = np.argsort(labels, kind="stable")
+            sums[filled] = np.add.reduceat(sample[order], (np.cumsum(counts) - counts)[filled], axis=0)
+            # Empty clusters restart from a random sample point
+            sums[~filled] = sample[rng.choice(len(sample), int((~filled).sum()))]
+            centroids = sums / np.maximum(np.linalg.norm(sums, axis=1, keepdims=True), 1e-12)
+
+        old = list(zip(self._vectors, self._ids, self._sizes))
+        self.centroids = centroids.astype(np.float32)
+        self._vectors = [np.zeros((0, self.dim), dtype=np.float32) for _ in range(nlist)]
+        self._ids = [np.zeros(0, dtype=np.int64) for _ in range(nlist)]
+        self._sizes = [0] * nlist
+        assignments = np.zeros(total, dtype=np.int32)
+        # Moving one old list at a time keeps the peak near one copy of the vectors
+        for i in range(len(old)):
+            vectors, ids, size = old[i]
+            old[i] = None
+            list_assignments = self._assign(vectors[:size])
+            self._insert(vectors[:size], ids[:size], list_assignments)
+            assignments[ids[:size]] = list_assignments
+        self.train_seconds = time.perf_counter() - start
+        self._trained_size = total
+        if self.path:
+            np.save(self._file("centroids.npy"), self.centroids)
+            assignments.tofile(self._file("assignments.i32"))
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+    def _append(self, vectors: np.ndarray, assignments: np.ndarray, entries: List[Dict[str, Any]]):
+        with open(self._file("vectors.f32"), "ab") as f:
+            vectors.tofile(f)
+        with open(self._file("assignments.i32"), "ab") as f:
+            assignments.tofile(f)
+        with open(self._file("entries.jsonl"), "a") as f:
+            for entry in entries:
+                f.write(json.dumps(entry) + "\n")
+
+    def _load(self):
+        if not os.path.exists(self._file("entries.jsonl")):
+            return
+        with open(self._file("meta.json")) as f:
+            self._set_dim(json.load(f)["dim"])
+        with open(self._file("entries.jsonl")) as f:
+            entries = [json.loads(line) for line in f if line.strip()]
+        vectors = np.fromfile(self._file("vectors.f32"), dtype=np.float32).reshape(-1, self.dim)
+        assignments = np.fromfile(self._file("assignments.i32"), dtype=np.int32)
+        # A crash mid-append can leave the files at different lengths; keep the complete prefix
+        count = min(len(entries), len(vectors), len(assignments))
+        if count < max(len(entries), len(vectors), len(assignments)):
+            self._rewrite(vectors[:count], assignments[:count], entries[:count])
+        self.entries = entries[:count]
+        self._pairs = {self._pair(entry) for entry in self.entries}
+        if os.path.exists(self._file("centroids.npy")):
+            self.centroids = np.load(self._file("centroids.npy"))
+            self._trained_size = count
+            nlist = len(self.centroids)
+            self._vectors = [np.zeros((0, self.dim), dtype=np.float32) for _ in range(nlist)]
+            self._ids = [np.zeros(0, dtype=np.int64) for _ in range(nlist)]
+            self._sizes = [0] * nlist
+        self._insert(vectors[:count], np.arange(count, dtype=np.int64), assignments[:count])
+
+    def _rewrite(self, vectors: np.ndarray, assignments: np.ndarray, entries: List[Dict[str, Any]]):
+        for name in ("vectors.f32", "assignments.i32", "entries.jsonl"):
+            os.remove(self._file(name))
+        self._append(vectors, assignments, entries)
@@ -0,0 +1,64 @@
+import os
+import sys
+import threading
+from typing import Dict, Optional
+
+class StackSampler:
+    """Sampling profiler writing collapsed stacks for flame graphs.
+
+    While running, a background thread records the Python stack of every
+    other thread each ``interval`` seconds. ``save`` writes one
+    ``frame;frame;... count`` line per distinct stack, the input format of
+    flamegraph.pl and speedscope. Threads serving other requests at the same
+    time show up too; profile on a quiet instance for a clean picture.
+    """
+
+    # One sampler at a time; overlapping ones would each slow the process down
+    _active = threading.Lock()
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.stacks: Dict[str, int] = {}
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> bool:
+        """Start sampling; returns False if another sampler is already running."""
+        if not StackSampler._active.acquire(blocking=False):
+            return False
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        StackSampler._active.release()
+
+    def save(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as f:
+            for stack, count in sorted(self.stacks.items()):
+                f.write(f"{stack} {count}\n")
+
+    def _run(self):
+        own = threading.get_ident()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        while not self._stop.wait(self.interval):
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                frames = []
+                while frame is not None:
+                    code = frame.f_code
+                    frames.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                if ident not in names:
+                    names = {thread.ident: thread.name for thread in threading.enumerate()}
+                stack = ";".join([names.get(ident, str(ident))] + frames[::-1])
+                self.stacks[stack] = self.stacks.get(stack, 0) + 1
+            self.samples += 1
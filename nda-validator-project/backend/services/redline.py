@@ -0,0 +1,210 @@
+import copy
+import difflib
+import io
+import re
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from docx import Document
+from docx.oxml import OxmlElement
+from docx.oxml.ns import qn
+
+TOKEN_PATTERN = re.compile(r"\s+|\w+|[^\w\s]")
+
+class RedlineRenderer:
+    """Write suggestions into a copy of the source document as tracked changes.
+
+    The original .docx is opened once and each paragraph that has a
+    suggestion is rewritten in place: unchanged words stay as normal runs,
+    removed words go into ``w:del`` and added words into ``w:ins``, all at
+    word granularity and with the formatting of the run they came from.
+    Everything else in the document (styles, numbering, tables, headers) is
+    left untouched. Paragraph order and count never change, so paragraph
+    indices line up between the source and the redline.
+    """
+
+    def __init__(self, author: str = "NDA Validator"):
+        self.author = author
+
+    def render(self, source_path: str, suggestions: Dict[int, str]) -> io.BytesIO:
+        """Render a redline for ``{paragraph index: suggested text}`` into memory."""
+        doc = Document(source_path)
+        self.apply(doc, suggestions)
+        buffer = io.BytesIO()
+        doc.save(buffer)
+        buffer.seek(0)
+        return buffer
+
+    def apply(self, doc, suggestions: Dict[int, str]) -> int:
+        """Patch the given paragraphs of an open document; return how many changed."""
+        date = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        change_id = self._next_change_id(doc)
+        changed = 0
+
+        for index, paragraph in enumerate(doc.paragraphs):
+            suggestion = suggestions.get(index)
+            if suggestion is None or suggestion == paragraph.text:
+                continue
+            change_id = self.patch_paragraph(paragraph._p, suggestion, date, change_id)
+            changed += 1
+
+        return changed
+
+    def update(self, path: str, changes: Dict[int, Optional[str]]) -> io.BytesIO:
+        """Re-render only the given paragraphs of an existing redline.
+
+        ``changes`` maps paragraph index to the new suggested text, or None to
+        drop the suggestion. Earlier tracked changes in those paragraphs are
+        rejected first, which restores the original runs, and the new diff is
+        written on top. All other paragraphs are left as they are.
+        """
+        doc = Document(path)
+        date = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        change_id = self._next_change_id(doc)
+        paragraphs = doc.element.body.xpath("w:p")
+
+        for index, suggestion in changes.items():
+            p = paragraphs[index]
+            reject_changes(p)
+            if suggestion is not None and suggestion != p.text:
+                change_id = self.patch_paragraph(p, suggestion, date, change_id)
+
+        buffer = io.BytesIO()
+        doc.save(buffer)
+        buffer.seek(0)
+        return buffer
+
+    def patch_paragraph(self, p, suggestion: str, date: str, change_id: int) -> int:
+        """Replace the runs of ``p`` with a word-level tracked diff; return the next change id."""
+        # Same content python-docx reports as paragraph.text; hyperlinks in a
+        # changed paragraph are rewritten as plain runs
+        runs = p.xpath("w:r | w:hyperlink")
+        original = "".join(run.text for run in runs)
+
+        # Character offset -> run properties, so every piece keeps its formatting
+        boundaries: List[Tuple[int, int, Optional[object]]] = []
+        offset = 0
+        for run in runs:
+            length = len(run.text)
+            rpr = run.find(qn("w:rPr")) if run.tag == qn("w:r") else next(iter(run.xpath("w:r/w:rPr")), None)
+            boundaries.append((offset, offset + length, rpr))
+            offset += length
+
+        old_tokens = TOKEN_PATTERN.findall(original)
+        new_tokens = TOKEN_PATTERN.findall(suggestion)
+        old_offsets = [0]
+        for token in old_tokens:
+            old_offsets.append(old_offsets[-1] + len(token))
+
+        elements = []
+        matcher = difflib.SequenceMatcher(None, old_tokens, new_tokens, autojunk=False)
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+            start, end = old_offsets[i1], old_offsets[i2]
+            if tag == "equal":
+                elements.extend(self._runs_for_span(original, boundaries, start, end, deleted=False))
+                continue
+            if tag in ("delete", "replace"):
+                wrapper = self._change_element("w:del", change_id, date)
+                change_id += 1
+                wrapper.extend(self._runs_for_span(original, boundaries, start, end, deleted=True))
+                elements.append(wrapper)
+            if tag in ("insert", "replace"):
+                wrapper = self._change_element("w:ins", change_id, date)
+                change_id += 1
+                wrapper.append(self._make_run("".join(new_tokens[j1:j2]),
+                                              self._rpr_at(boundaries, max(start - 1, 0)), deleted=False))
+                elements.append(wrapper)
+
+        if runs:
+            anchor = runs[0]
+            for element in elements:
+                anchor.addprevious(element)
+            for run in runs:
+                p.remove(run)
+        else:
+            p.extend(elements)
+
+        return change_id
+
+    def _runs_for_span(self, text: str, boundaries, start: int, end: int, deleted: bool):
+        runs = []
+        for run_start, run_end, rpr in boundaries:
+            piece_start, piece_end = max(start, run_start), min(end, run_end)
+            if piece_start < piece_end:
+                runs.append(self._make_run(text[piece_start:piece_end], rpr, deleted))
+        return runs
+
+    @staticmethod
+    def _rpr_at(boundaries, offset: int):
+        for run_start, run_end, rpr in boundaries:
+            if run_start <= offset < run_end:
+                return rpr
+        return boundaries[-1][2] if boundaries else None
+
+    @staticmethod
+    def _make_run(text: str, rpr, deleted: bool):
+        run = OxmlElement("w:r")
+        if rpr is not None:
+            run.append(copy.deepcopy(rpr))
+        text_tag = "w:delText" if deleted else "w:t"
+        # Tabs and line breaks are separate elements in WordprocessingML
+        for part in re.split(r"([\t\n])", text):
+            if part == "\t":
+                run.append(OxmlElement("w:tab"))
+            elif part == "\n":
+                run.append(OxmlElement("w:br"))
+            elif part:
+                t = OxmlElement(text_tag)
+                t.text = part
+                t.set("{http://www.w3.org/XML/1998/namespace}space", "preserve")
+                run.append(t)
+        return run
+
+    def _change_element(self, tag: str, change_id: int, date: str):
+        element = OxmlElement(tag)
+        element.set(qn("w:id"), str(change_id))
+        element.set(qn("w:author"), self.author)
+        element.set(qn("w:date"), date)
+        return element
+
+    @staticmethod
+    def _next_change_id(doc) -> int:
+        ids = [int(value) for value in doc.element.body.xpath(".//w:ins/@w:id | .//w:del/@w:id")
+               if value.isdigit()]
+        return max(ids, default=0) + 1
+
+def reject_changes(element):
+    """Reject the tracked changes below ``element`` in place."""
+    for insertion in element.xpath(".//w:ins"):
+        insertion.getparent().remove(insertion)
+    for deletion in element.xpath(".//w:del"):
+        parent = deletion.getparent()
+        if parent.tag == qn("w:rPr"):
+            parent.remove(deletion)
+            continue
+        for text in deletion.iter(qn("w:delText")):
+            text.tag = qn("w:t")
+        for child in list(deletion):
+            deletion.addprevious(child)
+        parent.remove(deletion)
+
+def accept_all_changes(source_path: str) -> io.BytesIO:
+    """Return a copy of the document with every tracked change accepted."""
+    doc = Document(source_path)
+    body = doc.element.body
+    for deletion in body.xpath(".//w:del"):
+        deletion.getparent().remove(deletion)
+    for insertion in body.xpath(".//w:ins"):
+        parent = insertion.getparent()
+        # Paragraph-mark insertions live in w:rPr and carry no content
+        if parent.tag == qn("w:rPr"):
+            parent.remove(insertion)
+            continue
+        for child in list(insertion):
+            insertion.addprevious(child)
+        parent.remove(insertion)
+
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    buffer.seek(0)
+    return buffer
@@ -0,0 +1,90 @@
+import asyncio
+import time
+from typing import TYPE_CHECKING, Any, Container, Dict, List, Optional
+
+from services import config
+
+if TYPE_CHECKING:
+    from services.document_service import DocumentService
+    from services.memory_service import MemoryService
+
+class RetentionSweeper:
+    """Scheduled background deletion of expired memory records and document files.
+
+    Every ``interval`` seconds one sweep removes memory records older than
+    ``days`` (with the feedback of removed documents) and files under the
+    documents directory older than ``document_days`` that nothing still
+    uses. Deletes go in batches of ``batch_size`` with a pause after each,
+    so a sweep never exceeds ``max_deletes_per_second``. A ``days`` or
+    ``document_days`` of 0 keeps that data forever; an ``interval`` of 0
+    only sweeps when ``sweep`` is called.
+    """
+
+    def __init__(self, memory_service: "MemoryService", document_service: "DocumentService",
+                 keep: Container[str] = (), days: int = config.RETENTION_DAYS,
+                 document_days: float = config.DOCUMENT_RETENTION_DAYS,
+                 interval: float = config.RETENTION_SWEEP_INTERVAL_SECONDS,
+                 batch_size: int = config.RETENTION_BATCH_SIZE,
+                 max_deletes_per_second: float = config.RETENTION_MAX_DELETES_PER_SECOND):
+        self.memory_service = memory_service
+        self.document_service = document_service
+        # Document IDs whose files are still in use, e.g. analyses awaiting feedback
+        self.keep = keep
+        self.days = days
+        self.document_days = document_days
+        self.interval = interval
+        self.batch_size = batch_size
+        self.pause = batch_size / max_deletes_per_second if max_deletes_per_second > 0 else 0.0
+        self._task: Optional[asyncio.Task] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self.sweeps = 0
+        self.history: List[Dict[str, Any]] = []
+        self.last_error: Optional[str] = None
+
+    def start(self):
+        if self.interval > 0 and (self._task is None or self._task.done()):
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def sweep(self) -> Dict[str, Any]:
+        """Run one sweep now; concurrent calls wait for the running one."""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            start = time.perf_counter()
+            result: Dict[str, Any] = {"started_at": time.time()}
+            if self.days > 0:
+                result.update(await self.memory_service.clear_old_documents(self.days, self.batch_size, self.pause))
+            if self.document_days > 0:
+                result.update(await self.document_service.sweep_files(
+                    self.document_days * 86400, self.keep, self.batch_size, self.pause))
+            result["seconds"] = round(time.perf_counter() - start, 3)
+            self.sweeps += 1
+            self.history = (self.history + [result])[-10:]
+            return result
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "days": self.days,
+            "document_days": self.document_days,
+            "interval_seconds": self.interval,
+            "batch_size": self.batch_size,
+            "pause_seconds": self.pause,
+            "sweeps": self.sweeps,
+            "recent": list(self.history),
+            "last_error": self.last_error,
+        }
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.sweep()
+                self.last_error = None
+            except Exception as e:
+                # Retried on the next tick
+                self.last_error = str(e)
@@ -0,0 +1,210 @@
+import asyncio
+import hashlib
+import json
+import os
+import queue
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+class ScoreCache:
+    """Two-tier cache of model scores keyed by paragraph content.
+
+    Keys combine a hash of the normalized paragraph text with the version of
+    the model that produced the scores, so loading a different model never
+    serves stale entries. The memory tier is an LRU bounded by
+    ``max_entries``; when ``persist_path`` is set, entries are also written
+    to a SQLite file so a restarted worker starts warm.
+
+    Disk writes go through a writer thread that commits them in batches, so
+    storing scores never waits on the disk. ``get_many_async`` looks up
+    memory inline and only sends misses to the disk tier, on an executor
+    thread. The disk tier keeps at most ``max_disk_entries`` rows, dropping
+    the oldest writes first, and ``prune`` removes the rows of model
+    versions no longer served.
+    """
+
+    def __init__(self, max_entries: int = 50000, persist_path: Optional[str] = None,
+                 max_disk_entries: int = 1000000):
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.disk_evictions = 0
+
+        self._db = None
+        # Serializes use of the connection; never held together with _lock
+        self._db_lock = threading.Lock()
+        self._writes: "queue.Queue" = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
+        if persist_path:
+            os.makedirs(os.path.dirname(persist_path) or ".", exist_ok=True)
+            self._db = sqlite3.connect(persist_path, check_same_thread=False)
+            columns = [row[1] for row in self._db.execute("PRAGMA table_info(scores)")]
+            if columns and "model_version" not in columns:
+                # Rows from before versions were stored cannot be pruned; it is only a cache
+                self._db.execute("DROP TABLE scores")
+            self._db.execute("CREATE TABLE IF NOT EXISTS scores "
+                             "(key TEXT PRIMARY KEY, model_version TEXT NOT NULL, scores TEXT NOT NULL)")
+            self._db.execute("CREATE INDEX IF NOT EXISTS scores_model_version ON scores (model_version)")
+            self._db.commit()
+            self._disk_rows = self._db.execute("SELECT COUNT(*) FROM scores").fetchone()[0]
+            self._writer = threading.Thread(target=self._write_loop, name="score-cache-writer", daemon=True)
+            self._writer.start()
+
+    def make_key(self, text: str, model_version: str) -> str:
+        # Whitespace never changes the tokens the model sees
+        normalized = " ".join(text.split())
+        digest = hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+        return f"{model_version}:{digest}"
+
+    def get_many(self, texts: List[str], model_version: str) -> Tuple[Dict[int, Any], List[int]]:
+        """Look up texts; return cached scores by index and the indices that missed.
+
+        Reads the disk tier on the calling thread; async callers should use
+        ``get_many_async``.
+        """
+        found, pending = self._get_from_memory(texts, model_version)
+        if pending and self._db is not None:
+            self._remember_from_disk(found, pending, self._load_from_disk(list(pending.keys())))
+        return self._finish(found, pending)
+
+    async def get_many_async(self, texts: List[str], model_version: str) -> Tuple[Dict[int, Any], List[int]]:
+        """``get_many`` for the event loop: memory hits inline, the disk tier on an executor thread."""
+        found, pending = self._get_from_memory(texts, model_version)
+        if pending and self._db is not None:
+            rows = await asyncio.get_running_loop().run_in_executor(None, self._load_from_disk, list(pending.keys()))
+            self._remember_from_disk(found, pending, rows)
+        return self._finish(found, pending)
+
+    def put_many(self, texts: List[str], scores: List[Any], model_version: str):
+        """Store scores for texts produced by the given model version."""
+        rows = [(self.make_key(text, model_version), score) for text, score in zip(texts, scores)]
+        with self._lock:
+            for key, score in rows:
+                self._remember(key, score)
+        if self._db is not None:
+            self._writes.put(("put", [(key, model_version, json.dumps(score)) for key, score in rows]))
+
+    def prune(self, keep_versions: Iterable[str]):
+        """Drop disk rows of every model version except ``keep_versions``, in the background."""
+        if self._db is not None:
+            self._writes.put(("prune", list(keep_versions)))
+
+    def flush(self):
+        """Wait until every queued disk write has been committed."""
+        if self._db is not None:
+            self._writes.join()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "persistent": self._db is not None,
+            "disk_entries": self._disk_rows if self._db is not None else 0,
+            "max_disk_entries": self.max_disk_entries,
+            "pending_disk_writes": self._writes.qsize(),
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "disk_evictions": self.disk_evictions,
+            "hit_rate": (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+        }
+
+    def _get_from_memory(self, texts: List[str], model_version: str) -> Tuple[Dict[int, Any], Dict[str, List[int]]]:
+        keys = [self.make_key(text, model_version) for text in texts]
+        found: Dict[int, Any] = {}
+        pending: Dict[str, List[int]] = {}
+        with self._lock:
+            for i, key in enumerate(keys):
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    found[i] = self._entries[key]
+                    self.hits += 1
+                else:
+                    pending.setdefault(key, []).append(i)
+        return found, pending
+
+    def _remember_from_disk(self, found: Dict[int, Any], pending: Dict[str, List[int]],
+                            rows: List[Tuple[str, Any]]):
+        with self._lock:
+            for key, scores in rows:
+                self._remember(key, scores)
+                for i in pending.pop(key):
+                    found[i] = scores
+                    self.disk_hits += 1
+
+    def _finish(self, found: Dict[int, Any], pending: Dict[str, List[int]]) -> Tuple[Dict[int, Any], List[int]]:
+        missing = [i for indices in pending.values() for i in indices]
+        with self._lock:
+            self.misses += len(missing)
+        return found, sorted(missing)
+
+    def _remember(self, key: str, scores: Any):
+        self._entries[key] = scores
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _load_from_disk(self, keys: List[str]) -> List[Tuple[str, Any]]:
+        rows = []
+        with self._db_lock:
+            # Stay well below SQLite's bound-parameter limit
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                cursor = self._db.execute(
+                    f"SELECT key, scores FROM scores WHERE key IN ({placeholders})", chunk
+                )
+                rows.extend((key, json.loads(scores)) for key, scores in cursor)
+        return rows
+
+    def _write_loop(self, max_writes_per_commit: int = 256):
+        while True:
+            tasks = [self._writes.get()]
+            # Everything queued meanwhile goes into the same transaction
+            while len(tasks) < max_writes_per_commit:
+                try:
+                    tasks.append(self._writes.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                with self._db_lock:
+                    self._apply(tasks)
+            except sqlite3.Error:
+                # A failed write only costs a future cache miss
+                pass
+            finally:
+                for _ in tasks:
+                    self._writes.task_done()
+
+    def _apply(self, tasks: List[Tuple[str, Any]]):
+        for kind, payload in tasks:
+            if kind == "put":
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO scores (key, model_version, scores) VALUES (?, ?, ?)", payload
+                )
+                self._disk_rows += len(payload)
+            else:
+                placeholders = ",".join("?" * len(payload))
+                self._db.execute(f"DELETE FROM scores WHERE model_version NOT IN ({placeholders})", payload)
+                self._disk_rows = self._db.execute("SELECT COUNT(*) FROM scores").fetchone()[0]
+        if self._disk_rows > self.max_disk_entries:
+            # Replaced rows were counted twice above; count exactly before trimming
+            self._disk_rows = self._db.execute("SELECT COUNT(*) FROM scores").fetchone()[0]
+            excess = self._disk_rows - self.max_disk_entries
+            if excess > 0:
+                # INSERT OR REPLACE gives rewritten rows a new rowid, so the lowest are the oldest writes
+                self._db.execute("DELETE FROM scores WHERE rowid IN "
+                                 "(SELECT rowid FROM scores ORDER BY rowid LIMIT ?)", (excess,))
+                self._disk_rows -= excess
+                self.disk_evictions += excess
+        self._db.commit()
@@ -0,0 +1,120 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from services.model_registry import LoadedModel, ModelRegistry
+
+class ServingModel:
+    """The model a role is served with, swappable while requests are in flight.
+
+    Scoring batches ``acquire`` the current model for their duration. ``swap``
+    loads and warms the replacement on the calling thread, switches the
+    pointer in one step, waits for batches still running on the old model
+    and only then releases it, so the old and new weights coexist for the
+    warmup and drain windows only.
+    """
+
+    def __init__(self, registry: ModelRegistry, model_dir: str, role: str, backend: str = "torch"):
+        self.registry = registry
+        self.role = role
+        self.backend = backend
+        self.model_dir = model_dir
+        self._current: Optional[LoadedModel] = None
+        self._in_flight: Dict[int, int] = {}
+        self._condition = threading.Condition()
+        # One swap at a time; scoring never waits on this
+        self._swap_lock = threading.Lock()
+        self.history: List[Dict[str, Any]] = []
+
+    @property
+    def current(self) -> LoadedModel:
+        with self._condition:
+            if self._current is None:
+                self._current = self.registry.get(self.model_dir, self.role, backend=self.backend)
+            return self._current
+
+    @property
+    def version(self) -> str:
+        return self.current.version
+
+    @property
+    def tokenizer(self):
+        return self.registry.get_tokenizer(self.current.model_dir)
+
+    @contextmanager
+    def acquire(self) -> Iterator[LoadedModel]:
+        """Pin the current model for one batch."""
+        with self._condition:
+            # Read and count under one lock so a swap cannot slip in between
+            loaded = self.current
+            self._in_flight[id(loaded)] = self._in_flight.get(id(loaded), 0) + 1
+        try:
+            yield loaded
+        finally:
+            with self._condition:
+                self._in_flight[id(loaded)] -= 1
+                if not self._in_flight[id(loaded)]:
+                    del self._in_flight[id(loaded)]
+                self._condition.notify_all()
+
+    def load(self, model_dir: str) -> LoadedModel:
+        """Read ``model_dir`` from disk for this role, ready to be passed to ``swap``."""
+        # A retrained checkpoint in the same directory must be read again
+        return self.registry.reload(model_dir, self.role, backend=self.backend)
+
+    def swap(self, model_dir: str, warmup: Optional[Callable[[LoadedModel], Any]] = None,
+             drain_timeout: float = 60.0, loaded: Optional[LoadedModel] = None) -> Dict[str, Any]:
+        """Serve ``model_dir`` from now on and release the previous model.
+
+        ``loaded`` is the model returned by ``load``; without it the model is
+        loaded here. ``warmup`` is called with the new model before it takes
+        traffic. If old batches have not finished within ``drain_timeout``
+        seconds the old model is released anyway; its weights are freed once
+        they end.
+        """
+        if loaded is not None and loaded.model_dir != model_dir:
+            raise ValueError(f"Loaded model is from {loaded.model_dir}, not {model_dir}")
+        with self._swap_lock:
+            start = time.perf_counter()
+            new = loaded if loaded is not None else self.load(model_dir)
+            if warmup is not None:
+                warmup(new)
+            warmup_seconds = time.perf_counter() - start
+
+            with self._condition:
+                old = self._current
+                self._current = new
+                self.model_dir = model_dir
+
+            drain_start = time.perf_counter()
+            drained = True
+            if old is not None and old is not new:
+                with self._condition:
+                    drained = self._condition.wait_for(lambda: id(old) not in self._in_flight, drain_timeout)
+                if old.model_dir != model_dir:
+                    self.registry.release(old.model_dir, self.role)
+
+            swap = {
+                "role": self.role,
+                "model_dir": model_dir,
+                "version": new.version,
+                "previous_version": old.version if old is not None else None,
+                "swapped_at": time.time(),
+                "warmup_seconds": round(warmup_seconds, 3),
+                "drain_seconds": round(time.perf_counter() - drain_start, 3),
+                "drained": drained,
+            }
+            self.history.append(swap)
+            return swap
+
+    def stats(self) -> Dict[str, Any]:
+        with self._condition:
+            in_flight = sum(self._in_flight.values())
+        return {
+            "role": self.role,
+            "model_dir": self.model_dir,
+            "version": self._current.version if self._current is not None else None,
+            "in_flight_batches": in_flight,
+            "swaps": list(self.history),
+        }
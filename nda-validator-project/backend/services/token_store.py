@@ -0,0 +1,69 @@
+import hashlib
+import os
+from typing import List, Optional
+
+import numpy as np
+
+class TokenStore:
+    """Unpadded token ids of a corpus in one flat array plus per-text offsets.
+
+    Texts are tokenized once, in chunks, without padding, so memory follows
+    the real token count rather than ``len(texts) * max_length``. With a
+    cache directory the arrays are saved as .npy files keyed by the corpus
+    and tokenizer, and later runs memory-map them instead of tokenizing.
+    """
+
+    def __init__(self, ids: np.ndarray, offsets: np.ndarray):
+        self.ids = ids
+        self.offsets = offsets
+
+    @classmethod
+    def build(cls, texts: List[str], tokenizer, max_length: int = 512,
+              cache_dir: Optional[str] = None, chunk_size: int = 1000) -> "TokenStore":
+        key = cls._cache_key(texts, tokenizer, max_length) if cache_dir else None
+        if key is not None:
+            ids_path = os.path.join(cache_dir, f"{key}.ids.npy")
+            offsets_path = os.path.join(cache_dir, f"{key}.offsets.npy")
+            if os.path.exists(ids_path) and os.path.exists(offsets_path):
+                return cls(np.load(ids_path, mmap_mode="r"), np.load(offsets_path, mmap_mode="r"))
+
+        chunks = []
+        lengths = np.zeros(len(texts), dtype=np.int64)
+        for start in range(0, len(texts), chunk_size):
+            encoded = tokenizer(texts[start:start + chunk_size], truncation=True, max_length=max_length)["input_ids"]
+            for i, sequence in enumerate(encoded):
+                lengths[start + i] = len(sequence)
+            chunks.extend(np.asarray(sequence, dtype=np.int32) for sequence in encoded)
+        ids = np.concatenate(chunks) if chunks else np.zeros(0, dtype=np.int32)
+        offsets = np.concatenate(([0], np.cumsum(lengths)))
+
+        if key is not None:
+            os.makedirs(cache_dir, exist_ok=True)
+            # Write under temporary names so a concurrent reader never sees half a file
+            for path, array in ((ids_path, ids), (offsets_path, offsets)):
+                partial = f"{path[:-len('.npy')]}.{os.getpid()}.part.npy"
+                np.save(partial, array)
+                os.replace(partial, path)
+        return cls(ids, offsets)
+
+    @staticmethod
+    def _cache_key(texts: List[str], tokenizer, max_length: int) -> str:
+        digest = hashlib.sha256()
+        digest.update(f"{getattr(tokenizer, 'name_or_path', '')}:{len(tokenizer)}:{max_length}".encode("utf-8"))
+        for text in texts:
+            digest.update(text.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()[:32]
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index: int) -> np.ndarray:
+        return self.ids[self.offsets[index]:self.offsets[index + 1]]
+
+    def lengths(self) -> np.ndarray:
+        return np.diff(self.offsets)
+
+    @property
+    def nbytes(self) -> int:
+        return self.ids.nbytes + self.offsets.nbytes
@@ -1,45 +1,117 @@
-from transformers import AutoTokenizer, AutoModelForSequenceClassification, TrainingArguments, Trainer
+from transformers import DataCollatorWithPadding, TrainingArguments, Trainer, TrainerCallback
+from transformers.trainer_pt_utils import LengthGroupedSampler
+import time
 import torch
-from torch.utils.data import Dataset
+from torch.utils.data import DataLoader, Dataset
 import pandas as pd
 import numpy as np
-from typing import List, Dict, Any, Tuple
+from typing import Callable, List, Dict, Any, Tuple, Optional
 import os
-from docx import Document
 import json
 from datetime import datetime
+from services import config
+from services.model_registry import ModelRegistry
+from services.cascade import CascadeClassifier
+from services.paragraph_extraction import ParagraphExtractor, align_paragraphs
+from services.token_store import TokenStore
+from services.evaluation import classification_metrics, load_holdout, save_holdout, split_holdout
 
 class NDADataset(Dataset):
-    def __init__(self, texts: List[str], labels: List[int], tokenizer):
-        self.encodings = tokenizer(texts, truncation=True, padding=True, max_length=512)
-        self.labels = labels
+    """Unpadded samples backed by a TokenStore; batches are padded by the collator."""
+
+    def __init__(self, texts: List[str], labels: List[int], tokenizer,
+                 max_length: int = config.MAX_SEQUENCE_LENGTH, cache_dir: Optional[str] = None):
+        self.tokens = TokenStore.build(texts, tokenizer, max_length, cache_dir)
+        self.labels = np.asarray(labels, dtype=np.int64)
 
     def __getitem__(self, idx):
-        item = {key: torch.tensor(val[idx]) for key, val in self.encodings.items()}
-        item['labels'] = torch.tensor(self.labels[idx])
-        return item
+        return {"input_ids": self.tokens[idx].tolist(), "labels": int(self.labels[idx])}
 
     def __len__(self):
         return len(self.labels)
 
+    def lengths(self) -> List[int]:
+        return self.tokens.lengths().tolist()
+
+class LengthGroupedTrainer(Trainer):
+    """Trainer that groups batches by precomputed token counts.
+
+    The stock ``group_by_length`` sampler measures a plain dataset by
+    loading every row; these lengths come straight from the TokenStore.
+    """
+
+    def __init__(self, *args, lengths: List[int], **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lengths = lengths
+
+    def _get_train_sampler(self, *args, **kwargs):
+        if not self.args.group_by_length:
+            return super()._get_train_sampler(*args, **kwargs)
+        return LengthGroupedSampler(self.args.train_batch_size * self.args.gradient_accumulation_steps,
+                                    lengths=self.lengths)
+
+class TrainingProgressCallback(TrainerCallback):
+    """Report training steps; an exception raised by ``on_step`` aborts training before anything is saved."""
+
+    def __init__(self, on_step: Callable[[int, int], None]):
+        self.on_step = on_step
+
+    def on_step_end(self, args, state, control, **kwargs):
+        self.on_step(state.global_step, state.max_steps)
+
 class TrainingService:
-    def __init__(self):
-        self.model_name = "nlpaueb/legal-bert-base-uncased"
-        self.tokenizer = AutoTokenizer.from_pretrained(self.model_name)
-        self.model = AutoModelForSequenceClassification.from_pretrained(self.model_name)
+    def __init__(self, registry: Optional[ModelRegistry] = None):
+        self.model_name = config.MODEL_NAME
+        self.model_dir = self.model_name
+        # The training model is only loaded once training actually starts
+        self.registry = registry or ModelRegistry()
         self.training_dir = "training_data"
         os.makedirs(self.training_dir, exist_ok=True)
+        # Parsed paragraphs are cached by file hash across training runs
+        self.extractor = ParagraphExtractor(config.PARAGRAPH_CACHE_DIR or None, config.EXTRACTION_WORKERS or None)
+        self.skipped_documents: List[Tuple[str, str]] = []
+        # (original, accepted) paragraph pairs of the last prepared corpus, for the precedent index
+        self.accepted_pairs: List[Tuple[str, str]] = []
+
+    @property
+    def tokenizer(self):
+        return self.registry.get_tokenizer(self.model_dir)
+
+    @property
+    def collator(self):
+        # Pads each batch to its own longest sample (rounded up for tensor-core friendly shapes)
+        return DataCollatorWithPadding(self.tokenizer, pad_to_multiple_of=8)
+
+    @property
+    def model(self):
+        # Fine-tuning mutates weights, so this copy never shares an encoder
+        return self.registry.get(self.model_dir, "training", share_encoder=False).model
 
     def prepare_training_data(self, original_docs: List[str], redline_docs: List[str], clean_docs: List[str]) -> Tuple[List[str], List[int]]:
-        """Prepare training data from original, redline, and clean documents."""
+        """Prepare training data from original, redline, and clean documents.
+
+        Paragraphs are extracted in parallel (and read from the on-disk cache
+        when a file was seen before), then each redline and clean document is
+        aligned to its original so inserted or removed paragraphs do not shift
+        the pairs. Triples with a document that cannot be read are skipped and
+        listed in ``skipped_documents``.
+        """
         texts = []
         labels = []
+        self.skipped_documents = []
+        self.accepted_pairs = []
+        extracted = self.extractor.extract_many([*original_docs, *redline_docs, *clean_docs])
 
         for orig, redline, clean in zip(original_docs, redline_docs, clean_docs):
-            # Extract paragraphs from documents
-            orig_paras = self._extract_paragraphs(orig)
-            redline_paras = self._extract_paragraphs(redline)
-            clean_paras = self._extract_paragraphs(clean)
+            failures = [(path, extracted[path]) for path in (orig, redline, clean)
+                        if not isinstance(extracted[path], list)]
+            if failures:
+                self.skipped_documents.extend(failures)
+                continue
+            
+            orig_paras = extracted[orig]
+            redline_paras = align_paragraphs(orig_paras, extracted[redline])
+            clean_paras = align_paragraphs(orig_paras, extracted[clean])
 
             # Create training pairs
             for orig_para, redline_para, clean_para in zip(orig_paras, redline_paras, clean_paras):
@@ -47,18 +119,32 @@ class TrainingService:
                     texts.append(orig_para)
                     # Label 1 if the change was accepted in clean version, 0 if not
                     labels.append(1 if clean_para == redline_para else 0)
+                    if clean_para is not None:
+                        self.accepted_pairs.append((orig_para, clean_para))
 
         return texts, labels
 
-    def train_model(self, texts: List[str], labels: List[int], output_dir: str = "fine_tuned_model"):
-        """Fine-tune the model on the prepared data."""
+    def train_model(self, texts: List[str], labels: List[int], output_dir: str = "fine_tuned_model",
+                    callbacks: Optional[List[TrainerCallback]] = None):
+        """Fine-tune the model on the prepared data.
+
+        A held-out share of the examples (``NDA_HOLDOUT_FRACTION``) is never
+        trained on; it is saved as ``holdout.json`` in ``output_dir`` for
+        ``evaluate_model``.
+        """
+        (train_texts, train_labels), (holdout_texts, holdout_labels) = split_holdout(
+            texts, labels, config.HOLDOUT_FRACTION)
+        os.makedirs(output_dir, exist_ok=True)
+        save_holdout(output_dir, holdout_texts, holdout_labels)
+
         # Create dataset
-        dataset = NDADataset(texts, labels, self.tokenizer)
+        dataset = NDADataset(train_texts, train_labels, self.tokenizer, cache_dir=config.TOKEN_CACHE_DIR or None)
 
         # Split into train and validation sets
         train_size = int(0.8 * len(dataset))
         val_size = len(dataset) - train_size
-        train_dataset, val_dataset = torch.utils.data.random_split(dataset, [train_size, val_size])
+        train_dataset, val_dataset = torch.utils.data.random_split(
+            dataset, [train_size, val_size], generator=torch.Generator().manual_seed(42))
 
         # Training arguments
         training_args = TrainingArguments(
@@ -75,14 +161,20 @@ class TrainingService:
             save_strategy="steps",
             save_steps=100,
             load_best_model_at_end=True,
+            # Batches of similar length waste little compute on padding
+            group_by_length=True,
         )
 
         # Initialize trainer
-        trainer = Trainer(
+        lengths = dataset.lengths()
+        trainer = LengthGroupedTrainer(
             model=self.model,
             args=training_args,
             train_dataset=train_dataset,
             eval_dataset=val_dataset,
+            data_collator=self.collator,
+            callbacks=callbacks,
+            lengths=[lengths[i] for i in train_dataset.indices],
         )
 
         # Train the model
@@ -92,46 +184,92 @@ class TrainingService:
         self.model.save_pretrained(output_dir)
         self.tokenizer.save_pretrained(output_dir)
 
+        # The cheap first-stage classifier learns from the same examples, but
+        # needs both labels; without it every paragraph simply goes to legal-bert
+        cascade_path = os.path.join(output_dir, "cascade.joblib")
+        cascade = None
+        if len(set(train_labels)) > 1:
+            cascade = self.train_cascade(train_texts, train_labels, output_dir)
+        elif os.path.exists(cascade_path):
+            # A cascade left by an earlier run would be served with this model
+            os.remove(cascade_path)
+
         # Save training metadata
         metadata = {
             "training_date": datetime.now().isoformat(),
             "num_samples": len(texts),
+            "num_training_samples": len(train_texts),
+            "num_holdout_samples": len(holdout_texts),
             "model_name": self.model_name,
             "training_args": training_args.to_dict(),
+            "cascade": cascade,
         }
+        if cascade is None:
+            metadata["cascade_skipped"] = "training examples have a single label"
         with open(f"{output_dir}/training_metadata.json", "w") as f:
             json.dump(metadata, f, indent=2)
 
         return output_dir
 
-    def _extract_paragraphs(self, doc_path: str) -> List[str]:
-        """Extract paragraphs from a Word document."""
-        doc = Document(doc_path)
-        return [para.text for para in doc.paragraphs if para.text.strip()]
+    def train_cascade(self, texts: List[str], labels: List[int], output_dir: str = "fine_tuned_model") -> str:
+        """Train the classical-ML cascade and save it next to the fine-tuned model."""
+        cascade = CascadeClassifier.train(texts, labels, config.CASCADE_LOW_THRESHOLD,
+                                          config.CASCADE_HIGH_THRESHOLD)
+        path = os.path.join(output_dir, "cascade.joblib")
+        cascade.save(path)
+        return path
 
-    def evaluate_model(self, test_texts: List[str], test_labels: List[int]) -> Dict[str, float]:
-        """Evaluate the fine-tuned model on test data."""
+    def evaluate_model(self, test_texts: Optional[List[str]] = None, test_labels: Optional[List[int]] = None,
+                       output_dir: str = "fine_tuned_model", batch_size: int = config.EVAL_BATCH_SIZE) -> Dict[str, Any]:
+        """Evaluate the fine-tuned model in batches.
+
+        Without test data the held-out split saved by ``train_model`` in
+        ``output_dir`` is used and the metrics are also written to its
+        ``training_metadata.json``.
+        """
+        use_holdout = test_texts is None
+        if use_holdout:
+            test_texts, test_labels = load_holdout(output_dir)
         test_dataset = NDADataset(test_texts, test_labels, self.tokenizer)
-        
-        # Get predictions
-        predictions = []
-        self.model.eval()
-        with torch.no_grad():
-            for item in test_dataset:
-                outputs = self.model(**{k: v.unsqueeze(0) for k, v in item.items() if k != 'labels'})
-                predictions.append(torch.argmax(outputs.logits, dim=1).item())
-
-        # Calculate metrics
-        correct = sum(p == l for p, l in zip(predictions, test_labels))
-        accuracy = correct / len(test_labels)
-        
-        return {
-            "accuracy": accuracy,
-            "num_samples": len(test_labels),
-            "correct_predictions": correct
+
+        # Shortest first, so each batch pads to a similar length
+        order = np.argsort(test_dataset.tokens.lengths(), kind="stable").tolist()
+        loader = DataLoader(test_dataset, batch_size=batch_size, sampler=order, collate_fn=self.collator)
+
+        model = self.model
+        model.eval()
+        probabilities = np.zeros(len(test_dataset), dtype=np.float64)
+        labels = np.zeros(len(test_dataset), dtype=np.int64)
+        position = 0
+        start = time.perf_counter()
+        with torch.inference_mode():
+            for batch in loader:
+                batch_labels = batch.pop("labels")
+                logits = model(**{k: v.to(model.device) for k, v in batch.items()}).logits
+                indices = order[position:position + len(batch_labels)]
+                probabilities[indices] = torch.softmax(logits.float(), dim=-1)[:, 1].cpu().numpy()
+                labels[indices] = batch_labels.numpy()
+                position += len(batch_labels)
+        elapsed = time.perf_counter() - start
+
+        metrics = classification_metrics(labels, probabilities)
+        metrics["throughput"] = {
+            "seconds": round(elapsed, 3),
+            "samples_per_second": round(len(test_dataset) / elapsed, 1) if elapsed else 0.0,
+            "batch_size": batch_size,
         }
 
+        metadata_path = os.path.join(output_dir, "training_metadata.json")
+        if use_holdout and os.path.exists(metadata_path):
+            with open(metadata_path) as f:
+                metadata = json.load(f)
+            metadata["evaluation"] = metrics
+            with open(metadata_path, "w") as f:
+                json.dump(metadata, f, indent=2)
+        return metrics
+
     def load_trained_model(self, model_dir: str):
-        """Load a fine-tuned model."""
-        self.model = AutoModelForSequenceClassification.from_pretrained(model_dir)
-        self.tokenizer = AutoTokenizer.from_pretrained(model_dir) 
\ No newline at end of file
+        """Continue training from a fine-tuned model; it is loaded when the next training starts."""
+        if model_dir != self.model_dir:
+            self.registry.release(self.model_dir, "training")
+        self.model_dir = model_dir 
\ No newline at end of file
@@ -0,0 +1,105 @@
+import asyncio
+import functools
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+class ServerBusyError(Exception):
+    """Raised when a pool is saturated and cannot admit more work."""
+
+    def __init__(self, message: str, retry_after: int = 5):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+class WorkerPool:
+    """Bounded executor for blocking work called from async endpoints.
+
+    At most ``max_workers`` calls run at once and at most ``max_queue`` more
+    may wait for a slot. Anything beyond that is rejected immediately with
+    ``ServerBusyError`` instead of piling up on the event loop.
+
+    ``kind="process"`` runs calls in a process pool; the callable, its
+    arguments and its result must then be picklable.
+
+    Cancelling a caller drops a call that has not started yet. One that is
+    already running keeps its slot until it returns, so cancelled work never
+    lets more calls run at once than ``max_workers``.
+    """
+
+    def __init__(self, name: str, kind: str = "thread", max_workers: int = 4,
+                 max_queue: int = 16, retry_after: int = 5):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown worker pool kind: {kind}")
+        self.name = name
+        self.kind = kind
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.retry_after = retry_after
+        self._executor: Optional[Executor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._active = 0
+        self._waiting = 0
+        self.rejected = 0
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                    thread_name_prefix=self.name)
+        return self._executor
+
+    async def run(self, fn: Callable, *args, **kwargs) -> Any:
+        """Run ``fn`` in the pool, waiting for a free slot if one is close."""
+        if self._waiting >= self.max_queue and self._active >= self.max_workers:
+            self.rejected += 1
+            raise ServerBusyError(f"{self.name} pool is saturated, try again later",
+                                  retry_after=self.retry_after)
+
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_workers)
+
+        self._waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self._waiting -= 1
+
+        self._active += 1
+        loop = asyncio.get_running_loop()
+        try:
+            future = self.executor.submit(functools.partial(fn, *args, **kwargs))
+        except BaseException:
+            self._release()
+            raise
+        # A cancelled caller cannot stop a call that already started, so the
+        # slot stays taken until the call itself returns
+        future.add_done_callback(lambda _: self._release_threadsafe(loop))
+        return await asyncio.wrap_future(future, loop=loop)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "kind": self.kind,
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "active": self._active,
+            "waiting": self._waiting,
+            "rejected": self.rejected,
+        }
+
+    def _release(self):
+        self._active -= 1
+        self._semaphore.release()
+
+    def _release_threadsafe(self, loop: asyncio.AbstractEventLoop):
+        try:
+            loop.call_soon_threadsafe(self._release)
+        except RuntimeError:
+            # The loop is gone; nothing is left to admit
+            pass
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
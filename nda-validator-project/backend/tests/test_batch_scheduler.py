@@ -0,0 +1,31 @@
+import asyncio
+
+import pytest
+
+from services.batch_scheduler import BatchScheduler
+from services.worker_pool import ServerBusyError
+
+def test_concurrent_submissions_share_batches():
+    batches = []
+
+    def score(texts):
+        batches.append(list(texts))
+        return [len(text) for text in texts]
+
+    async def scenario():
+        scheduler = BatchScheduler(score, max_batch_size=8, max_wait_ms=20)
+        return await asyncio.gather(*(scheduler.submit([f"text {i}", "x" * i]) for i in range(4)))
+
+    results = asyncio.run(scenario())
+    assert results == [[6, i] for i in range(4)]
+    assert sum(len(batch) for batch in batches) == 8
+    assert len(batches) < 4
+
+def test_full_queue_rejects_with_configured_retry_after():
+    async def scenario():
+        scheduler = BatchScheduler(lambda texts: texts, max_queue_depth=2, retry_after=11)
+        with pytest.raises(ServerBusyError) as error:
+            await scheduler.submit(["a", "b", "c"])
+        return error.value
+
+    assert asyncio.run(scenario()).retry_after == 11
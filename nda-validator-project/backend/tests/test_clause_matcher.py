@@ -0,0 +1,29 @@
+from services.clause_matcher import ClauseMatcher
+
+def test_keywords_sharing_a_prefix_all_match():
+    matcher = ClauseMatcher({"a": ["term"], "b": ["termination"], "c": ["liab"], "d": ["liability"]})
+    assert matcher.match("Termination and liability") == ["a", "b", "c", "d"]
+    assert matcher.match("The term is short") == ["a"]
+
+def test_matches_like_a_substring_scan():
+    patterns = {
+        "confidentiality": ["confidential", "confidential information", "non-disclosure"],
+        "term": ["term", "duration"],
+        "remedies": ["injunctive relief", "injunct"],
+    }
+    matcher = ClauseMatcher(patterns)
+    texts = [
+        "Confidential Information shall not be disclosed.",
+        "The Term of this Agreement and its duration.",
+        "Injunctive relief is available; determination is final.",
+        "Nothing relevant here.",
+    ]
+    for text in texts:
+        expected = {category for category, keywords in patterns.items()
+                    if any(keyword in text.lower() for keyword in keywords)}
+        assert set(matcher.match(text)) == expected
+
+def test_order_of_first_appearance_and_empty_patterns():
+    matcher = ClauseMatcher({"x": ["beta"], "y": ["alpha"]})
+    assert matcher.match("alpha then beta") == ["y", "x"]
+    assert ClauseMatcher({}).match("anything") == []
@@ -0,0 +1,57 @@
+import threading
+
+from services.feedback_stats import FeedbackStats
+
+def feedback(document_id, sentiment, month="2024-05"):
+    return {"document_id": document_id, "sentiment": sentiment, "timestamp": f"{month}-14T10:00:00"}
+
+def test_add_and_remove_keep_the_aggregates_in_step():
+    stats = FeedbackStats()
+    records = [feedback("a", 1.0), feedback("a", 0.0, "2024-06"), feedback("b", 0.5)]
+    stats.add(records)
+    assert stats.summary() == {
+        "total_feedback": 3,
+        "average_sentiment": 0.5,
+        "feedback_by_month": {"2024-05": 2, "2024-06": 1},
+    }
+    assert stats.summary("a") == {"document_id": "a", "total_feedback": 2, "average_sentiment": 0.5}
+
+    stats.remove(records[1:])
+    assert stats.summary() == {"total_feedback": 1, "average_sentiment": 1.0, "feedback_by_month": {"2024-05": 1}}
+    assert stats.summary("missing")["total_feedback"] == 0
+
+def test_saved_aggregates_survive_a_restart_and_rebuild_replaces_them(tmp_path):
+    path = str(tmp_path / "feedback_stats.json")
+    stats = FeedbackStats(path)
+    assert not stats.persisted
+    stats.add([feedback("a", 1.0), feedback("b", 0.0)])
+    stats.save()
+
+    reloaded = FeedbackStats(path)
+    assert reloaded.persisted
+    assert reloaded.summary() == stats.summary()
+
+    reloaded.rebuild([feedback("c", 0.25)])
+    assert FeedbackStats(path).summary() == {
+        "total_feedback": 1, "average_sentiment": 0.25, "feedback_by_month": {"2024-05": 1},
+    }
+
+def test_concurrent_updates_and_saves_stay_consistent(tmp_path):
+    path = str(tmp_path / "feedback_stats.json")
+    stats = FeedbackStats(path)
+
+    def write(document_id):
+        for _ in range(200):
+            stats.add([feedback(document_id, 1.0)])
+            stats.save()
+
+    threads = [threading.Thread(target=write, args=(f"doc{i}",)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    stats.save()
+
+    assert stats.summary()["total_feedback"] == 800
+    assert FeedbackStats(path).summary() == stats.summary()
+    assert [name for name in tmp_path.iterdir() if name.suffix == ".part"] == []
@@ -0,0 +1,65 @@
+import threading
+import time
+
+from services.metrics import Metrics, request_spans
+from services.profiler import StackSampler
+
+def test_render_counters_histograms_and_collected_samples():
+    metrics = Metrics()
+    metrics.describe("nda_requests_total", "Requests")
+    metrics.inc("nda_requests_total", handler="upload")
+    metrics.inc("nda_requests_total", 2, handler="upload")
+    metrics.observe("nda_latency_seconds", 0.3, buckets=(0.1, 0.5), handler="analyze")
+    metrics.observe("nda_latency_seconds", 2.0, buckets=(0.1, 0.5), handler="analyze")
+    metrics.collector(lambda: iter([("nda_queue_depth", "gauge", {"pool": 'a"b'}, 4)]))
+
+    lines = metrics.render().splitlines()
+    assert lines[:3] == [
+        "# HELP nda_requests_total Requests",
+        "# TYPE nda_requests_total counter",
+        'nda_requests_total{handler="upload"} 3',
+    ]
+    assert 'nda_latency_seconds_bucket{handler="analyze",le="0.1"} 0' in lines
+    assert 'nda_latency_seconds_bucket{handler="analyze",le="0.5"} 1' in lines
+    assert 'nda_latency_seconds_bucket{handler="analyze",le="+Inf"} 2' in lines
+    assert 'nda_latency_seconds_sum{handler="analyze"} 2.3' in lines
+    assert 'nda_latency_seconds_count{handler="analyze"} 2' in lines
+    assert 'nda_queue_depth{pool="a\\"b"} 4' in lines
+
+def test_spans_add_up_per_request_stage():
+    metrics = Metrics()
+    spans = {}
+    token = request_spans.set(spans)
+    try:
+        for _ in range(2):
+            with metrics.span("parse"):
+                time.sleep(0.01)
+    finally:
+        request_spans.reset(token)
+    with metrics.span("parse"):
+        pass
+
+    assert set(spans) == {"parse"} and spans["parse"] >= 0.02
+    assert 'nda_stage_seconds_count{stage="parse"} 3' in metrics.render().splitlines()
+
+def test_sampler_records_other_threads_and_runs_one_at_a_time(tmp_path):
+    stop = threading.Event()
+    worker = threading.Thread(target=stop.wait, name="busy-worker")
+    worker.start()
+    sampler = StackSampler(interval=0.001)
+    assert sampler.start()
+    assert not StackSampler().start()
+    time.sleep(0.05)
+    sampler.stop()
+    stop.set()
+    worker.join()
+
+    assert sampler.samples > 0
+    assert any(stack.startswith("busy-worker;") for stack in sampler.stacks)
+    path = tmp_path / "profile.folded"
+    sampler.save(str(path))
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in path.read_text().splitlines())
+    # The lock is free again
+    second = StackSampler()
+    assert second.start()
+    second.stop()
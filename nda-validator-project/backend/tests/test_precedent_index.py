@@ -0,0 +1,56 @@
+import numpy as np
+
+from services.precedent_index import PrecedentIndex
+
+def make_entries(count, prefix="clause"):
+    return [{"original": f"{prefix} {i}", "accepted": f"revised {prefix} {i}"} for i in range(count)]
+
+def random_vectors(count, dim=16, seed=0):
+    return np.random.default_rng(seed).normal(size=(count, dim)).astype(np.float32)
+
+def test_exact_search_returns_the_closest_entries_best_first():
+    index = PrecedentIndex()
+    vectors = random_vectors(50)
+    index.add(vectors, make_entries(50))
+    results = index.search(vectors[[3, 7]], k=3)
+    assert [result[0]["original"] for result in results] == ["clause 3", "clause 7"]
+    similarities = [entry["similarity"] for entry in results[0]]
+    assert similarities == sorted(similarities, reverse=True)
+    assert abs(similarities[0] - 1.0) < 1e-5
+
+def test_repeated_pairs_are_skipped():
+    index = PrecedentIndex()
+    vectors = random_vectors(5)
+    assert index.add(vectors, make_entries(5)) == 5
+    assert index.add(vectors, make_entries(5)) == 0
+    assert len(index) == 5
+
+def test_ivf_probing_every_list_matches_the_exact_scan():
+    vectors = random_vectors(400, seed=1)
+    queries = random_vectors(10, seed=2)
+    exact = PrecedentIndex(min_train_size=10**6)
+    exact.add(vectors, make_entries(400))
+    ivf = PrecedentIndex(nlist=8, min_train_size=200)
+    ivf.add(vectors, make_entries(400))
+    assert ivf.trained and ivf.stats()["mode"] == "ivf"
+
+    expected = [[entry["original"] for entry in result] for result in exact.search(queries, k=5)]
+    found = [[entry["original"] for entry in result] for result in ivf.search(queries, k=5, nprobe=len(ivf.centroids))]
+    assert found == expected
+
+def test_reload_from_disk_and_recover_a_partial_append(tmp_path):
+    vectors = random_vectors(300, seed=3)
+    index = PrecedentIndex(path=str(tmp_path), nlist=4, min_train_size=200)
+    index.add(vectors, make_entries(300))
+
+    reloaded = PrecedentIndex(path=str(tmp_path))
+    assert len(reloaded) == 300 and reloaded.trained
+    assert reloaded.search(vectors[[42]], k=1)[0][0]["original"] == "clause 42"
+
+    # A crash after the vectors were written but before the entry was
+    with open(tmp_path / "vectors.f32", "ab") as f:
+        random_vectors(1, seed=4).tofile(f)
+    recovered = PrecedentIndex(path=str(tmp_path))
+    assert len(recovered) == 300
+    assert recovered.add(random_vectors(1, seed=5), make_entries(1, prefix="new")) == 1
+    assert len(PrecedentIndex(path=str(tmp_path))) == 301
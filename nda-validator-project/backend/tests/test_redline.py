@@ -0,0 +1,30 @@
+from docx import Document
+
+from services.redline import RedlineRenderer, accept_all_changes
+
+def write_document(path, texts):
+    doc = Document()
+    for text in texts:
+        doc.add_paragraph(text)
+    doc.save(str(path))
+
+def test_paragraphs_with_the_same_text_get_their_own_suggestion(tmp_path):
+    source = tmp_path / "nda.docx"
+    write_document(source, ["Either party may terminate.", "Notices are in writing.", "Either party may terminate."])
+    redline = tmp_path / "redline.docx"
+    redline.write_bytes(RedlineRenderer().render(str(source), {0: "Either party may end it.", 2: "No party may terminate."}).getbuffer())
+
+    texts = [paragraph.text for paragraph in Document(accept_all_changes(str(redline))).paragraphs]
+    assert texts == ["Either party may end it.", "Notices are in writing.", "No party may terminate."]
+
+def test_update_only_rewrites_the_changed_paragraphs(tmp_path):
+    source = tmp_path / "nda.docx"
+    write_document(source, ["The term is one year.", "Liability is capped.", "Governing law is Delaware."])
+    renderer = RedlineRenderer()
+    redline = tmp_path / "redline.docx"
+    redline.write_bytes(renderer.render(str(source), {0: "The term is two years.", 1: "Liability is unlimited."}).getbuffer())
+    updated = tmp_path / "updated.docx"
+    updated.write_bytes(renderer.update(str(redline), {1: "Liability is capped at fees paid.", 0: None}).getbuffer())
+
+    texts = [paragraph.text for paragraph in Document(accept_all_changes(str(updated))).paragraphs]
+    assert texts == ["The term is one year.", "Liability is capped at fees paid.", "Governing law is Delaware."]
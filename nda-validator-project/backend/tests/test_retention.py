@@ -0,0 +1,162 @@
+import asyncio
+import os
+import time
+
+import pytest
+
+from services.document_service import DocumentService
+from services.retention import RetentionSweeper
+
+DAY = 86400
+
+class RecordingMemory:
+    def __init__(self):
+        self.calls = []
+
+    async def clear_old_documents(self, days, batch_size, pause):
+        self.calls.append((days, batch_size, pause))
+        return {"documents_deleted": 2, "feedback_deleted": 3}
+
+class RecordingDocuments:
+    def __init__(self):
+        self.calls = []
+
+    async def sweep_files(self, max_age_seconds, keep, batch_size, pause):
+        self.calls.append((max_age_seconds, keep, batch_size, pause))
+        return {"files_deleted": 4}
+
+def test_sweep_combines_both_stores_and_paces_batches():
+    memory, documents = RecordingMemory(), RecordingDocuments()
+    sweeper = RetentionSweeper(memory, documents, keep={"kept"}, days=30, document_days=0.5,
+                               interval=0, batch_size=50, max_deletes_per_second=100)
+    result = asyncio.run(sweeper.sweep())
+
+    assert result["documents_deleted"] == 2 and result["feedback_deleted"] == 3 and result["files_deleted"] == 4
+    assert memory.calls == [(30, 50, 0.5)]
+    assert documents.calls == [(43200.0, {"kept"}, 50, 0.5)]
+    assert sweeper.stats()["sweeps"] == 1
+
+def test_zero_days_keeps_that_data_and_history_is_bounded():
+    memory, documents = RecordingMemory(), RecordingDocuments()
+    sweeper = RetentionSweeper(memory, documents, days=0, document_days=1, interval=0)
+
+    async def sweep_many():
+        for _ in range(12):
+            await sweeper.sweep()
+
+    asyncio.run(sweep_many())
+    assert memory.calls == []
+    assert len(documents.calls) == 12
+    assert len(sweeper.stats()["recent"]) == 10
+
+def touch(directory, name, age):
+    path = directory / name
+    path.write_bytes(b"docx")
+    stamp = time.time() - age
+    os.utime(path, (stamp, stamp))
+    return path
+
+@pytest.fixture
+def documents(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    service = DocumentService()
+    yield service, tmp_path / service.documents_dir
+    service.pool.shutdown()
+
+def test_sweep_files_removes_old_artifacts_but_not_kept_ones(documents):
+    service, directory = documents
+    touch(directory, "old.docx", 2 * DAY)
+    touch(directory, "old_clean.docx", 2 * DAY)
+    touch(directory, "kept.docx", 2 * DAY)
+    touch(directory, "fresh.docx", 60)
+    touch(directory, "notes.txt", 2 * DAY)
+    # Read recently, although the file itself is old
+    touch(directory, "used.docx", 2 * DAY)
+    service.last_used["used"] = time.time()
+
+    result = asyncio.run(service.sweep_files(DAY, keep={"kept"}, batch_size=1))
+
+    assert result == {"files_deleted": 2, "redlines_released": 0}
+    assert sorted(os.listdir(directory)) == ["fresh.docx", "kept.docx", "notes.txt", "used.docx"]
+
+def test_sweep_files_keeps_an_upload_and_its_latest_redline_together(documents):
+    service, directory = documents
+    touch(directory, "draft.docx", 2 * DAY)
+    touch(directory, "redline-1_redline.docx", 60)
+    touch(directory, "stale.docx", 2 * DAY)
+    touch(directory, "redline-2_redline.docx", 2 * DAY)
+    touch(directory, "redline-2_clean.docx", 2 * DAY)
+    service.latest_redlines.update({"draft": "redline-1", "stale": "redline-2"})
+
+    result = asyncio.run(service.sweep_files(DAY))
+
+    assert result == {"files_deleted": 3, "redlines_released": 1}
+    assert sorted(os.listdir(directory)) == ["draft.docx", "redline-1_redline.docx"]
+    assert service.latest_redlines == {"draft": "redline-1"}
+
+def test_sweep_files_removes_only_stale_partial_uploads(documents):
+    service, directory = documents
+    touch(directory, ".upload-crashed.part", 2 * 3600)
+    touch(directory, ".upload-running.part", 60)
+
+    result = asyncio.run(service.sweep_files(DAY))
+
+    assert result["files_deleted"] == 1
+    assert os.listdir(directory) == [".upload-running.part"]
+
+class Clock:
+    """Stands in for ``time.time`` so records can be written in the past."""
+
+    def __init__(self):
+        self.now = time.time()
+
+    def __call__(self):
+        # Feedback IDs include the timestamp, so no two calls return the same time
+        self.now += 0.001
+        return self.now
+
+def test_clear_old_documents_deletes_expired_records_and_their_feedback(tmp_path, monkeypatch):
+    pytest.importorskip("chromadb")
+    from services import memory_service as memory_module
+
+    clock = Clock()
+    monkeypatch.setattr(memory_module.time, "time", clock)
+    memory = memory_module.MemoryService(path=str(tmp_path))
+    vector = [1.0, 0.0, 0.0]
+
+    async def scenario():
+        clock.now -= 40 * DAY
+        for document_id in ("old-1", "old-2", "old-3"):
+            await memory.save_document(document_id, f"NDA {document_id}", {}, vector)
+        await memory.save_feedback("recent", {"sentiment": 1}, vector)
+        clock.now += 40 * DAY
+        await memory.save_document("recent", "NDA recent", {}, vector)
+        await memory.save_feedback("old-1", {"sentiment": -1}, vector)
+        await memory.save_feedback("recent", {"sentiment": 1}, vector)
+        result = await memory.clear_old_documents(30, batch_size=2)
+        await memory.close()
+        return result
+
+    result = asyncio.run(scenario())
+
+    # One old feedback record by its age, one recent one because its document expired
+    assert result == {"documents_deleted": 3, "feedback_deleted": 2}
+    assert memory.nda_collection.get()["ids"] == ["recent"]
+    remaining = memory.feedback_collection.get(include=["metadatas"])["metadatas"]
+    assert [metadata["document_id"] for metadata in remaining] == ["recent"]
+    assert memory.feedback_stats.summary()["total_feedback"] == 1
+
+def test_backfill_epochs_stamps_records_written_without_one(tmp_path):
+    pytest.importorskip("chromadb")
+    from services.memory_service import MemoryService
+
+    memory = MemoryService(path=str(tmp_path))
+    memory.nda_collection.upsert(ids=["legacy"], documents=["NDA"], embeddings=[[1.0, 0.0, 0.0]],
+                                 metadatas=[{"document_id": "legacy", "timestamp": "2020-01-01T00:00:00"}])
+    os.remove(os.path.join(str(tmp_path), "epochs_backfilled"))
+
+    reopened = MemoryService(path=str(tmp_path))
+
+    metadata = reopened.nda_collection.get(ids=["legacy"], include=["metadatas"])["metadatas"][0]
+    assert metadata["epoch"] == pytest.approx(time.mktime((2020, 1, 1, 0, 0, 0, 0, 0, -1)))
+    assert os.path.exists(os.path.join(str(tmp_path), "epochs_backfilled"))
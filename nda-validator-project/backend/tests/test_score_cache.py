@@ -0,0 +1,47 @@
+import asyncio
+
+from services.score_cache import ScoreCache
+
+def test_memory_hits_and_misses():
+    cache = ScoreCache(max_entries=2)
+    cache.put_many(["a", "b"], [[0.1, 0.9], [0.8, 0.2]], "v1")
+    found, missing = cache.get_many(["a", "c", "b"], "v1")
+    assert found == {0: [0.1, 0.9], 2: [0.8, 0.2]}
+    assert missing == [1]
+    # Another version never sees these scores
+    assert cache.get_many(["a"], "v2") == ({}, [0])
+
+def test_disk_tier_survives_restart(tmp_path):
+    path = str(tmp_path / "scores.sqlite3")
+    cache = ScoreCache(persist_path=path)
+    cache.put_many(["clause one", "clause two"], [[0.3, 0.7], [0.6, 0.4]], "v1")
+    cache.flush()
+
+    restarted = ScoreCache(persist_path=path)
+    found, missing = asyncio.run(restarted.get_many_async(["clause  one", "clause three"], "v1"))
+    assert found == {0: [0.3, 0.7]}
+    assert missing == [1]
+    assert restarted.stats()["disk_hits"] == 1
+
+def test_prune_drops_versions_no_longer_served(tmp_path):
+    path = str(tmp_path / "scores.sqlite3")
+    cache = ScoreCache(persist_path=path)
+    cache.put_many(["a"], [[1.0, 0.0]], "old")
+    cache.put_many(["a"], [[0.0, 1.0]], "new")
+    cache.prune(["new"])
+    cache.flush()
+
+    restarted = ScoreCache(persist_path=path)
+    assert restarted.get_many(["a"], "old") == ({}, [0])
+    assert restarted.get_many(["a"], "new")[0] == {0: [0.0, 1.0]}
+    assert restarted.stats()["disk_entries"] == 1
+
+def test_disk_tier_is_capped_oldest_first(tmp_path):
+    cache = ScoreCache(max_entries=1, persist_path=str(tmp_path / "scores.sqlite3"), max_disk_entries=3)
+    for i in range(5):
+        cache.put_many([f"text {i}"], [[float(i)]], "v1")
+    cache.flush()
+    assert cache.stats()["disk_entries"] == 3
+    found, missing = cache.get_many([f"text {i}" for i in range(5)], "v1")
+    assert sorted(found) == [2, 3, 4]
+    assert missing == [0, 1]
@@ -0,0 +1,61 @@
+import asyncio
+import threading
+
+import pytest
+
+from services.worker_pool import ServerBusyError, WorkerPool
+
+def write_bytes(path, data):
+    with open(path, "ab") as f:
+        f.write(data)
+
+def test_saturated_pool_rejects_with_retry_after():
+    release = threading.Event()
+
+    async def scenario():
+        pool = WorkerPool("test", max_workers=1, max_queue=0, retry_after=7)
+        running = asyncio.ensure_future(pool.run(release.wait))
+        await asyncio.sleep(0.05)
+        with pytest.raises(ServerBusyError) as error:
+            await pool.run(lambda: None)
+        release.set()
+        await running
+        pool.shutdown()
+        return error.value, pool.stats()
+
+    error, stats = asyncio.run(scenario())
+    assert error.retry_after == 7
+    assert stats["rejected"] == 1
+
+def test_process_pool_runs_module_functions(tmp_path):
+    async def scenario():
+        pool = WorkerPool("test", kind="process", max_workers=1)
+        await pool.run(write_bytes, str(tmp_path / "out"), b"abc")
+        pool.shutdown()
+
+    asyncio.run(scenario())
+    assert (tmp_path / "out").read_bytes() == b"abc"
+
+def test_cancelled_caller_keeps_the_slot_until_the_call_returns():
+    started, release = threading.Event(), threading.Event()
+
+    def blocking():
+        started.set()
+        release.wait()
+
+    async def scenario():
+        pool = WorkerPool("test", max_workers=1, max_queue=0)
+        running = asyncio.ensure_future(pool.run(blocking))
+        await asyncio.get_running_loop().run_in_executor(None, started.wait)
+        running.cancel()
+        await asyncio.sleep(0.05)
+        with pytest.raises(ServerBusyError):
+            await pool.run(lambda: None)
+        busy = pool.stats()["active"]
+        release.set()
+        await asyncio.sleep(0.05)
+        result = await pool.run(lambda: "ran")
+        pool.shutdown()
+        return busy, result, pool.stats()["active"]
+
+    assert asyncio.run(scenario()) == (1, "ran", 0)
@@ -4,42 +4,65 @@ import json
 import requests
 from typing import List, Dict
 import argparse
+import time
+
+DOCUMENT_EXTENSIONS = ("*.docx", "*.doc")
+
+def _base_name(path: str, doc_type: str) -> str:
+    name = os.path.splitext(os.path.basename(path))[0]
+    suffix = f"_{doc_type}"
+    return name[:-len(suffix)] if name.endswith(suffix) else name
 
 def find_training_documents(base_dir: str) -> Dict[str, List[str]]:
-    """Find all training documents in the specified directory."""
-    documents = {
-        "original": [],
-        "redline": [],
-        "clean": []
-    }
+    """Find complete original/redline/clean sets in the specified directory.
+
+    Documents are matched by base name (``nda1_original.docx`` goes with
+    ``nda1_redline.docx`` and ``nda1_clean.doc``), so a missing file only
+    drops its own set instead of shifting every later pairing.
+    """
+    found = {}
+    doc_types = ("original", "redline", "clean")
     
     # Look for documents in subdirectories
-    for doc_type in documents.keys():
-        pattern = os.path.join(base_dir, doc_type, "*.docx")
-        documents[doc_type] = sorted(glob.glob(pattern))
+    for doc_type in doc_types:
+        for extension in DOCUMENT_EXTENSIONS:
+            for path in glob.glob(os.path.join(base_dir, doc_type, extension)):
+                found.setdefault(_base_name(path, doc_type), {})[doc_type] = path
+    
+    documents = {doc_type: [] for doc_type in doc_types}
+    for base_name in sorted(found):
+        paths = found[base_name]
+        missing = [doc_type for doc_type in doc_types if doc_type not in paths]
+        if missing:
+            print(f"Skipping {base_name}: no {', '.join(missing)} document")
+            continue
+        for doc_type in doc_types:
+            documents[doc_type].append(paths[doc_type])
     
     return documents
 
 def validate_training_data(documents: Dict[str, List[str]]) -> bool:
-    """Validate that we have matching sets of documents."""
-    lengths = [len(docs) for docs in documents.values()]
-    if not all(length == lengths[0] for length in lengths):
-        print("Error: Unequal number of documents in each category")
+    """Validate that we found at least one complete set of documents."""
+    if not documents["original"]:
+        print("Error: No complete original/redline/clean document sets found")
         return False
-    
-    # Check that document names match across categories
-    for i in range(len(documents["original"])):
-        orig_name = os.path.basename(documents["original"][i])
-        redline_name = os.path.basename(documents["redline"][i])
-        clean_name = os.path.basename(documents["clean"][i])
-        
-        base_name = orig_name.replace("_original.docx", "")
-        if not (redline_name.startswith(base_name) and clean_name.startswith(base_name)):
-            print(f"Error: Document names don't match for index {i}")
-            return False
-    
     return True
 
+def wait_for_job(api_url: str, job_id: str, poll_seconds: float = 5.0) -> Dict:
+    """Poll a job until it finishes, printing stage changes."""
+    last_stage = None
+    while True:
+        response = requests.get(f"{api_url}/jobs/{job_id}")
+        response.raise_for_status()
+        job = response.json()
+        if job["status"] in ("succeeded", "failed", "cancelled"):
+            return job
+        stage = job["progress"]["stage"]
+        if stage != last_stage and stage is not None:
+            print(f"Stage: {stage}")
+            last_stage = stage
+        time.sleep(poll_seconds)
+
 def train_model(base_dir: str, api_url: str = "http://localhost:8000"):
     """Train the model using the documents in the specified directory."""
     # Find all training documents
@@ -58,12 +81,19 @@ def train_model(base_dir: str, api_url: str = "http://localhost:8000"):
         "clean_docs": documents["clean"]
     }
     
-    # Send training request
+    # Send training request; training runs as a background job
     try:
         response = requests.post(f"{api_url}/train", json=training_data)
         response.raise_for_status()
+        job_id = response.json()["job_id"]
+        print(f"Training job {job_id} queued")
+        
+        job = wait_for_job(api_url, job_id)
+        if job["status"] != "succeeded":
+            print(f"Training {job['status']}: {job['error'] or ''}")
+            return
         
-        results = response.json()
+        results = job["result"]
         print("\nTraining Results:")
         print(f"Model saved to: {results['model_dir']}")
         print(f"Number of training samples: {results['num_training_samples']}")
@@ -25,21 +25,39 @@ const DocumentReview = () => {
   const [error, setError] = useState(null);
   const [document, setDocument] = useState(null);
   const [suggestions, setSuggestions] = useState([]);
+  const [analyzing, setAnalyzing] = useState(true);
 
   useEffect(() => {
-    const analyzeDocument = async () => {
-      try {
-        const response = await axios.post(`http://localhost:8000/analyze/${documentId}`);
-        setDocument(response.data);
-        setSuggestions(response.data.suggestions || []);
-      } catch (err) {
-        setError(err.response?.data?.detail || 'An error occurred while analyzing the document');
-      } finally {
-        setLoading(false);
-      }
-    };
-
-    analyzeDocument();
+    // Findings arrive one by one as the backend scores them
+    const source = new EventSource(`http://localhost:8000/analyze/${documentId}/stream`);
+
+    source.addEventListener('started', () => {
+      setSuggestions([]);
+      setLoading(false);
+    });
+
+    source.addEventListener('clause', (event) => {
+      const clause = JSON.parse(event.data);
+      setSuggestions((current) =>
+        [...current, clause].sort((a, b) => a.paragraph_index - b.paragraph_index)
+      );
+    });
+
+    source.addEventListener('done', (event) => {
+      setDocument(JSON.parse(event.data));
+      setAnalyzing(false);
+      source.close();
+    });
+
+    source.addEventListener('error', (event) => {
+      const detail = event.data ? JSON.parse(event.data).detail : null;
+      setError(detail || 'An error occurred while analyzing the document');
+      setLoading(false);
+      setAnalyzing(false);
+      source.close();
+    });
+
+    return () => source.close();
   }, [documentId]);
 
   const handleAccept = async () => {
@@ -101,6 +119,15 @@ const DocumentReview = () => {
           Review the AI suggestions for your NDA document
         </Typography>
 
+        {analyzing && (
+          <Box sx={{ display: 'flex', alignItems: 'center', gap: 1, mb: 2 }}>
+            <CircularProgress size={16} />
+            <Typography variant="body2" color="text.secondary">
+              Analyzing... {suggestions.length} findings so far
+            </Typography>
+          </Box>
+        )}
+
         <List>
           {suggestions.map((suggestion, index) => (
             <React.Fragment key={index}>
@@ -171,7 +198,7 @@ const DocumentReview = () => {
             color="primary"
             startIcon={<CheckCircleIcon />}
             onClick={handleAccept}
-            disabled={loading}
+            disabled={loading || analyzing}
           >
             Accept All Suggestions
           </Button>
@@ -180,7 +207,7 @@ const DocumentReview = () => {
             color="primary"
             startIcon={<FeedbackIcon />}
             onClick={handleFeedback}
-            disabled={loading}
+            disabled={loading || analyzing}
           >
             Provide Feedback
           </Button>